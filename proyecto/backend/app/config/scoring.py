@@ -0,0 +1,92 @@
+# Modelos de scoring declarativos del SenseiEngine (Layer A)
+#
+# Cada modelo describe umbrales, penalizaciones y multiplicadores por atributo
+# del perfil. El motor NO tiene números mágicos: al iniciar, cada spec se compila
+# (app/services/scoring_model.py) en un evaluador escalar y uno vectorizado.
+#
+# Para probar un modelo nuevo (A/B): agregar una entrada con otra "version"
+# y seleccionarla con la variable de entorno SCORING_MODEL_VERSION.
+
+SCORING_MODEL_V1 = {
+    "version": "v1",
+
+    # Umbrales de categoría (score >= umbral)
+    "categories": {
+        "alto": 70,
+        "medio": 40
+    },
+
+    # Flags de alerta, en el orden en que se reportan.
+    # Todas las condiciones de un flag deben cumplirse (AND); "any" es un OR.
+    "flags": {
+        "tormenta_electrica": {"weather_codes": [95, 96, 99]},
+        "visibilidad_nula": {"visibility_lt_km": 1.0},
+        "viento_fuerte": {"wind_gt_kmh": 30},
+        "riesgo_deriva": {"relative": "offshore", "board_types": ["inflable"]},
+        "olas_grandes": {"wave_gt_m": 1.5},
+        "mar_picado": {"period_gt_s": 0, "period_lt_s": 5.0, "wave_gt_m": 0.5},
+        "lluvia": {"precipitation_gt_mm": 0.5},
+        "uv_alto": {"uv_gte": 6.0},
+        "principiante_condiciones_moderadas": {
+            "experience": ["beginner"],
+            "any": {"wind_gt_kmh": 20, "wave_gt_m": 1.0}
+        }
+    },
+
+    # SEGURIDAD (100 = muy seguro). Los términos se aplican en orden.
+    "seguridad": {
+        "base": 100,
+        "terms": [
+            {"flag": "viento_fuerte", "penalty": 30},
+            {"flag": "riesgo_deriva", "penalty": 40},
+            {"flag": "olas_grandes", "penalty": 25},
+            {"flag": "principiante_condiciones_moderadas", "penalty": 15},
+            {"flag": "deriva_varese", "penalty": 20},
+            {"wind_excess": {"beginner": {"above_kmh": 15, "per_kmh": 1.5}}},
+            {"relative": "offshore", "penalty": 15},
+            {"flag": "mar_picado", "penalty": 10},
+            {"flag": "lluvia", "penalty": 10}
+        ],
+        # Anulan la seguridad (score = 0)
+        "critical_flags": ["visibilidad_nula", "tormenta_electrica"]
+    },
+
+    # ESFUERZO (100 = muy exigente): viento vs potencia de remada
+    "esfuerzo": {
+        "wind_factor": 2,
+        "power_multiplier": {"low": 1.5, "medium": 1.0, "high": 0.7},
+        "relative_multiplier": {"offshore": 1.3},
+        "wave_factor": 15,
+        "flag_bonus": {"mar_picado": 20}
+    },
+
+    # DISFRUTE (100 = muy disfrutable): según objetivo de sesión
+    "disfrute": {
+        "low_security": {"below": 30, "penalty": 10},
+        "goals": {
+            "calma": {
+                "linear": {"base": 90, "wind": -2, "wave": -20}
+            },
+            "entrenamiento": {
+                "bands": [
+                    {"wind_gt_kmh": 15, "wind_lt_kmh": 25, "wave_lt_m": 1.5, "score": 85},
+                    {"wind_lt_kmh": 10, "score": 40}
+                ],
+                "default": 50
+            },
+            "desafio": {
+                "requires": {"experience": ["advanced"], "min_seguridad": 50},
+                "linear": {"base": 50, "wind": 1.5, "wave": 15},
+                "default": 30
+            }
+        },
+        "fallback": 50,
+        "wind_multiplier": {"beginner": {"above_kmh": 20, "factor": 0.7}}
+    }
+}
+
+SCORING_MODELS = {
+    SCORING_MODEL_V1["version"]: SCORING_MODEL_V1
+}
+
+DEFAULT_SCORING_VERSION = SCORING_MODEL_V1["version"]
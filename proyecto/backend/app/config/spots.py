@@ -1,29 +1,47 @@
-# Spots de SUP en Mar del Plata
-
-SPOTS = {
-    "varese": {
-        "name": "Varese",
-        "lat": -38.014,
-        "lon": -57.530,
-        "orientation_costa_deg": 90,  # Costa mira al Este
-        "reglas_especificas": [
-            {
-                "condition": "tide_falling_and_wind_offshore",
-                "flag": "deriva_varese",
-                "descripcion": "Marea bajando + viento del oeste puede alejarte de la costa"
-            }
-        ],
-        "visual_checklist": [
-            "Mirá las olas cerca de la costa: ¿rompen de forma consistente?",
-            "Observá la espuma: ¿se desplaza rápido hacia el mar (offshore) o hacia la playa (onshore)?",
-            "Revisá las banderas: ¿están estiradas por el viento?"
-        ]
-    }
-}
-
-# Coordenadas de referencia para validar ubicación en Mar del Plata
-MDQ_CENTER = {
-    "lat": -38.0055,
-    "lon": -57.5426,
-    "max_distance_km": 50  # Radio máximo desde el centro
-}
+# Spots de SUP (catálogo en spots.json, agrupado por región)
+#
+# SPOTS y REGIONS se cargan al importar y el índice espacial
+# (app/services/spot_index.py) los actualiza en el lugar cuando el archivo
+# cambia: los módulos que hicieron `from app.config.spots import SPOTS` ven
+# siempre el catálogo vigente.
+
+import json
+import os
+from typing import Dict
+
+SPOTS_FILE = os.getenv("SPOTS_FILE", os.path.join(os.path.dirname(__file__), "spots.json"))
+
+# Campos obligatorios de cada spot / región
+SPOT_FIELDS = ("name", "lat", "lon", "orientation_costa_deg", "region")
+REGION_FIELDS = ("name", "lat", "lon", "max_distance_km")
+
+
+def load_catalog(path: str = SPOTS_FILE) -> dict:
+    """
+    Lee y valida el catálogo {"regions": {...}, "spots": {...}}
+
+    Raises:
+        ValueError: si falta un campo, una coordenada es inválida o un spot
+            apunta a una región inexistente
+    """
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    regions: Dict[str, dict] = catalog.get("regions", {})
+    spots: Dict[str, dict] = catalog.get("spots", {})
+    for kind, entries, fields in (("Región", regions, REGION_FIELDS), ("Spot", spots, SPOT_FIELDS)):
+        for entry_id, entry in entries.items():
+            missing = [name for name in fields if name not in entry]
+            if missing:
+                raise ValueError(f"{kind} '{entry_id}': faltan campos {missing}")
+            if not (-90 <= entry["lat"] <= 90 and -180 <= entry["lon"] <= 180):
+                raise ValueError(f"{kind} '{entry_id}': coordenadas inválidas ({entry['lat']}, {entry['lon']})")
+    for spot_id, spot in spots.items():
+        if spot["region"] not in regions:
+            raise ValueError(f"Spot '{spot_id}': región '{spot['region']}' no existe")
+    return {"regions": regions, "spots": spots}
+
+
+_catalog = load_catalog()
+SPOTS: Dict[str, dict] = _catalog["spots"]
+REGIONS: Dict[str, dict] = _catalog["regions"]
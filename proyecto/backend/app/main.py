@@ -1,7 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import api
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -11,7 +13,8 @@ load_dotenv()
 app = FastAPI(
     title="Rumbo SUP API",
     description="Backend para Rumbo SUP - Tu Guía de Mar",
-    version="0.2.0"
+    version="0.2.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS para permitir frontend
@@ -31,6 +34,11 @@ allowed_origins = [
 if is_production:
     allowed_origins.append("https://*.onrender.com")
 
+# Límites por cliente (token bucket + cola justa). Se agrega antes que CORS para
+# quedar adentro: los 429 también llevan los headers CORS y el navegador ve Retry-After.
+from app.services.rate_limit import RateLimitMiddleware
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -38,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Content-Location", "Retry-After"],
 )
 
 # Incluir routers
@@ -47,11 +56,44 @@ app.include_router(api.router)
 async def startup_event():
     """Evento de inicio de la aplicación"""
     print("🌊 Rumbo SUP API iniciando...")
+    
+    # Compilar modelos de scoring (falla rápido si algún spec es inválido)
+    from app.services.scoring_model import compile_all_models
+    versions = compile_all_models()
+    print(f"🧮 Modelos de scoring: {', '.join(versions)}")
     print(f"📡 CORS configurado para: {frontend_url}")
+    
+    # Catálogo de spots: recarga en caliente cuando cambia spots.json
+    from app.services import spot_index
+    spot_index.start()
+    print(f"🗺️ Spots: {len(spot_index.get_index())} en {len(spot_index.get_index().region_ids)} regiones")
+    
+    # Modo cluster (CLUSTER_STORE): cada nodo refresca sólo sus celdas y lee las demás del store
+    from app.services import cluster
+    if cluster.configure():
+        cluster.start(api.refresh_cluster_cells)
+        print(f"🔗 Cluster: nodo {cluster.node_id()} ({len(cluster.members())} nodos vivos)")
+    
+    # Refresh en background para el push en vivo (/api/live)
+    from app.services.live_updates import hub
+    hub.start(api.refresh_live_spot)
+    
+    # Bundles offline (/api/bundle): se generan al pedirlos. En modo publisher un
+    # refresh de background los regenera y los escribe como snapshots estáticos
+    from app.services import offline_bundle, snapshot_publisher
+    if snapshot_publisher.enabled():
+        offline_bundle.start(api.refresh_bundles)
+        print(f"📦 Publisher de snapshots en {snapshot_publisher.SNAPSHOT_DIR}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento de cierre de la aplicación"""
+    from app.services.live_updates import hub
+    from app.services import cluster, offline_bundle, spot_index
+    await hub.stop()
+    await offline_bundle.stop()
+    await spot_index.stop()
+    await cluster.stop()
     print("👋 Rumbo SUP API cerrando...")
 
 @app.get("/")
@@ -67,6 +109,16 @@ async def root():
         "status": "Frontend not mounted (check app/static)"
     }
 
+# Snapshots publicados (modo publisher): variante precomprimida según Accept-Encoding.
+# Va antes del catch-all de la SPA; en producción lo ideal es que los sirva el CDN.
+@app.get("/snapshots/{file_path:path}")
+async def serve_snapshot(file_path: str, accept_encoding: Optional[str] = Header(default=None)):
+    from app.services.snapshot_publisher import snapshot_response
+    try:
+        return snapshot_response(file_path, accept_encoding)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Snapshot no encontrado")
+
 # Servir archivos estáticos si existen (Producción)
 # Se espera que el usuario copie 'frontend/dist' a 'backend/app/static'
 if os.path.exists("app/static"):
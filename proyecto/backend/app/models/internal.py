@@ -0,0 +1,203 @@
+"""
+Tipos internos livianos (sin validación) para datos de providers y engine
+
+Los modelos pydantic de schemas.py validan en el borde: requests entrantes y
+respuestas salientes. Adentro (providers -> engine -> router) los datos ya son
+confiables, así que circulan como dataclasses con __slots__ y se convierten
+recién al armar la respuesta: to_dict() arma el dict con la forma del schema
+y la validación se hace UNA vez, de una sola pasada en el core de pydantic
+(model_validate o el response_model del endpoint).
+
+Nota: con pydantic 2.x model_construct() es más lento que validar un dict
+(el constructor "sin validar" corre en Python; la validación, en Rust), por
+eso el camino confiable es dict -> model_validate y no model_construct.
+
+Los atributos tienen los mismos nombres que los schemas: el engine acepta
+cualquiera de los dos.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.models.schemas import WeatherData, EngineResult
+
+
+@dataclass(slots=True)
+class WindRecord:
+    speed_kmh: Optional[float] = None
+    direction_deg: Optional[int] = None
+    relative_direction: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "speed_kmh": self.speed_kmh,
+            "direction_deg": self.direction_deg,
+            "relative_direction": self.relative_direction,
+        }
+
+
+@dataclass(slots=True)
+class WaveRecord:
+    height_m: Optional[float] = None
+    period_s: Optional[float] = None
+    direction_deg: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "height_m": self.height_m,
+            "period_s": self.period_s,
+            "direction_deg": self.direction_deg,
+        }
+
+
+@dataclass(slots=True)
+class AtmosphereRecord:
+    temperature_c: Optional[float] = None
+    precipitation_mm: Optional[float] = None
+    cloud_cover_pct: Optional[int] = None
+    uv_index: Optional[float] = None
+    visibility_km: Optional[float] = None
+    weather_code: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "temperature_c": self.temperature_c,
+            "precipitation_mm": self.precipitation_mm,
+            "cloud_cover_pct": self.cloud_cover_pct,
+            "uv_index": self.uv_index,
+            "visibility_km": self.visibility_km,
+            "weather_code": self.weather_code,
+        }
+
+
+@dataclass(slots=True)
+class TideRecord:
+    state: str
+
+
+@dataclass(slots=True)
+class WeatherRecord:
+    """Equivalente interno de WeatherData"""
+    wind: WindRecord
+    waves: WaveRecord
+    atmosphere: Optional[AtmosphereRecord]
+    tide: TideRecord
+    timestamp: str
+    provider: str = "openmeteo"
+
+    def at(self, timestamp: str) -> "WeatherRecord":
+        """
+        Copia para otra hora (relleno de huecos). Comparte olas/atmósfera/marea,
+        que no se modifican; el viento se copia porque el engine le asigna la
+        dirección relativa.
+        """
+        wind = self.wind
+        return WeatherRecord(
+            wind=WindRecord(wind.speed_kmh, wind.direction_deg, wind.relative_direction),
+            waves=self.waves,
+            atmosphere=self.atmosphere,
+            tide=self.tide,
+            timestamp=timestamp,
+            provider=self.provider
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict con la forma de WeatherData"""
+        return {
+            "wind": self.wind.to_dict(),
+            "waves": self.waves.to_dict(),
+            "atmosphere": self.atmosphere.to_dict() if self.atmosphere else None,
+            "tide": {"state": self.tide.state},
+            "timestamp": self.timestamp,
+            "provider": self.provider,
+        }
+
+    def to_schema(self) -> WeatherData:
+        return WeatherData.model_validate(self.to_dict())
+
+
+@dataclass(slots=True)
+class SemanticsRecord:
+    """Equivalente interno de SemanticAnalysis"""
+    scenario_id: str
+    driver_desc: str
+    behavior_desc: str
+    body_desc: str
+    risk_desc: str
+    avoid_desc: str
+    visual_cues: List[str]
+    strategy_desc: str
+    beginner_tip: str
+    advanced_tip: str
+    learning_focus: str
+    # Agregados dinámicos (UV, lluvia, mar picado) ya incluidos en risk_desc / strategy_desc
+    risk_extra: str = ""
+    strategy_extra: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scenario_id": self.scenario_id,
+            "driver_desc": self.driver_desc,
+            "behavior_desc": self.behavior_desc,
+            "body_desc": self.body_desc,
+            "risk_desc": self.risk_desc,
+            "avoid_desc": self.avoid_desc,
+            "visual_cues": list(self.visual_cues),
+            "strategy_desc": self.strategy_desc,
+            "beginner_tip": self.beginner_tip,
+            "advanced_tip": self.advanced_tip,
+            "learning_focus": self.learning_focus,
+        }
+
+    def to_compact_dict(self) -> Dict[str, Any]:
+        """Dict con la forma de CompactSemantics (el texto fijo va en el catálogo)"""
+        return {
+            "scenario_id": self.scenario_id,
+            "risk_extra": self.risk_extra,
+            "strategy_extra": self.strategy_extra,
+        }
+
+
+@dataclass(slots=True)
+class EngineRecord:
+    """Equivalente interno de EngineResult (scores y categorías planos)"""
+    seguridad: int
+    esfuerzo: int
+    disfrute: int
+    cat_seguridad: str
+    cat_esfuerzo: str
+    cat_disfrute: str
+    flags: List[str]
+    semantics: SemanticsRecord
+    confidence: str
+    data_completeness: float
+    data_freshness: float
+    volatility: float
+    scoring_version: Optional[str] = None
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """Dict con la forma de EngineResult (o CompactEngineResult si compact)"""
+        return {
+            "scores": {
+                "seguridad": self.seguridad,
+                "esfuerzo": self.esfuerzo,
+                "disfrute": self.disfrute,
+            },
+            "categories": {
+                "seguridad": self.cat_seguridad,
+                "esfuerzo": self.cat_esfuerzo,
+                "disfrute": self.cat_disfrute,
+            },
+            "flags": list(self.flags),
+            "semantics": self.semantics.to_compact_dict() if compact else self.semantics.to_dict(),
+            "confidence": self.confidence,
+            "confidence_factors": {
+                "data_completeness": self.data_completeness,
+                "data_freshness": self.data_freshness,
+                "volatility": self.volatility,
+            },
+            "scoring_version": self.scoring_version,
+        }
+
+    def to_schema(self) -> EngineResult:
+        return EngineResult.model_validate(self.to_dict())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Union
 
 # ==================== User Profile ====================
 
@@ -78,12 +78,17 @@ class EngineResult(BaseModel):
     semantics: SemanticAnalysis = Field(..., description="Análisis semántico para pedagogía")
     confidence: Literal["alta", "media", "baja"] = Field(..., description="Confianza del modelo")
     confidence_factors: Optional[ConfidenceFactors] = None
+    scoring_version: Optional[str] = Field(None, description="Versión del modelo de scoring que produjo el resultado")
 
 # ==================== API Requests/Responses ====================
 
+Projection = Literal["full", "compact", "scores"]
+
 class AnalyzeRequest(BaseModel):
     spot_id: str = Field(..., description="ID del spot (e.g., 'varese')")
     user: UserProfile
+    view: Projection = Field(default="full", description="Proyección: full (todo), compact (scenario_id en vez de textos), scores (sólo scores/categorías/flags)")
+    include_scenarios: bool = Field(default=True, description="En vista compact, incluir el texto del escenario usado")
 
 class AnalyzeResponse(BaseModel):
     spot: dict
@@ -117,7 +122,302 @@ class TimelineResponse(BaseModel):
     weather: WeatherData
     current: EngineResult
     timeline: List[TimelinePoint] = Field(..., description="Proyección horaria")
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (None = última)")
+
+# Horizonte máximo con datos de olas: Marine API da 8 días desde el inicio del
+# día UTC, así que desde la hora actual siempre cubre 7 días completos. Más allá
+# el oleaje quedaría sin dato y el engine lo puntuaría como mar plano.
+MAX_HORIZON_HOURS = 168
 
 class TimelineRequest(BaseModel):
     spot_id: str
     user: UserProfile
+    compact: bool = Field(default=False, description="Modo compacto: cada hora lleva sólo scenario_id + agregados dinámicos")
+    include_scenarios: bool = Field(default=True, description="En modo compacto, incluir los escenarios usados (False si el cliente ya tiene el catálogo)")
+    since: Optional[str] = Field(default=None, description="Versión (ETag) que ya tiene el cliente: responde sólo los cambios")
+    horizon_hours: int = Field(default=12, ge=1, le=MAX_HORIZON_HOURS, description="Horizonte en horas (hasta 7 días)")
+    resolution: Literal["1h", "3h", "daily"] = Field(default="1h", description="1h: horas completas; 3h / daily: bloques agregados")
+    page_size: int = Field(default=72, ge=1, le=MAX_HORIZON_HOURS, description="Horas (1h) o bloques (3h / daily) por página")
+    cursor: Optional[str] = Field(default=None, description="next_cursor de la página anterior")
+    view: Projection = Field(default="full", description="Proyección de cada hora: full, compact o scores (sólo scores/categorías/flags)")
+
+    @property
+    def projection(self) -> str:
+        """Vista efectiva (compact=true equivale a view='compact')"""
+        return "compact" if self.compact and self.view == "full" else self.view
+
+# ==================== Compact Timeline / Scenario Catalog ====================
+
+class ScenarioNarrative(BaseModel):
+    """Texto fijo de un escenario del catálogo (mismos campos que SemanticAnalysis)"""
+    driver_desc: str
+    behavior_desc: str
+    body_desc: str
+    risk_desc: str = Field(..., description="Riesgo base (sin agregados dinámicos)")
+    avoid_desc: str
+    visual_cues: List[str] = Field(default_factory=list)
+    strategy_desc: str = Field(..., description="Estrategia base (sin agregados dinámicos)")
+    beginner_tip: str
+    advanced_tip: str
+    learning_focus: str
+
+class ScenarioCatalogResponse(BaseModel):
+    version: str = Field(..., description="Hash del contenido del catálogo")
+    scenarios: Dict[str, ScenarioNarrative]
+
+class CompactSemantics(BaseModel):
+    """risk_desc = escenario.risk_desc + risk_extra; strategy_desc = escenario.strategy_desc + strategy_extra"""
+    scenario_id: str = Field(..., description="ID del escenario (clave del catálogo)")
+    risk_extra: str = Field(default="", description="Agregado dinámico al riesgo (lluvia, mar picado)")
+    strategy_extra: str = Field(default="", description="Agregado dinámico a la estrategia (UV)")
+
+class CompactEngineResult(BaseModel):
+    scores: Scores
+    categories: Categories
+    flags: List[str] = Field(default_factory=list)
+    semantics: CompactSemantics
+    confidence: Literal["alta", "media", "baja"]
+    confidence_factors: Optional[ConfidenceFactors] = None
+    scoring_version: Optional[str] = None
+
+class CompactTimelinePoint(BaseModel):
+    timestamp: str
+    hour_label: str
+    result: CompactEngineResult
+    weather: WeatherData
+
+class CompactTimelineResponse(BaseModel):
+    spot: dict
+    weather: WeatherData
+    current: CompactEngineResult
+    timeline: List[CompactTimelinePoint]
+    catalog_version: str = Field(..., description="Versión del catálogo de escenarios (GET /api/scenarios/{version})")
+    scenarios: Dict[str, ScenarioNarrative] = Field(default_factory=dict, description="Escenarios usados en la timeline (deduplicados)")
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (None = última)")
+
+class CompactAnalyzeResponse(BaseModel):
+    spot: dict
+    weather: WeatherData
+    result: CompactEngineResult
+    catalog_version: str = Field(..., description="Versión del catálogo de escenarios (GET /api/scenarios/{version})")
+    scenarios: Dict[str, ScenarioNarrative] = Field(default_factory=dict)
+
+# ==================== Scores Projection ====================
+
+class ScoresPoint(BaseModel):
+    """Vista "scores": sin clima, semántica ni confianza (no se calculan)"""
+    timestamp: str
+    hour_label: str
+    scores: Scores
+    categories: Categories
+    flags: List[str] = Field(default_factory=list)
+
+class ScoresAnalyzeResponse(BaseModel):
+    spot: dict
+    scoring_version: str
+    current: ScoresPoint
+
+class ScoresTimelineResponse(BaseModel):
+    spot: dict
+    scoring_version: str
+    timeline: List[ScoresPoint]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (None = última)")
+
+class TimelineDeltaResponse(BaseModel):
+    """
+    Cambios respecto de la versión `since`: aplicar = sacar `dropped`, reemplazar/agregar
+    `changed` por timestamp y ordenar por timestamp. La hora actual es la primera.
+    """
+    delta: Literal[True] = True
+    since: str = Field(..., description="Versión de la que parte el diff")
+    version: str = Field(..., description="Versión resultante (ETag de la timeline completa)")
+    changed: List[Union[TimelinePoint, CompactTimelinePoint, ScoresPoint]] = Field(default_factory=list, description="Horas nuevas o modificadas")
+    dropped: List[str] = Field(default_factory=list, description="Timestamps que ya no están (horas pasadas)")
+    catalog_version: Optional[str] = Field(None, description="Sólo en modo compacto")
+    scenarios: Dict[str, ScenarioNarrative] = Field(default_factory=dict, description="Modo compacto: escenarios de las horas cambiadas")
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (el mismo que en la respuesta completa)")
+
+# ==================== Dashboard ====================
+
+class DashboardResponse(BaseModel):
+    """Arranque de la app en un viaje: spot más cercano + condiciones actuales + timeline"""
+    nearest: NearestSpotResponse
+    analyze: Union[AnalyzeResponse, CompactAnalyzeResponse, ScoresAnalyzeResponse] = Field(..., description="Mismo cuerpo que /analyze")
+    timeline: Union[TimelineResponse, CompactTimelineResponse, ScoresTimelineResponse] = Field(..., description="Mismo cuerpo que /timeline")
+    etags: Dict[str, str] = Field(..., description="ETags de analyze y timeline (para If-None-Match o since en los endpoints individuales)")
+
+# ==================== Offline Bundle ====================
+
+class BundleResults(BaseModel):
+    """Resultados de un grupo de perfiles, un valor por hora"""
+    seguridad: List[int]
+    esfuerzo: List[int]
+    disfrute: List[int]
+    flags: List[int] = Field(..., description="Bitmask de flags (ver flag_bits)")
+    scenario: List[int] = Field(..., description="Índice en scenario_ids")
+
+class SemanticExtra(BaseModel):
+    flag: str
+    field: Literal["risk", "strategy"] = Field(..., description="Se agrega a risk_desc o strategy_desc")
+    text: str = Field(..., description="Texto a agregar; {uv:.1f} = índice UV de la hora")
+
+class OfflineBundleResponse(BaseModel):
+    """
+    Todo lo necesario para resolver cualquier perfil offline:
+    resultados = results[profiles[código]][campo][hora]; categorías con
+    category_thresholds; semántica = scenarios[scenario_ids[i]] + semantic_extras
+    """
+    version: str
+    format: int
+    spot_id: str
+    spot: dict
+    generated_at: str
+    valid_until: Optional[str] = Field(None, description="Fin de la última hora incluida (UTC)")
+    scoring_version: str
+    catalog_version: str
+    epochs: List[int] = Field(..., description="Inicio de cada hora (epoch UTC)")
+    weather: Dict[str, List[Optional[float]]] = Field(..., description="Columnas del HourlyFrame")
+    tide: List[str]
+    confidence: List[Literal["alta", "media", "baja"]]
+    category_thresholds: Dict[str, int] = Field(..., description="score >= alto -> alto; >= medio -> medio; si no, bajo")
+    flag_bits: Dict[str, int]
+    semantic_extras: List[SemanticExtra]
+    scenario_ids: List[str]
+    profiles: Dict[str, int] = Field(..., description="Código de perfil -> índice en results")
+    results: List[BundleResults]
+    scenarios: Dict[str, ScenarioNarrative]
+
+# ==================== Aggregated Timeline ====================
+
+class TimelineBucket(BaseModel):
+    """Resumen de un bloque de horas (3h o día local)"""
+    start: str = Field(..., description="Inicio del bloque (UTC)")
+    end: str = Field(..., description="Fin del bloque (UTC, exclusivo)")
+    label: str = Field(..., description="Fecha / hora local de inicio")
+    hours: int = Field(..., description="Horas con datos en el bloque")
+    scores_min: Scores
+    scores_max: Scores
+    worst_categories: Categories = Field(..., description="Peor caso: seguridad y disfrute mínimos, esfuerzo máximo")
+    flags: List[str] = Field(default_factory=list, description="Flags presentes en alguna hora")
+    scenario_ids: List[str] = Field(default_factory=list, description="Escenarios en orden de aparición")
+    worst_hour: str = Field(..., description="Hora de menor seguridad (UTC)")
+    wind_speed_max_kmh: Optional[float] = None
+    wave_height_max_m: Optional[float] = None
+    precipitation_total_mm: Optional[float] = None
+    uv_index_max: Optional[float] = None
+    temperature_min_c: Optional[float] = None
+    temperature_max_c: Optional[float] = None
+
+class AggregatedTimelineResponse(BaseModel):
+    spot: dict
+    scoring_version: str
+    resolution: Literal["3h", "daily"]
+    horizon_hours: int = Field(..., description="Horas de pronóstico efectivamente disponibles")
+    buckets: List[TimelineBucket]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (None = última)")
+
+# ==================== Spot Ranking ====================
+
+class RankedSpot(BaseModel):
+    rank: int = Field(..., description="Posición (1 = mejor)")
+    spot_id: str
+    name: str
+    lat: float
+    lon: float
+    distance_km: Optional[float] = Field(None, description="Distancia a la ubicación del usuario (si se pasó)")
+    timestamp: str = Field(..., description="Hora evaluada (UTC)")
+    scores: Scores
+    categories: Categories
+    flags: List[str] = Field(default_factory=list)
+    scenario_id: str
+    confidence: Literal["alta", "media", "baja"]
+
+class SpotRankingResponse(BaseModel):
+    profile: str = Field(..., description="Código compacto del perfil")
+    scoring_version: str
+    spots: List[RankedSpot] = Field(..., description="Seguridad (categoría) primero, después disfrute")
+    unavailable: List[str] = Field(default_factory=list, description="Spots sin datos en este momento")
+
+# ==================== Batch Analyze ====================
+
+class BatchAnalyzeItem(BaseModel):
+    spot_id: str
+    user: UserProfile
+    hour: int = Field(default=0, ge=0, le=MAX_HORIZON_HOURS - 1, description="Horas desde la actual (0 = ahora, hasta 7 días)")
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[BatchAnalyzeItem] = Field(..., min_length=1, max_length=500)
+
+class BatchAnalyzeResult(BaseModel):
+    spot_id: str
+    profile: str = Field(..., description="Código compacto del perfil")
+    hour: int
+    timestamp: Optional[str] = None
+    weather_ref: Optional[str] = Field(None, description="Clave en BatchAnalyzeResponse.weather")
+    result: Optional[EngineResult] = None
+    error: Optional[str] = Field(None, description="Motivo si el ítem no se pudo evaluar")
+
+class BatchAnalyzeResponse(BaseModel):
+    results: List[BatchAnalyzeResult] = Field(..., description="En el orden de los ítems pedidos")
+    weather: Dict[str, WeatherData] = Field(default_factory=dict, description="Clima por (spot, hora), sin repetir")
+    distinct_spots: int
+    distinct_evaluations: int
+
+# ==================== Risk Surface ====================
+
+class RiskSurfaceRequest(BaseModel):
+    spot_id: str
+    user: UserProfile
+    tide_state: Literal["rising", "falling", "high", "low"] = Field(default="rising", description="Estado de marea fijo para toda la grilla")
+    wind_steps: int = Field(default=60, ge=2, le=120, description="Cantidad de velocidades de viento")
+    direction_steps: int = Field(default=36, ge=4, le=72, description="Cantidad de direcciones de viento")
+    wave_steps: int = Field(default=30, ge=2, le=60, description="Cantidad de alturas de ola")
+    max_wind_kmh: float = Field(default=59.0, gt=0, le=120, description="Velocidad máxima de la grilla")
+    max_wave_m: float = Field(default=2.9, gt=0, le=8, description="Altura de ola máxima de la grilla")
+    wave_period_s: Optional[float] = Field(default=None, ge=0, description="Periodo de ola fijo (None = sin dato)")
+
+class RiskSurfaceResponse(BaseModel):
+    spot: dict
+    profile: str = Field(..., description="Código compacto del perfil")
+    tide_state: str
+    scoring_version: str
+    shape: List[int] = Field(..., description="Dimensiones [direcciones, vientos, olas]")
+    wind_speed_kmh: List[float] = Field(..., description="Eje de velocidades de viento")
+    wind_direction_deg: List[float] = Field(..., description="Eje de direcciones de viento")
+    wave_height_m: List[float] = Field(..., description="Eje de alturas de ola")
+    seguridad: List[int] = Field(..., description="Superficie aplanada [dirección][viento][ola]")
+    esfuerzo: List[int] = Field(..., description="Superficie aplanada [dirección][viento][ola]")
+    disfrute: List[int] = Field(..., description="Superficie aplanada [dirección][viento][ola]")
+    scenario_ids: List[str] = Field(..., description="Catálogo de escenarios indexado por 'scenario'")
+    scenario: List[int] = Field(..., description="Índice de escenario por celda")
+    seguridad_crossings: dict = Field(..., description="Viento [dirección][ola] donde seguridad baja a 'medio' / 'bajo'")
+
+# ==================== Session Windows ====================
+
+class WindowsRequest(BaseModel):
+    spot_id: str
+    user: UserProfile
+    duration_hours: int = Field(default=2, ge=1, le=12, description="Duración de la sesión en horas")
+    min_seguridad: int = Field(default=70, ge=0, le=100, description="Piso de seguridad para todas las horas de la ventana")
+    top_k: int = Field(default=3, ge=1, le=10, description="Cantidad máxima de ventanas a retornar")
+    horizon_hours: int = Field(default=MAX_HORIZON_HOURS, ge=1, le=MAX_HORIZON_HOURS, description="Horizonte de búsqueda en horas (hasta 7 días)")
+
+class SessionWindow(BaseModel):
+    start: str = Field(..., description="Inicio de la ventana (ISO UTC)")
+    end: str = Field(..., description="Fin de la ventana (ISO UTC)")
+    date_label: str = Field(..., description="Fecha local (ej: 2026-01-14)")
+    start_label: str = Field(..., description="Hora local de inicio (ej: 14:00)")
+    end_label: str = Field(..., description="Hora local de fin (ej: 16:00)")
+    disfrute_avg: float = Field(..., description="Disfrute promedio de la ventana")
+    esfuerzo_avg: float = Field(..., description="Esfuerzo promedio de la ventana")
+    seguridad_min: int = Field(..., description="Peor seguridad horaria de la ventana")
+    flags: List[str] = Field(default_factory=list, description="Flags presentes en alguna hora de la ventana")
+    scenario_ids: List[str] = Field(default_factory=list, description="Escenarios de la ventana, en orden de aparición")
+
+class WindowsResponse(BaseModel):
+    spot: dict
+    scoring_version: str
+    duration_hours: int
+    min_seguridad: int
+    horizon_hours: int = Field(..., description="Horas de pronóstico efectivamente analizadas")
+    windows: List[SessionWindow]
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import AnalyzeRequest, AnalyzeResponse, ExplanationRequest, ExplanationResponse, NearestSpotResponse, TimelineRequest, TimelineResponse, TimelinePoint
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
+from typing import Literal, Optional, Union
+from app.models.schemas import MAX_HORIZON_HOURS, Projection, AnalyzeRequest, DashboardResponse, OfflineBundleResponse, AnalyzeResponse, CompactAnalyzeResponse, ScoresAnalyzeResponse, ScoresTimelineResponse, ScoresPoint, BatchAnalyzeRequest, BatchAnalyzeResponse, ExplanationRequest, ExplanationResponse, NearestSpotResponse, SpotRankingResponse, TimelineRequest, TimelineResponse, TimelinePoint, AggregatedTimelineResponse, CompactTimelineResponse, CompactTimelinePoint, TimelineDeltaResponse, ScenarioCatalogResponse, ScenarioNarrative, RiskSurfaceRequest, RiskSurfaceResponse, WindowsRequest, WindowsResponse
 from app.config.spots import SPOTS
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from tenacity import RetryError
 from httpx import ConnectTimeout, ReadTimeout
-import math
+import time
 import logging
 import traceback
 
@@ -12,16 +13,103 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["api"])
 
+def _build_weather_service():
+    """
+    Arma el WeatherService con HybridWeatherProvider (Stormglass + OpenMeteo fallback + cache)
+    """
+    from app.services.hybrid_provider import HybridWeatherProvider
+    from app.services.stormglass_provider import StormglassProvider
+    from app.services.openmeteo_provider import OpenMeteoProvider
+    from app.services.openweather_provider import OpenWeatherProvider
+    from app.services.windy_provider import WindyProvider
+    from app.services.weather_service import WeatherService
+    from app.services.noaa_tides_provider import NOAATidesProvider
+    import os
+    
+    # Configurar providers
+    noaa_tides = NOAATidesProvider()
+    stormglass = StormglassProvider(tide_provider=noaa_tides) if os.getenv("STORMGLASS_API_KEY") else None
+    openweather = OpenWeatherProvider()
+    openmeteo = OpenMeteoProvider(tide_provider=noaa_tides)
+    windy = WindyProvider(tide_provider=noaa_tides)
+    
+    hybrid_provider = HybridWeatherProvider(
+        stormglass_provider=stormglass,
+        openweather_provider=openweather,
+        openmeteo_provider=openmeteo,
+        windy_provider=windy,
+        tide_provider=noaa_tides
+    )
+    return WeatherService(hybrid_provider)
+
+def _projection_mode(view: str, include_scenarios: bool) -> tuple:
+    """Parte de la clave de caché que depende de la proyección (vacía para "full")"""
+    if view == "compact":
+        return ("compact", include_scenarios)
+    if view == "scores":
+        return ("scores",)
+    return ()
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_conditions(request: AnalyzeRequest):
+def _analyze_entry(key, frame, spot_id: str, user, engine, view: str = "full", include_scenarios: bool = True):
+    """
+    Bytes de /analyze para la primera hora del frame (cacheados por clave)
+    Compartido por el endpoint y el push en vivo.
+    
+    La vista "scores" no arma el clima ni corre semántica/confianza.
+    """
+    from app.services import response_cache
+    from app.services.timeline_aggregation import score_points
+    
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    spot = SPOTS[spot_id]
+    spot_info = {"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]}
+    
+    if view == "scores":
+        response = ScoresAnalyzeResponse.model_validate({
+            "spot": spot_info,
+            "scoring_version": engine.model.version,
+            "current": score_points(frame[:1], spot_id, user, engine)[0]
+        })
+        return response_cache.put(key, response_cache.render_json(response.model_dump()))
+    
+    # Ejecutar motor determinístico (Layer A)
+    weather_data = frame.record(0)
+    result = engine.evaluate(weather_data, spot_id, user)
+    
+    # Validación única en el borde; los bytes quedan cacheados
+    payload = {
+        "spot": spot_info,
+        "weather": weather_data.to_dict(),
+        "result": result.to_dict(compact=view == "compact")
+    }
+    if view == "compact":
+        payload.update(_scenario_dictionary([payload], include_scenarios))
+        response = CompactAnalyzeResponse.model_validate(payload)
+    else:
+        response = AnalyzeResponse.model_validate(payload)
+    return response_cache.put(key, response_cache.render_json(response.model_dump()))
+
+@router.post("/analyze", response_model=Union[AnalyzeResponse, CompactAnalyzeResponse, ScoresAnalyzeResponse])
+async def analyze_conditions(
+    request: AnalyzeRequest,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
     """
     Analiza condiciones para un spot y usuario
     Usa datos reales de OpenMeteo + Motor determinístico
+    view: "full" (default), "compact" (scenario_id + catálogo) o "scores"
+    (sólo scores, categorías y flags; lo demás ni se calcula)
+    Responde 304 si If-None-Match coincide con el ETag (datos y modelo sin cambios)
     """
     # Validar spot existe
     if request.spot_id not in SPOTS:
@@ -30,47 +118,26 @@ async def analyze_conditions(request: AnalyzeRequest):
     spot = SPOTS[request.spot_id]
     
     try:
-        # Usar HybridWeatherProvider (Stormglass + OpenMeteo fallback + cache)
-        from app.services.hybrid_provider import HybridWeatherProvider
-        from app.services.stormglass_provider import StormglassProvider
-        from app.services.openmeteo_provider import OpenMeteoProvider
-        from app.services.openweather_provider import OpenWeatherProvider
-        from app.services.windy_provider import WindyProvider
-        from app.services.weather_service import WeatherService
-        from app.services.noaa_tides_provider import NOAATidesProvider
-        import os
-        
-        # Configurar providers
-        noaa_tides = NOAATidesProvider()
-        stormglass = StormglassProvider(tide_provider=noaa_tides) if os.getenv("STORMGLASS_API_KEY") else None
-        openweather = OpenWeatherProvider()
-        openmeteo = OpenMeteoProvider(tide_provider=noaa_tides)
-        windy = WindyProvider(tide_provider=noaa_tides)
-        
-        hybrid_provider = HybridWeatherProvider(
-            stormglass_provider=stormglass,
-            openweather_provider=openweather,
-            openmeteo_provider=openmeteo,
-            windy_provider=windy,
-            tide_provider=noaa_tides
-        )
-        weather_service = WeatherService(hybrid_provider)
-        
-        weather_data = await weather_service.get_current_conditions(
-            spot["lat"], 
-            spot["lon"]
-        )
-        
-        # Ejecutar motor determinístico (Layer A)
         from app.services.sensei_engine import SenseiEngine
+        from app.services.profile_codes import profile_code
+        from app.services import response_cache
+        
+        weather_service = _build_weather_service()
         engine = SenseiEngine()
-        result = engine.analyze(weather_data, request.spot_id, request.user)
         
-        return AnalyzeResponse(
-            spot={"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
-            weather=weather_data,
-            result=result
+        # Hora actual (vista de 1 hora del frame cacheado)
+        frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=1)
+        
+        key = response_cache.cache_key(
+            "analyze", request.spot_id, profile_code(request.user), engine.model.version, frame.data_version,
+            *_projection_mode(request.view, request.include_scenarios)
         )
+        etag = response_cache.etag_for(key)
+        if response_cache.etag_matches(if_none_match, etag):
+            return response_cache.not_modified(etag, accept_encoding, accept)
+        
+        entry = _analyze_entry(key, frame, request.spot_id, request.user, engine, request.view, request.include_scenarios)
+        return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
     except ValueError as e:
         logger.error(f"Error validating data: {e}")
         raise HTTPException(status_code=503, detail=str(e))
@@ -81,6 +148,146 @@ async def analyze_conditions(request: AnalyzeRequest):
         logger.error(f"Error in analyze_conditions: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+def _profile_from_query(request: Request, profile: str):
+    """
+    Perfil de un GET cacheable a partir del código compacto
+    
+    Returns:
+        (UserProfile, None) o (None, redirect 308) si el código no está en forma
+        canónica ('RBMC', ' rbmc'): una sola URL por perfil para los caches
+    """
+    from fastapi.responses import RedirectResponse
+    from app.services.profile_codes import parse_profile_code, profile_code
+    
+    try:
+        user = parse_profile_code(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    code = profile_code(user)
+    if code != profile:
+        return None, RedirectResponse(str(request.url.include_query_params(profile=code)), status_code=308)
+    return user, None
+
+def _freshness_headers(spot: dict) -> dict:
+    """
+    Cache-Control de los GET: fresco hasta que vence el frame cacheado del spot
+    (TTL del provider) o cambia la hora en curso, lo que llegue primero
+    """
+    from app.services import response_cache
+    from app.services.hourly_frame import HOUR_SECONDS
+    from app.services.hybrid_provider import data_expires_at, CACHE_TTL_MINUTES
+    
+    now = time.time()
+    expires_at = (now // HOUR_SECONDS + 1) * HOUR_SECONDS
+    data_expiry = data_expires_at(spot["lat"], spot["lon"])
+    if data_expiry is not None:
+        expires_at = min(expires_at, data_expiry.timestamp())
+    return {"Cache-Control": response_cache.cache_control(expires_at, CACHE_TTL_MINUTES * 60, now)}
+
+@router.get("/analyze", response_model=Union[AnalyzeResponse, CompactAnalyzeResponse, ScoresAnalyzeResponse])
+async def analyze_conditions_get(
+    request: Request,
+    spot_id: str,
+    profile: str,
+    view: Projection = "full",
+    include_scenarios: bool = True,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Igual que POST /analyze con el perfil como código compacto en la query
+    (ej: ?spot_id=varese&profile=rbmc), cacheable por navegador, service worker y CDN
+    """
+    user, redirect = _profile_from_query(request, profile)
+    if redirect is not None:
+        return redirect
+    
+    response = await analyze_conditions(
+        AnalyzeRequest(spot_id=spot_id, user=user, view=view, include_scenarios=include_scenarios),
+        if_none_match=if_none_match,
+        accept_encoding=accept_encoding,
+        accept=accept
+    )
+    response.headers.update(_freshness_headers(SPOTS[spot_id]))
+    return response
+
+async def refresh_live_spot(spot_id: str, profiles: list) -> dict:
+    """
+    Refresh del push en vivo: un frame por spot, una evaluación por perfil distinto
+    Retorna {perfil: (versión, evento SSE)} con los mismos bytes que /analyze.
+    """
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.profile_codes import parse_profile_code
+    from app.services import response_cache, live_updates
+    
+    spot = SPOTS[spot_id]
+    weather_service = _build_weather_service()
+    engine = SenseiEngine()
+    frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=1)
+    
+    events = {}
+    for code in profiles:
+        key = response_cache.cache_key("analyze", spot_id, code, engine.model.version, frame.data_version)
+        entry = _analyze_entry(key, frame, spot_id, parse_profile_code(code), engine)
+        events[code] = (entry.etag, live_updates.sse_event("analyze", entry.body, entry.etag))
+    return events
+
+@router.get("/live/{spot_id}")
+async def live_conditions(spot_id: str, profile: str):
+    """
+    Condiciones en vivo por Server-Sent Events (evento "analyze", mismo JSON que /analyze)
+    El primer evento es el estado actual; después llega uno cada vez que cambian los datos.
+    
+    Args:
+        profile: Código compacto del perfil (ej: 'rbmc')
+    """
+    from fastapi.responses import StreamingResponse
+    from app.services.profile_codes import parse_profile_code, profile_code
+    from app.services import live_updates
+    
+    if spot_id not in SPOTS:
+        raise HTTPException(status_code=404, detail=f"Spot '{spot_id}' no encontrado")
+    try:
+        code = profile_code(parse_profile_code(profile))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        version, first = (await refresh_live_spot(spot_id, [code]))[code]
+    except ValueError as e:
+        logger.error(f"Error fetching live data: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+    
+    try:
+        subscriber = live_updates.hub.subscribe(spot_id, code, version)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return StreamingResponse(
+        live_updates.stream(live_updates.hub, subscriber, first),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/analyze/batch", response_model=BatchAnalyzeResponse)
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Analiza muchos (spot, perfil, hora) de una vez (ej: una clase entera)
+    Un fetch por spot y una evaluación por combinación distinta; errores por ítem.
+    """
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.batch_analyze import analyze_batch as run_batch
+    from app.services import response_cache
+    
+    payload = await run_batch(_build_weather_service(), request.items, SenseiEngine())
+    # Validación única en el borde (sin re-validar por response_model)
+    response = BatchAnalyzeResponse.model_validate(payload)
+    return Response(content=response_cache.render_json(response.model_dump()), media_type=response_cache.JSON_MEDIA_TYPE)
+
 @router.post("/pedagogy/explain", response_model=ExplanationResponse)
 async def explain_conditions(request: ExplanationRequest):
     """
@@ -101,137 +308,829 @@ async def explain_conditions(request: ExplanationRequest):
         glossary_terms=[]  # TODO: Fase futura - extraer términos del glosario
     )
 
+def _nearest_spot(lat: float, lon: float) -> Optional[dict]:
+    """
+    Spot más cercano a las coordenadas (dict con la forma de NearestSpotResponse)
+    None si la ubicación está fuera del radio de toda región del catálogo.
+    """
+    from app.services.spot_index import get_index
+    
+    found = get_index().serving_spot(lat, lon)
+    if found is None:
+        return None
+    spot_id, distance = found
+    return {
+        "spot_id": spot_id,
+        "name": SPOTS[spot_id]["name"],
+        "distance_km": round(distance, 2)
+    }
+
 @router.get("/spots/nearest", response_model=NearestSpotResponse)
 async def get_nearest_spot(lat: float, lon: float):
     """
     Retorna el spot más cercano a las coordenadas dadas
+    (404 si están fuera del radio de las regiones del catálogo)
+    """
+    nearest = _nearest_spot(lat, lon)
+    if not nearest:
+        raise HTTPException(status_code=404, detail="No se encontraron spots cercanos")
+    
+    return NearestSpotResponse(**nearest)
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    lat: float,
+    lon: float,
+    profile: str,
+    view: Projection = "full",
+    include_scenarios: bool = True,
+    horizon_hours: int = Query(default=12, ge=1, le=72),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
     """
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calcula distancia en km usando fórmula haversine"""
-        R = 6371  # Radio de la Tierra en km
+    Arranque de la app en un solo viaje (en vez de /spots/nearest + /analyze + /timeline)
+    
+    Resuelve el spot más cercano y arma las condiciones actuales y la timeline
+    con un solo provider, un engine y una descarga del forecast. Los cuerpos de
+    "analyze" y "timeline" son los del caché de respuestas de esos endpoints
+    (y lo dejan cargado): se componen sin volver a serializar.
+    
+    Args:
+        profile: Código compacto del perfil (ej: 'rbmc')
+    """
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.profile_codes import profile_code
+    from app.services import response_cache
+    
+    user, redirect = _profile_from_query(request, profile)
+    if redirect is not None:
+        return redirect
+    
+    nearest = _nearest_spot(lat, lon)
+    if nearest is None:
+        raise HTTPException(status_code=404, detail="No se encontraron spots cercanos")
+    spot_id = nearest["spot_id"]
+    spot = SPOTS[spot_id]
+    
+    try:
+        weather_service = _build_weather_service()
+        engine = SenseiEngine()
+        
+        # Una descarga: la timeline llena el caché del provider y la hora actual sale de ahí
+        timeline_frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=horizon_hours)
+        current_frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=1)
         
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
+        # Mismas claves que /analyze y /timeline: comparten bytes cacheados y ETags
+        code = profile_code(user)
+        mode = _projection_mode(view, include_scenarios)
+        analyze_key = response_cache.cache_key("analyze", spot_id, code, engine.model.version, current_frame.data_version, *mode)
+        timeline_key = response_cache.cache_key("timeline", spot_id, code, engine.model.version, timeline_frame.data_version, *mode)
+        etag = response_cache.etag_for(("dashboard", nearest["distance_km"], analyze_key, timeline_key))
+        if response_cache.etag_matches(if_none_match, etag):
+            response = response_cache.not_modified(etag, accept_encoding, accept)
+            response.headers.update(_freshness_headers(spot))
+            return response
         
-        a = math.sin(delta_phi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        analyze_entry = _analyze_entry(analyze_key, current_frame, spot_id, user, engine, view, include_scenarios)
+        # Serie de historial de la /timeline equivalente (una sola página), para que sirva "since"
+        series = (spot_id, code, engine.model.version, horizon_hours, TimelineRequest.model_fields["page_size"].default, None, *mode)
+        timeline_entry = _timeline_entry(timeline_key, timeline_frame, spot_id, user, engine, view, include_scenarios, None, series)
         
-        return R * c
+        body = response_cache.render_json({
+            "nearest": nearest,
+            "analyze": response_cache.embed(analyze_entry),
+            "timeline": response_cache.embed(timeline_entry),
+            "etags": {"analyze": analyze_entry.etag, "timeline": timeline_entry.etag}
+        })
+        # Sin guardar en el caché de respuestas: depende de lat/lon y componerlo es concatenar bytes
+        entry = response_cache.CachedResponse(body=body, etag=etag, created_at=time.time())
+        return response_cache.json_response(entry, headers=_freshness_headers(spot), accept_encoding=accept_encoding, accept=accept)
+    except ValueError as e:
+        logger.error(f"Error fetching dashboard data: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+    except Exception as e:
+        logger.error(f"Error in get_dashboard: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/spots/ranking", response_model=SpotRankingResponse)
+async def get_spot_ranking(
+    profile: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    max_km: Optional[float] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Ranking de todos los spots para un perfil: ¿dónde remo ahora?
     
-    # Calcular distancia a todos los spots
-    nearest = None
-    min_distance = float('inf')
+    Args:
+        profile: Código compacto del perfil (ej: 'rbmc')
+        lat, lon: Ubicación del usuario (opcional, agrega distance_km)
+        max_km: Descarta spots más lejos que esto (requiere lat/lon)
+    """
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.profile_codes import parse_profile_code, profile_code
+    from app.services.spot_ranking import fetch_current_frames, rank_spots, filter_by_distance
+    from app.services import response_cache
     
-    for spot_id, spot_data in SPOTS.items():
-        distance = haversine_distance(lat, lon, spot_data["lat"], spot_data["lon"])
-        if distance < min_distance:
-            min_distance = distance
-            nearest = {
-                "spot_id": spot_id,
-                "name": spot_data["name"],
-                "distance_km": round(distance, 2)
-            }
+    try:
+        user = parse_profile_code(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if (lat is None) != (lon is None) or (max_km is not None and lat is None):
+        raise HTTPException(status_code=422, detail="lat y lon van juntos (y max_km los requiere)")
     
-    if not nearest:
-        raise ValueError("No se encontraron spots cercanos")
+    try:
+        weather_service = _build_weather_service()
+        engine = SenseiEngine()
+        code = profile_code(user)
+        
+        # Con max_km sólo se piden los spots dentro del radio (consulta al índice espacial)
+        if max_km is not None:
+            from app.services.spot_index import get_index
+            spot_ids = [spot_id for spot_id, _ in get_index().within(lat, lon, max_km)]
+            if not spot_ids:
+                return SpotRankingResponse(profile=code, scoring_version=engine.model.version, spots=[], unavailable=[])
+        else:
+            spot_ids = list(SPOTS)
+        frames, unavailable = await fetch_current_frames(weather_service, spot_ids)
+        if not frames:
+            raise ValueError("Weather service unavailable")
+        
+        location = (round(lat, 3), round(lon, 3), max_km) if lat is not None else ()
+        key = response_cache.cache_key(
+            "ranking", "*", code, engine.model.version,
+            ",".join(f"{spot_id}:{frame.data_version}" for spot_id, frame in sorted(frames.items())),
+            tuple(unavailable), *location
+        )
+        etag = response_cache.etag_for(key)
+        if response_cache.etag_matches(if_none_match, etag):
+            return response_cache.not_modified(etag, accept_encoding, accept)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return response_cache.json_response(cached, accept_encoding=accept_encoding, accept=accept)
+        
+        entries = rank_spots(frames, user, engine)
+        if lat is not None:
+            entries = filter_by_distance(entries, lat, lon, max_km)
+        
+        response = SpotRankingResponse.model_validate({
+            "profile": code,
+            "scoring_version": engine.model.version,
+            "spots": [{**entry, "rank": rank} for rank, entry in enumerate(entries, start=1)],
+            "unavailable": unavailable
+        })
+        entry = response_cache.put(key, response_cache.render_json(response.model_dump()))
+        return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
+    except ValueError as e:
+        logger.error(f"Error fetching ranking data: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+    except Exception as e:
+        logger.error(f"Error in get_spot_ranking: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+def _build_timeline_points(frame, spot_id: str, user, engine, view: str = "full") -> list:
+    """
+    Ensambla la timeline: ejecuta el engine para cada hora del frame
     
-    return NearestSpotResponse(**nearest)
+    El engine trabaja sobre tipos internos; los puntos salen como dicts con la
+    forma de TimelinePoint (CompactTimelinePoint / ScoresPoint según la vista)
+    y se validan una sola vez, al armar la respuesta.
+    Las etiquetas salen de los epochs del frame (hora Argentina, UTC-3).
+    """
+    if view == "scores":
+        from app.services.timeline_aggregation import score_points
+        return score_points(frame, spot_id, user, engine)
+    return list(_iter_timeline_points(frame, spot_id, user, engine, compact=view == "compact"))
+
+def _iter_timeline_points(frame, spot_id: str, user, engine, compact: bool = False):
+    """Generador: una hora por vez (provider -> engine -> dict), para la timeline y el streaming"""
+    hour_labels = frame.hour_labels()
+    epochs = frame.epochs.tolist()
+    
+    for record, hour_label, epoch in zip(frame.iter_records(), hour_labels, epochs):
+        result = engine.evaluate(record, spot_id, user, data_epoch=epoch)
+        
+        yield {
+            "timestamp": record.timestamp,
+            "hour_label": hour_label,
+            "result": result.to_dict(compact=compact),
+            "weather": record.to_dict()
+        }
 
-@router.post("/timeline", response_model=TimelineResponse)
-async def get_timeline(request: TimelineRequest):
+def _scenario_dictionary(points: list, include_scenarios: bool) -> dict:
+    """Modo compacto: versión del catálogo + escenarios usados por los puntos (deduplicados)"""
+    from app.services.scenario_catalog import catalog_payload
+    
+    used = list(dict.fromkeys(p["result"]["semantics"]["scenario_id"] for p in points))
+    catalog = catalog_payload(used if include_scenarios else [])
+    return {"catalog_version": catalog["version"], "scenarios": catalog["scenarios"]}
+
+def _timeline_entry(key, frame, spot_id: str, user, engine, view: str, include_scenarios: bool, next_cursor=None, series=None):
+    """
+    Bytes de la timeline completa (1h) del frame, cacheados por clave
+    Compartido por /timeline y /dashboard. Si se pasa `series`, los puntos
+    quedan en el historial para responder diffs (since) a quien tenga esta versión.
+    """
+    from app.services import response_cache, timeline_history
+    
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    timeline_points = _build_timeline_points(frame, spot_id, user, engine, view)
+    
+    if not timeline_points:
+        raise ValueError("No se pudieron obtener datos de pronóstico")
+    
+    if series is not None:
+        timeline_history.record(series, timeline_history.normalize_version(response_cache.etag_for(key)), timeline_points)
+    
+    spot = SPOTS[spot_id]
+    spot_info = {"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]}
+    if view == "scores":
+        payload = {
+            "spot": spot_info,
+            "scoring_version": engine.model.version,
+            "timeline": timeline_points,
+            "next_cursor": next_cursor
+        }
+    else:
+        payload = {
+            "spot": spot_info,
+            "weather": timeline_points[0]["weather"], # El primero es el actual
+            "current": timeline_points[0]["result"],
+            "timeline": timeline_points,
+            "next_cursor": next_cursor
+        }
+    
+    # Validación única en el borde; los bytes quedan cacheados
+    if view == "scores":
+        response = ScoresTimelineResponse.model_validate(payload)
+    elif view == "compact":
+        payload.update(_scenario_dictionary(timeline_points, include_scenarios))
+        response = CompactTimelineResponse.model_validate(payload)
+    else:
+        response = TimelineResponse.model_validate(payload)
+    return response_cache.put(key, response_cache.render_json(response.model_dump()))
+
+def _aggregated_timeline(request: TimelineRequest, frame, cursor_epoch, engine, if_none_match, accept_encoding, accept):
+    """Timeline en bloques de 3h / días (AggregatedTimelineResponse), paginada por bloques"""
+    from app.services.profile_codes import profile_code
+    from app.services import response_cache
+    from app.services.timeline_aggregation import aggregate_timeline, bucket_starts, page_bounds
+    
+    spot = SPOTS[request.spot_id]
+    
+    # Página de bloques -> rango de horas del frame (sólo se evalúan esas)
+    starts = bucket_starts(frame.epochs, request.resolution)
+    first, last, next_cursor = page_bounds(frame.epochs[starts], cursor_epoch, request.page_size)
+    if first >= len(starts):
+        raise HTTPException(status_code=404, detail="Cursor fuera del horizonte disponible")
+    page = frame[int(starts[first]):int(starts[last]) if last < len(starts) else len(frame)]
+    
+    key = response_cache.cache_key(
+        "timeline.agg", request.spot_id, profile_code(request.user), engine.model.version, page.data_version,
+        request.resolution
+    )
+    etag = response_cache.etag_for(key)
+    if response_cache.etag_matches(if_none_match, etag):
+        return response_cache.not_modified(etag, accept_encoding, accept)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.json_response(cached, accept_encoding=accept_encoding, accept=accept)
+    
+    response = AggregatedTimelineResponse.model_validate({
+        "spot": {"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
+        "scoring_version": engine.model.version,
+        "resolution": request.resolution,
+        "horizon_hours": len(frame),
+        "buckets": aggregate_timeline(page, request.spot_id, request.user, request.resolution, engine),
+        "next_cursor": next_cursor
+    })
+    entry = response_cache.put(key, response_cache.render_json(response.model_dump()))
+    return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
+
+@router.post(
+    "/timeline",
+    response_model=Union[TimelineResponse, CompactTimelineResponse, ScoresTimelineResponse, TimelineDeltaResponse, AggregatedTimelineResponse]
+)
+async def get_timeline(
+    request: TimelineRequest,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
     """
     Obtiene línea de tiempo semántica (forecast + engine)
+    
+    Modo compacto (view="compact" o compact=true): cada hora lleva sólo
+    scenario_id + agregados dinámicos; el texto de los escenarios va una vez en
+    "scenarios" o se toma del catálogo versionado (GET /api/scenarios/{catalog_version}).
+    view="scores": sólo scores, categorías y flags por hora (ScoresTimelineResponse),
+    con el evaluador vectorizado: sin clima, semántica ni confianza.
+    Responde 304 si If-None-Match coincide con el ETag.
+    
+    Incremental (since=<ETag que tiene el cliente>): si esa versión sigue en el
+    historial responde sólo las horas cambiadas/nuevas y las que se cayeron
+    (TimelineDeltaResponse); si no, la timeline completa.
+    
+    Horizonte largo: horizon_hours (hasta 7 días, lo que cubre el oleaje) paginado de a page_size
+    horas con cursor (next_cursor); resolution="3h" / "daily" responde bloques
+    agregados (AggregatedTimelineResponse) calculados sobre el frame cacheado.
     """
-    from app.models.schemas import TimelineResponse, TimelinePoint
+    from app.services.timeline_aggregation import parse_cursor, page_bounds
     
     if request.spot_id not in SPOTS:
         raise HTTPException(status_code=404, detail=f"Spot '{request.spot_id}' no encontrado")
+    try:
+        cursor_epoch = parse_cursor(request.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
     spot = SPOTS[request.spot_id]
     
     try:
-        # Usar HybridWeatherProvider (Stormglass + OpenMeteo fallback + cache)
-        from app.services.hybrid_provider import HybridWeatherProvider
-        from app.services.stormglass_provider import StormglassProvider
-        from app.services.openmeteo_provider import OpenMeteoProvider
-        from app.services.openweather_provider import OpenWeatherProvider
-        from app.services.windy_provider import WindyProvider
-        from app.services.weather_service import WeatherService
-        from app.services.noaa_tides_provider import NOAATidesProvider
         from app.services.sensei_engine import SenseiEngine
-        import os
-        
-        # Configurar providers
-        noaa_tides = NOAATidesProvider()
-        stormglass = StormglassProvider(tide_provider=noaa_tides) if os.getenv("STORMGLASS_API_KEY") else None
-        openweather = OpenWeatherProvider()
-        openmeteo = OpenMeteoProvider(tide_provider=noaa_tides)
-        windy = WindyProvider(tide_provider=noaa_tides)
-        
-        hybrid_provider = HybridWeatherProvider(
-            stormglass_provider=stormglass,
-            openweather_provider=openweather,
-            openmeteo_provider=openmeteo,
-            windy_provider=windy,
-            tide_provider=noaa_tides
-        )
-        weather_service = WeatherService(hybrid_provider)
+        from app.services.profile_codes import profile_code
+        from app.services import response_cache, timeline_history
+        
+        weather_service = _build_weather_service()
         engine = SenseiEngine()
         
-        # Obtener forecast 12hs
-        forecast = await weather_service.get_forecast(spot["lat"], spot["lon"], hours=12)
+        # Obtener forecast del horizonte pedido (12hs por defecto)
+        frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=request.horizon_hours)
+        
+        if request.resolution != "1h":
+            return _aggregated_timeline(request, frame, cursor_epoch, engine, if_none_match, accept_encoding, accept)
         
-        timeline_points = []
+        # Página de horas (vista, sin copia)
+        start, stop, next_cursor = page_bounds(frame.epochs, cursor_epoch, request.page_size)
+        if request.cursor is not None and start >= len(frame):
+            raise HTTPException(status_code=404, detail="Cursor fuera del horizonte disponible")
+        if start > 0 or stop < len(frame):
+            frame = frame[start:stop]
         
-        for wd in forecast:
-            # Ejecutar engine para cada hora
-            result = engine.analyze(wd, request.spot_id, request.user)
+        # Mismos datos + mismo perfil + mismo modelo = mismos bytes
+        view = request.projection
+        mode = _projection_mode(view, request.include_scenarios)
+        code = profile_code(request.user)
+        series = (request.spot_id, code, engine.model.version, request.horizon_hours, request.page_size, request.cursor, *mode)
+        key = response_cache.cache_key("timeline", request.spot_id, code, engine.model.version, frame.data_version, *mode)
+        etag = response_cache.etag_for(key)
+        if response_cache.etag_matches(if_none_match, etag):
+            return response_cache.not_modified(etag, accept_encoding, accept)
+        
+        # Incremental: diff contra una versión que el cliente ya tiene
+        since = timeline_history.normalize_version(request.since) if request.since else None
+        previous = timeline_history.get(series, since) if since else None
+        if previous is not None:
+            delta_key = key + ("since", since)
+            cached = response_cache.get(delta_key)
+            if cached is not None:
+                return response_cache.json_response(cached, accept_encoding=accept_encoding, accept=accept)
+            
+            version = timeline_history.normalize_version(etag)
+            latest = timeline_history.get(series, version)
+            if latest is None:
+                points = _build_timeline_points(frame, request.spot_id, request.user, engine, view)
+                timeline_history.record(series, version, points)
+                latest = timeline_history.get(series, version)
             
-            # Formatear hora
-            # Formatear hora en zona horaria Argentina
+            changed, dropped = timeline_history.diff(previous, latest)
+            payload = {
+                "since": since, "version": version, "changed": changed, "dropped": dropped,
+                "next_cursor": next_cursor
+            }
+            if view == "compact":
+                payload.update(_scenario_dictionary(changed, request.include_scenarios))
+            response = TimelineDeltaResponse.model_validate(payload)
+            entry = response_cache.put(delta_key, response_cache.render_json(response.model_dump()))
+            return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
+        
+        entry = _timeline_entry(
+            key, frame, request.spot_id, request.user, engine, view, request.include_scenarios, next_cursor, series
+        )
+        return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
+    except ValueError as e:
+        logger.error(f"Error fetching timeline data: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get(
+    "/timeline",
+    response_model=Union[TimelineResponse, CompactTimelineResponse, ScoresTimelineResponse, AggregatedTimelineResponse]
+)
+async def get_timeline_get(
+    request: Request,
+    spot_id: str,
+    profile: str,
+    view: Projection = "full",
+    include_scenarios: bool = True,
+    horizon_hours: int = Query(default=12, ge=1, le=MAX_HORIZON_HOURS),
+    resolution: Literal["1h", "3h", "daily"] = "1h",
+    page_size: int = Query(default=72, ge=1, le=MAX_HORIZON_HOURS),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Igual que POST /timeline con el perfil como código compacto en la query
+    (ej: ?spot_id=varese&profile=rbmc&view=compact), cacheable por navegador,
+    service worker y CDN. Sin "since": los diffs son por cliente.
+    """
+    user, redirect = _profile_from_query(request, profile)
+    if redirect is not None:
+        return redirect
+    
+    response = await get_timeline(
+        TimelineRequest(
+            spot_id=spot_id, user=user, view=view, include_scenarios=include_scenarios,
+            horizon_hours=horizon_hours, resolution=resolution, page_size=page_size, cursor=cursor
+        ),
+        if_none_match=if_none_match,
+        accept_encoding=accept_encoding,
+        accept=accept
+    )
+    response.headers.update(_freshness_headers(SPOTS[spot_id]))
+    return response
+
+def _ndjson_timeline(key, header: dict, points, view: str, include_scenarios: bool):
+    """
+    Líneas NDJSON de la timeline: header, luego cada hora apenas se evalúa
+    
+    En modo compacto cada escenario se emite (una vez) justo antes de la primera
+    hora que lo usa. Al terminar, el cuerpo completo queda en el caché de respuestas.
+    """
+    from app.services import response_cache
+    from app.services.scenario_catalog import catalog_payload
+    
+    compact = view == "compact"
+    point_model = {"compact": CompactTimelinePoint, "scores": ScoresPoint}.get(view, TimelinePoint)
+    lines = [response_cache.render_json(header) + b"\n"]
+    yield lines[0]
+    
+    sent_scenarios = set()
+    for point in points:
+        if compact and include_scenarios:
+            scenario_id = point["result"]["semantics"]["scenario_id"]
+            if scenario_id not in sent_scenarios:
+                sent_scenarios.add(scenario_id)
+                narrative = catalog_payload([scenario_id])["scenarios"][scenario_id]
+                line = response_cache.render_json({
+                    "type": "scenario", "id": scenario_id,
+                    "scenario": ScenarioNarrative.model_validate(narrative).model_dump()
+                }) + b"\n"
+                lines.append(line)
+                yield line
+        
+        # Validación en el borde, hora por hora
+        line = response_cache.render_json({"type": "hour", "point": point_model.model_validate(point).model_dump()}) + b"\n"
+        lines.append(line)
+        yield line
+    
+    response_cache.put(key, b"".join(lines))
+
+@router.post("/timeline/stream")
+async def stream_timeline(
+    request: TimelineRequest,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None)
+):
+    """
+    Timeline en streaming (NDJSON, una línea JSON por evento)
+    
+    Primero {"type": "header"} con el spot, después {"type": "hour"} empezando por
+    la hora actual, a medida que el engine evalúa cada una. Mismos datos que
+    /timeline (también acepta view/compact y horizon_hours): todo el horizonte en
+    un solo stream, sin paginado; "since" no aplica y la resolución es 1h.
+    """
+    from fastapi.responses import StreamingResponse
+    
+    if request.spot_id not in SPOTS:
+        raise HTTPException(status_code=404, detail=f"Spot '{request.spot_id}' no encontrado")
+    if request.resolution != "1h":
+        raise HTTPException(status_code=422, detail="El streaming sólo admite resolution='1h'")
+    
+    spot = SPOTS[request.spot_id]
+    
+    try:
+        from app.services.sensei_engine import SenseiEngine
+        from app.services.profile_codes import profile_code
+        from app.services.scenario_catalog import CATALOG_VERSION
+        from app.services import response_cache
+        
+        weather_service = _build_weather_service()
+        engine = SenseiEngine()
+        
+        frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=request.horizon_hours)
+        if not len(frame):
+            raise ValueError("No se pudieron obtener datos de pronóstico")
+        
+        view = request.projection
+        mode = _projection_mode(view, request.include_scenarios)
+        key = response_cache.cache_key(
+            "timeline.ndjson", request.spot_id, profile_code(request.user), engine.model.version, frame.data_version, *mode
+        )
+        etag = response_cache.etag_for(key)
+        if response_cache.etag_matches(if_none_match, etag):
+            return response_cache.not_modified(etag, accept_encoding)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return response_cache.json_response(
+                cached, accept_encoding=accept_encoding, media_type=response_cache.NDJSON_MEDIA_TYPE
+            )
+        
+        header = {
+            "type": "header",
+            "spot": {"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
+            "scoring_version": engine.model.version,
+            "hours": len(frame)
+        }
+        if view == "compact":
+            header["catalog_version"] = CATALOG_VERSION
+        
+        # La vista scores sale entera del evaluador vectorizado (sin costo por hora que escalonar)
+        if view == "scores":
+            points = _build_timeline_points(frame, request.spot_id, request.user, engine, view)
+        else:
+            points = _iter_timeline_points(frame, request.spot_id, request.user, engine, compact=view == "compact")
+        return StreamingResponse(
+            _ndjson_timeline(key, header, points, view, request.include_scenarios),
+            media_type=response_cache.NDJSON_MEDIA_TYPE,
+            headers={"ETag": etag, "Vary": "Accept-Encoding"}
+        )
+    except ValueError as e:
+        logger.error(f"Error fetching timeline data: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+
+def _bundle_entry(spot_id: str, frame, engine):
+    """Bundle offline del frame (se genera una vez por versión)"""
+    from app.services import offline_bundle, response_cache
+    
+    version = offline_bundle.bundle_version(spot_id, engine.model.version, frame.data_version)
+    entry = offline_bundle.get(spot_id, version)
+    if entry is None:
+        response = OfflineBundleResponse.model_validate(offline_bundle.build_bundle(frame, spot_id, version, engine))
+        entry = offline_bundle.put(spot_id, version, response_cache.render_json(response.model_dump()), time.time())
+    return entry
+
+async def refresh_cluster_cells():
+    """Modo cluster: refresca (contra upstream) las celdas de los spots de este nodo antes de que venzan"""
+    weather_service = _build_weather_service()
+    locations = [(spot["lat"], spot["lon"]) for spot in SPOTS.values()]
+    refreshed = await weather_service.provider.refresh_owned(locations)
+    if refreshed:
+        logger.info(f"🔗 Cluster: {refreshed} celdas refrescadas por este nodo")
+
+async def refresh_bundles():
+    """
+    Refresh de background del modo publisher: regenera el bundle offline de cada
+    spot si cambiaron los datos y lo publica como snapshot estático
+    (BUNDLE_REFRESH_CONCURRENCY spots a la vez)
+    """
+    import asyncio
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.offline_bundle import BUNDLE_HOURS, BUNDLE_REFRESH_CONCURRENCY
+    from app.services.hourly_frame import HOUR_SECONDS, TIMESTAMP_FORMAT
+    from app.services import snapshot_publisher
+    
+    weather_service = _build_weather_service()
+    engine = SenseiEngine()
+    semaphore = asyncio.Semaphore(BUNDLE_REFRESH_CONCURRENCY)
+    
+    async def refresh_spot(spot_id: str, spot: dict):
+        async with semaphore:
             try:
-                # 1. Parsear timestamp (asumimos que viene en ISO8601 UTC Z o +00:00 desde el provider)
-                ts = datetime.fromisoformat(wd.timestamp.replace('Z', '+00:00'))
-                
-                # 2. Asegurar que sea aware (UTC)
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-                
-                # 3. Convertir a Argentina (UTC-3)
-                argentina_offset = timedelta(hours=-3)
-                ts_local = ts.astimezone(timezone(argentina_offset))
-                    
-                # 4. Mostrar hora en punto (XX:00)
-                label = ts_local.strftime("%H:00")
+                frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=BUNDLE_HOURS)
+                if not len(frame):
+                    return
+                entry = _bundle_entry(spot_id, frame, engine)
+                valid_until = datetime.fromtimestamp(int(frame.epochs[-1]) + HOUR_SECONDS, timezone.utc).strftime(TIMESTAMP_FORMAT)
+                snapshot_publisher.publish(spot_id, entry.etag.strip('"'), entry, valid_until)
             except Exception as e:
-                logger.error(f"Error formatting time {wd.timestamp}: {e}")
-                label = "--:--"
-                
-            timeline_points.append(TimelinePoint(
-                timestamp=wd.timestamp,
-                hour_label=label,
-                result=result,
-                weather=wd
-            ))
-            
-        if not timeline_points:
+                logger.warning(f"Bundle offline falló para {spot_id}: {e}")
+    
+    await asyncio.gather(*(refresh_spot(spot_id, spot) for spot_id, spot in list(SPOTS.items())))
+
+@router.get("/bundle/{spot_id}", response_model=OfflineBundleResponse)
+async def get_offline_bundle(
+    spot_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Bundle offline vigente del spot: próximas 48 h de clima + resultados de los
+    54 perfiles + catálogo de escenarios, para resolver cualquier perfil en el
+    cliente sin conexión. Content-Location apunta a la URL inmutable de la versión.
+    """
+    from app.services.sensei_engine import SenseiEngine
+    from app.services import offline_bundle, response_cache
+    
+    if spot_id not in SPOTS:
+        raise HTTPException(status_code=404, detail=f"Spot '{spot_id}' no encontrado")
+    spot = SPOTS[spot_id]
+    
+    try:
+        weather_service = _build_weather_service()
+        engine = SenseiEngine()
+        frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=offline_bundle.BUNDLE_HOURS)
+        if not len(frame):
             raise ValueError("No se pudieron obtener datos de pronóstico")
-            
-        return TimelineResponse(
+        
+        version = offline_bundle.bundle_version(spot_id, engine.model.version, frame.data_version)
+        headers = {**_freshness_headers(spot), "Content-Location": f"/api/bundle/{spot_id}/{version}"}
+        if response_cache.etag_matches(if_none_match, f'"{version}"'):
+            response = response_cache.not_modified(f'"{version}"', accept_encoding, accept)
+            response.headers.update(headers)
+            return response
+        
+        entry = _bundle_entry(spot_id, frame, engine)
+        return response_cache.json_response(entry, headers=headers, accept_encoding=accept_encoding, accept=accept)
+    except ValueError as e:
+        logger.error(f"Error building offline bundle: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (RetryError, ConnectTimeout, ReadTimeout) as e:
+        logger.error(f"Upstream API error: {e}")
+        raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
+
+@router.get("/bundle/{spot_id}/{version}", response_model=OfflineBundleResponse)
+async def get_offline_bundle_version(
+    spot_id: str,
+    version: str,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """Una versión puntual del bundle (contenido inmutable: cacheable para siempre)"""
+    from app.services import offline_bundle, response_cache
+    
+    entry = offline_bundle.get(spot_id, version)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Bundle '{version}' no disponible para '{spot_id}'")
+    if response_cache.etag_matches(if_none_match, entry.etag):
+        return response_cache.not_modified(entry.etag, accept_encoding, accept)
+    return response_cache.json_response(
+        entry, headers={"Cache-Control": "public, max-age=31536000, immutable"}, accept_encoding=accept_encoding, accept=accept
+    )
+
+@router.get("/scenarios", response_model=ScenarioCatalogResponse)
+async def get_scenario_catalog(
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Catálogo de escenarios (texto fijo) con su versión
+    Para cachear del lado del cliente: pedir /scenarios/{version}, que no cambia nunca.
+    """
+    from app.services import response_cache
+    
+    entry = _scenario_catalog_entry()
+    if response_cache.etag_matches(if_none_match, entry.etag):
+        return response_cache.not_modified(entry.etag, accept_encoding, accept)
+    return response_cache.json_response(entry, headers={"Cache-Control": "public, max-age=3600"}, accept_encoding=accept_encoding, accept=accept)
+
+@router.get("/scenarios/{version}", response_model=ScenarioCatalogResponse)
+async def get_scenario_catalog_version(
+    version: str,
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Catálogo de escenarios de una versión puntual (inmutable, cacheable por un año)
+    """
+    from app.services.scenario_catalog import CATALOG_VERSION
+    from app.services import response_cache
+    
+    if version != CATALOG_VERSION:
+        raise HTTPException(status_code=404, detail=f"Versión de catálogo '{version}' no disponible (actual: {CATALOG_VERSION})")
+    
+    entry = _scenario_catalog_entry()
+    return response_cache.json_response(
+        entry, headers={"Cache-Control": "public, max-age=31536000, immutable"}, accept_encoding=accept_encoding, accept=accept
+    )
+
+def _scenario_catalog_entry():
+    """Bytes del catálogo completo (se serializa una vez por versión)"""
+    from app.services.scenario_catalog import CATALOG_VERSION, catalog_payload
+    from app.services import response_cache
+    
+    key = ("scenarios", CATALOG_VERSION)
+    entry = response_cache.get(key)
+    if entry is None:
+        response = ScenarioCatalogResponse.model_validate(catalog_payload())
+        entry = response_cache.put(key, response_cache.render_json(response.model_dump()))
+    return entry
+
+@router.post("/surface", response_model=RiskSurfaceResponse)
+async def get_risk_surface(request: RiskSurfaceRequest):
+    """
+    Superficie de riesgo: evalúa el motor sobre una grilla viento × dirección × olas
+    Material de coaching - muestra dónde cada perfil cruza de "alto" a "bajo"
+    """
+    if request.spot_id not in SPOTS:
+        raise HTTPException(status_code=404, detail=f"Spot '{request.spot_id}' no encontrado")
+    
+    from app.services.risk_surface import build_risk_surface
+    
+    return build_risk_surface(
+        request.spot_id,
+        request.user,
+        request.tide_state,
+        wind_steps=request.wind_steps,
+        direction_steps=request.direction_steps,
+        wave_steps=request.wave_steps,
+        max_wind_kmh=request.max_wind_kmh,
+        max_wave_m=request.max_wave_m,
+        wave_period_s=request.wave_period_s
+    )
+
+@router.post("/windows", response_model=WindowsResponse)
+async def find_windows(
+    request: WindowsRequest,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Busca las mejores ventanas de sesión en todo el horizonte del pronóstico
+    (máximo disfrute con seguridad por encima del piso en todas las horas)
+    """
+    if request.spot_id not in SPOTS:
+        raise HTTPException(status_code=404, detail=f"Spot '{request.spot_id}' no encontrado")
+    
+    spot = SPOTS[request.spot_id]
+    
+    try:
+        from app.services.sensei_engine import SenseiEngine
+        from app.services.session_windows import find_session_windows
+        from app.services.profile_codes import profile_code
+        from app.services import response_cache
+        
+        weather_service = _build_weather_service()
+        engine = SenseiEngine()
+        
+        frame = await weather_service.get_forecast_frame(spot["lat"], spot["lon"], hours=request.horizon_hours)
+        if not len(frame):
+            raise ValueError("No se pudieron obtener datos de pronóstico")
+        
+        key = response_cache.cache_key(
+            "windows", request.spot_id, profile_code(request.user), engine.model.version, frame.data_version,
+            request.duration_hours, request.min_seguridad, request.top_k
+        )
+        etag = response_cache.etag_for(key)
+        if response_cache.etag_matches(if_none_match, etag):
+            return response_cache.not_modified(etag, accept_encoding, accept)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return response_cache.json_response(cached, accept_encoding=accept_encoding, accept=accept)
+        
+        windows = find_session_windows(
+            frame.epochs, frame.columns, frame.tide,
+            request.spot_id,
+            request.user,
+            duration_hours=request.duration_hours,
+            min_seguridad=request.min_seguridad,
+            top_k=request.top_k,
+            engine=engine
+        )
+        
+        response = WindowsResponse(
             spot={"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
-            weather=forecast[0], # El primero es el actual
-            current=timeline_points[0].result,
-            timeline=timeline_points
+            scoring_version=engine.model.version,
+            duration_hours=request.duration_hours,
+            min_seguridad=request.min_seguridad,
+            horizon_hours=len(frame),
+            windows=windows
         )
+        entry = response_cache.put(key, response_cache.render_json(response.model_dump()))
+        return response_cache.json_response(entry, accept_encoding=accept_encoding, accept=accept)
     except ValueError as e:
-        logger.error(f"Error fetching timeline data: {e}")
+        logger.error(f"Error fetching windows data: {e}")
         raise HTTPException(status_code=503, detail=str(e))
     except (RetryError, ConnectTimeout, ReadTimeout) as e:
         logger.error(f"Upstream API error: {e}")
         raise HTTPException(status_code=503, detail="Weather service unavailable (upstream timeout)")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.get("/debug/openmeteo")
 async def debug_openmeteo():
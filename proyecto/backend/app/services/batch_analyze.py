@@ -0,0 +1,72 @@
+"""
+Análisis en lote: muchos pares (spot, perfil, hora) en un solo pedido
+
+Pensado para escuelas que evalúan una clase entera antes de la sesión. El costo
+escala con los spots y perfiles DISTINTOS, no con la cantidad de ítems:
+- un frame por spot (pedidos en paralelo, con el horizonte que necesite la
+  hora más lejana pedida para ese spot)
+- una evaluación del engine por (spot, perfil, hora) distinto
+- el clima de cada (spot, hora) va una sola vez en la respuesta
+
+Los errores son por ítem (spot inexistente, sin datos, hora fuera del
+horizonte): un ítem malo no tira abajo el lote.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from app.config.spots import SPOTS
+from app.services.profile_codes import profile_code
+from app.services.sensei_engine import SenseiEngine
+
+
+async def analyze_batch(weather_service, items: List, engine: Optional[SenseiEngine] = None) -> dict:
+    """
+    Evalúa los ítems (BatchAnalyzeItem) y arma el dict con la forma de BatchAnalyzeResponse
+    Los resultados salen en el orden de los ítems.
+    """
+    engine = engine or SenseiEngine()
+
+    # 1. Un frame por spot, con el horizonte de la hora más lejana pedida
+    horizons: Dict[str, int] = {}
+    for item in items:
+        if item.spot_id in SPOTS:
+            horizons[item.spot_id] = max(horizons.get(item.spot_id, 0), item.hour + 1)
+    spot_ids = list(horizons)
+    fetched = await asyncio.gather(
+        *(weather_service.get_forecast_frame(SPOTS[s]["lat"], SPOTS[s]["lon"], hours=horizons[s]) for s in spot_ids),
+        return_exceptions=True
+    )
+    frames = {spot_id: frame for spot_id, frame in zip(spot_ids, fetched) if not isinstance(frame, BaseException)}
+
+    # 2. Una evaluación por (spot, perfil, hora) distinto
+    evaluations: Dict[Tuple[str, str, int], dict] = {}
+    weather: Dict[str, dict] = {}
+    results = []
+    for item in items:
+        code = profile_code(item.user)
+        entry = {"spot_id": item.spot_id, "profile": code, "hour": item.hour}
+        frame = frames.get(item.spot_id)
+        if item.spot_id not in SPOTS:
+            entry["error"] = f"Spot '{item.spot_id}' no encontrado"
+        elif frame is None:
+            entry["error"] = "Weather service unavailable"
+        elif item.hour >= len(frame):
+            entry["error"] = f"Hora {item.hour} fuera del horizonte disponible ({len(frame)} horas)"
+        else:
+            weather_ref = f"{item.spot_id}@{item.hour}"
+            if weather_ref not in weather:
+                weather[weather_ref] = frame.record(item.hour)
+            record = weather[weather_ref]
+            key = (item.spot_id, code, item.hour)
+            if key not in evaluations:
+                evaluations[key] = engine.evaluate(record, item.spot_id, item.user).to_dict()
+            entry.update(timestamp=record.timestamp, weather_ref=weather_ref, result=evaluations[key])
+        results.append(entry)
+
+    return {
+        "results": results,
+        "weather": {ref: record.to_dict() for ref, record in weather.items()},
+        "distinct_spots": len(frames),
+        "distinct_evaluations": len(evaluations),
+    }
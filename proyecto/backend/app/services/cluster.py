@@ -0,0 +1,303 @@
+"""
+Modo cluster: varios nodos del backend, una sola descarga upstream por ubicación
+
+Con CLUSTER_STORE configurado (ej: sqlite:////data/rumbo-cluster.db, un
+archivo visible para todos los nodos) las celdas de ubicación (la clave de
+caché del HybridWeatherProvider: lat/lon redondeados) se reparten entre los
+nodos con hashing consistente:
+
+- el DUEÑO de una celda es el único que la refresca contra OpenMeteo y publica
+  el frame en el store compartido (bytes crudos: misma data_version en todos
+  los nodos, así que también coinciden las claves de caché y los ETags)
+- los demás nodos leen el frame del store; sólo si no hay uno vigente (dueño
+  caído, celda recién reasignada) lo descargan ellos y lo publican
+- la membresía son heartbeats en el store: un nodo que deja de latir sale del
+  anillo a los MEMBER_TTL_SECONDS y sus celdas se reparten entre los demás
+  (con RING_VNODES nodos virtuales por nodo sólo se mueve ~1/N de las celdas)
+
+El store es pluggable: STORE_BACKENDS mapea el esquema de la URL a la clase
+(SharedStore). Sin CLUSTER_STORE todo sigue como un nodo solo.
+
+Las llamadas al store son bloqueantes (sqlite3 espera hasta 5 s si otro nodo
+tiene el archivo tomado): desde el camino de los pedidos corren en un thread
+(asyncio.to_thread) para que un escritor lento no frene el event loop.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from app.services.hourly_frame import HourlyFrame
+
+logger = logging.getLogger(__name__)
+
+RING_VNODES = 64
+HEARTBEAT_SECONDS = 10
+MEMBER_TTL_SECONDS = 30  # sin heartbeat por más que esto, el nodo sale del anillo
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Anillo de hashing consistente con nodos virtuales"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = RING_VNODES):
+        self.nodes: Tuple[str, ...] = tuple(sorted(set(nodes)))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+
+class SharedStore:
+    """Store compartido entre nodos: frames publicados + heartbeats de membresía"""
+
+    def get_frame(self, key: str) -> Optional[Tuple[float, int, bytes]]:
+        """(descargado en epoch, horas pedidas, frame serializado) o None"""
+        raise NotImplementedError
+
+    def frame_info(self, key: str) -> Optional[Tuple[float, int]]:
+        """(descargado en epoch, horas pedidas) sin leer el frame"""
+        raise NotImplementedError
+
+    def put_frame(self, key: str, fetched_at: float, hours: int, payload: bytes):
+        raise NotImplementedError
+
+    def heartbeat(self, node_id: str, now: float):
+        raise NotImplementedError
+
+    def members(self, since: float) -> List[str]:
+        """Nodos con heartbeat posterior a `since`"""
+        raise NotImplementedError
+
+    def leave(self, node_id: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteStore(SharedStore):
+    """
+    Store en un archivo SQLite (WAL: lectores concurrentes mientras el dueño escribe)
+    Se usa desde threads (asyncio.to_thread): una conexión, serializada con un lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frames (key TEXT PRIMARY KEY, fetched_at REAL, hours INTEGER, payload BLOB)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS members (node_id TEXT PRIMARY KEY, seen_at REAL)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def get_frame(self, key: str) -> Optional[Tuple[float, int, bytes]]:
+        with self._lock:
+            return self._conn.execute("SELECT fetched_at, hours, payload FROM frames WHERE key = ?", (key,)).fetchone()
+
+    def frame_info(self, key: str) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            return self._conn.execute("SELECT fetched_at, hours FROM frames WHERE key = ?", (key,)).fetchone()
+
+    def put_frame(self, key: str, fetched_at: float, hours: int, payload: bytes):
+        # Nunca pisar un frame más nuevo (ej: dos nodos publicando durante un rebalanceo)
+        self._execute(
+            "INSERT INTO frames (key, fetched_at, hours, payload) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET fetched_at = excluded.fetched_at, hours = excluded.hours, "
+            "payload = excluded.payload WHERE excluded.fetched_at >= frames.fetched_at",
+            (key, fetched_at, hours, payload)
+        )
+
+    def heartbeat(self, node_id: str, now: float):
+        self._execute(
+            "INSERT INTO members (node_id, seen_at) VALUES (?, ?) "
+            "ON CONFLICT(node_id) DO UPDATE SET seen_at = excluded.seen_at",
+            (node_id, now)
+        )
+
+    def members(self, since: float) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT node_id FROM members WHERE seen_at > ?", (since,))]
+
+    def leave(self, node_id: str):
+        self._execute("DELETE FROM members WHERE node_id = ?", (node_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Esquema de CLUSTER_STORE -> backend (agregar acá otros stores compartidos)
+STORE_BACKENDS: Dict[str, Type[SharedStore]] = {"sqlite": SQLiteStore}
+
+_store: Optional[SharedStore] = None
+_node_id: Optional[str] = None
+_ring: HashRing = HashRing(())
+_task: Optional[asyncio.Task] = None
+
+
+def open_store(url: str) -> SharedStore:
+    """URL del store (ej: sqlite:///ruta/relativa.db, sqlite:////ruta/absoluta.db)"""
+    scheme, sep, location = url.partition(":///")
+    backend = STORE_BACKENDS.get(scheme)
+    if not sep or backend is None:
+        raise ValueError(f"CLUSTER_STORE inválido: '{url}' (esquemas: {list(STORE_BACKENDS)})")
+    return backend(location)
+
+
+def configure(url: Optional[str] = None, node_id: Optional[str] = None) -> bool:
+    """
+    Activa el modo cluster (por default desde CLUSTER_STORE / CLUSTER_NODE_ID)
+    Retorna False si no hay store configurado.
+    """
+    global _store, _node_id
+    url = url or os.getenv("CLUSTER_STORE")
+    if not url:
+        return False
+    _store = open_store(url)
+    _node_id = node_id or os.getenv("CLUSTER_NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+    # Al arrancar, antes de atender pedidos: acá sí se puede esperar al store
+    _update_ring(_live_nodes(_store, _node_id, time.time()))
+    return True
+
+
+def enabled() -> bool:
+    return _store is not None
+
+
+def node_id() -> Optional[str]:
+    return _node_id
+
+
+def members() -> Tuple[str, ...]:
+    return _ring.nodes
+
+
+def _live_nodes(store: SharedStore, node: str, now: float) -> set:
+    """Heartbeat propio + nodos con heartbeat vigente (bloqueante)"""
+    store.heartbeat(node, now)
+    return set(store.members(now - MEMBER_TTL_SECONDS)) | {node}
+
+
+async def sync_membership(now: Optional[float] = None) -> bool:
+    """Heartbeat propio + anillo con los nodos vivos. Retorna True si la membresía cambió."""
+    if _store is None:
+        return False
+    now = time.time() if now is None else now
+    return _update_ring(await asyncio.to_thread(_live_nodes, _store, _node_id, now))
+
+
+def _update_ring(nodes: set) -> bool:
+    global _ring
+    if tuple(sorted(nodes)) == _ring.nodes:
+        return False
+    previous = _ring.nodes
+    _ring = HashRing(nodes)
+    logger.info(f"🔗 Cluster: {len(previous)} -> {len(nodes)} nodos {list(_ring.nodes)}")
+    return True
+
+
+def owner(key: str) -> Optional[str]:
+    return _ring.owner(key)
+
+
+def is_owner(key: str) -> bool:
+    """Sin cluster cada nodo es dueño de todo"""
+    return _store is None or _ring.owner(key) == _node_id
+
+
+async def get_frame(key: str) -> Optional[Tuple[datetime, HourlyFrame, int]]:
+    """Frame publicado para la celda: (momento de la descarga, frame, horas pedidas)"""
+    if _store is None:
+        return None
+    try:
+        row = await asyncio.to_thread(_store.get_frame, key)
+    except Exception as e:
+        logger.warning(f"Store del cluster no disponible: {e}")
+        return None
+    if row is None:
+        return None
+    fetched_at, hours, payload = row
+    return datetime.fromtimestamp(fetched_at, timezone.utc), HourlyFrame.from_bytes(payload), hours
+
+
+async def frame_info(key: str) -> Optional[Tuple[datetime, int]]:
+    """(momento de la descarga, horas pedidas) del frame publicado, sin deserializarlo"""
+    if _store is None:
+        return None
+    try:
+        row = await asyncio.to_thread(_store.frame_info, key)
+    except Exception as e:
+        logger.warning(f"Store del cluster no disponible: {e}")
+        return None
+    if row is None:
+        return None
+    return datetime.fromtimestamp(row[0], timezone.utc), row[1]
+
+
+async def put_frame(key: str, fetched_at: datetime, hours: int, frame: HourlyFrame):
+    if _store is None:
+        return
+    try:
+        await asyncio.to_thread(_store.put_frame, key, fetched_at.timestamp(), hours, frame.to_bytes())
+    except Exception as e:
+        logger.warning(f"No se pudo publicar el frame {key} en el store del cluster: {e}")
+
+
+async def run(refresh: Callable[[], Awaitable[None]], interval: float = HEARTBEAT_SECONDS):
+    """Heartbeat + membresía + refresh de las celdas propias por vencer, cada `interval`"""
+    while True:
+        try:
+            await sync_membership()
+            await refresh()
+        except Exception as e:
+            logger.warning(f"Ciclo del cluster falló: {e}")
+        await asyncio.sleep(interval)
+
+
+def start(refresh: Callable[[], Awaitable[None]], interval: float = HEARTBEAT_SECONDS):
+    global _task
+    if _store is not None and (_task is None or _task.done()):
+        _task = asyncio.create_task(run(refresh, interval))
+
+
+async def stop():
+    """Sale del anillo (los demás nodos rebalancean sin esperar el TTL)"""
+    global _task, _store, _ring
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    if _store is not None:
+        try:
+            await asyncio.to_thread(_store.leave, _node_id)
+        except Exception:
+            pass
+        _store.close()
+        _store = None
+        _ring = HashRing(())
@@ -0,0 +1,329 @@
+"""
+HourlyFrame - representación interna canónica del pronóstico
+
+Columnar: tiempos como epoch int64 (segundos UTC) + un array float64 por
+variable, con NaN como máscara de dato faltante (None). Los providers parsean
+la respuesta upstream UNA vez a este formato; la hora actual se busca por
+búsqueda binaria y las horas se materializan (WeatherRecord para el engine,
+WeatherData en el borde de la API) sólo cuando se devuelven.
+
+Slicing (frame[a:b], from_current) retorna vistas de los mismos arrays:
+cortar una timeline no copia datos.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+from app.models.internal import WeatherRecord, WindRecord, WaveRecord, AtmosphereRecord, TideRecord
+from app.models.schemas import WeatherData
+
+HOUR_SECONDS = 3600
+
+# Variables (mismos nombres que espera SenseiEngine.analyze_arrays)
+FIELDS = (
+    "wind_speed_kmh",
+    "wind_direction_deg",
+    "wave_height_m",
+    "wave_period_s",
+    "wave_direction_deg",
+    "temperature_c",
+    "precipitation_mm",
+    "cloud_cover_pct",
+    "uv_index",
+    "visibility_km",
+    "weather_code",
+)
+
+# Variables que WeatherData expone como enteros
+INT_FIELDS = frozenset({"wind_direction_deg", "wave_direction_deg", "cloud_cover_pct", "weather_code"})
+
+# Formato de timestamp que expone la API (el mismo que devolvía OpenMeteo)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+TIDE_DTYPE = "<U7"  # rising / falling / high / low
+
+
+def _has_zone(time_str: str) -> bool:
+    return time_str.endswith("Z") or "+" in time_str or time_str.rfind("-") > 7
+
+
+def parse_epochs(times: Sequence[str]) -> np.ndarray:
+    """
+    Timestamps ISO (UTC) a epoch en segundos
+
+    Camino rápido: numpy parsea "YYYY-MM-DDTHH:MM" (sin zona, como pide la API
+    con timezone=UTC) vectorizado. Si vienen con zona ("Z", "+00:00") se
+    parsean uno a uno.
+    """
+    if len(times) and not _has_zone(times[0]):
+        try:
+            return np.array(times, dtype="datetime64[s]").astype(np.int64)
+        except ValueError:
+            pass
+    epochs = []
+    for time_str in times:
+        ts = datetime.fromisoformat(time_str.replace("Z", "+00:00"))
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        epochs.append(int(ts.timestamp()))
+    return np.array(epochs, dtype=np.int64)
+
+
+def column_from_list(values: Optional[list], n: int, divisor: float = 1.0) -> np.ndarray:
+    """
+    Lista upstream (con None) a array float64 de largo n, alineado por posición
+
+    Si la lista es más corta (ej: Marine API tiene menos días) se completa con NaN.
+    """
+    column = np.full(n, np.nan)
+    if values:
+        values = np.array(values[:n], dtype=float)
+        column[:len(values)] = values if divisor == 1.0 else values / divisor
+    return column
+
+
+def current_hour_epoch() -> int:
+    """Epoch de la hora UTC en curso (truncada a la hora)"""
+    now = int(datetime.now(timezone.utc).timestamp())
+    return now - now % HOUR_SECONDS
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if value != value else float(value)  # NaN -> None
+
+
+def _optional_int(value: float) -> Optional[int]:
+    return None if value != value else int(value)
+
+
+def _make_record(c: Dict[str, float], tide_state: str, timestamp: str, provider: str) -> WeatherRecord:
+    return WeatherRecord(
+        wind=WindRecord(
+            speed_kmh=_optional(c["wind_speed_kmh"]),
+            direction_deg=_optional_int(c["wind_direction_deg"])
+        ),
+        waves=WaveRecord(
+            height_m=_optional(c["wave_height_m"]),
+            period_s=_optional(c["wave_period_s"]),
+            direction_deg=_optional_int(c["wave_direction_deg"])
+        ),
+        atmosphere=AtmosphereRecord(
+            temperature_c=_optional(c["temperature_c"]),
+            precipitation_mm=_optional(c["precipitation_mm"]),
+            cloud_cover_pct=_optional_int(c["cloud_cover_pct"]),
+            uv_index=_optional(c["uv_index"]),
+            visibility_km=_optional(c["visibility_km"]),
+            weather_code=_optional_int(c["weather_code"])
+        ),
+        tide=TideRecord(state=tide_state),
+        timestamp=timestamp,
+        provider=provider
+    )
+
+
+class HourlyFrame:
+    """
+    Pronóstico horario en formato columnar
+
+    Attributes:
+        epochs: int64 (segundos UTC), ordenados
+        columns: float64 por variable de FIELDS (NaN = sin dato)
+        tide: estado de marea por hora
+        provider: proveedor de origen
+    """
+
+    __slots__ = ("epochs", "columns", "tide", "provider", "_data_version", "_parent")
+
+    def __init__(self, epochs: np.ndarray, columns: Dict[str, np.ndarray], tide: np.ndarray, provider: str):
+        self.epochs = epochs
+        self.columns = columns
+        self.tide = tide
+        self.provider = provider
+        self._data_version: Optional[str] = None
+        # Para slices: (frame original, inicio, fin) - la versión se deriva del original
+        self._parent: Optional[tuple] = None
+
+    @classmethod
+    def from_weather_data(cls, forecast: List[WeatherData], provider: Optional[str] = None) -> "HourlyFrame":
+        """Adaptador para providers que producen listas de WeatherData (o WeatherRecord)"""
+        def values(getter):
+            out = np.empty(len(forecast))
+            for i, wd in enumerate(forecast):
+                value = getter(wd)
+                out[i] = np.nan if value is None else value
+            return out
+
+        def atmosphere(name):
+            return values(lambda wd: getattr(wd.atmosphere, name) if wd.atmosphere else None)
+
+        columns = {
+            "wind_speed_kmh": values(lambda wd: wd.wind.speed_kmh),
+            "wind_direction_deg": values(lambda wd: wd.wind.direction_deg),
+            "wave_height_m": values(lambda wd: wd.waves.height_m),
+            "wave_period_s": values(lambda wd: wd.waves.period_s),
+            "wave_direction_deg": values(lambda wd: wd.waves.direction_deg),
+            "temperature_c": atmosphere("temperature_c"),
+            "precipitation_mm": atmosphere("precipitation_mm"),
+            "cloud_cover_pct": atmosphere("cloud_cover_pct"),
+            "uv_index": atmosphere("uv_index"),
+            "visibility_km": atmosphere("visibility_km"),
+            "weather_code": atmosphere("weather_code"),
+        }
+        epochs = parse_epochs([wd.timestamp for wd in forecast])
+        tide = np.array([wd.tide.state for wd in forecast], dtype=TIDE_DTYPE)
+        if provider is None:
+            provider = forecast[0].provider if forecast else "unknown"
+        return cls(epochs, columns, tide, provider)
+
+    # ==================== Acceso ====================
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __getitem__(self, index: slice) -> "HourlyFrame":
+        """Slice de horas (vistas, sin copia)"""
+        if not isinstance(index, slice):
+            raise TypeError("HourlyFrame sólo admite slices; usar weather(i) para una hora")
+        view = HourlyFrame(
+            self.epochs[index],
+            {name: column[index] for name, column in self.columns.items()},
+            self.tide[index],
+            self.provider
+        )
+        view._parent = (self, *index.indices(len(self.epochs)))
+        return view
+
+    @property
+    def data_version(self) -> str:
+        """
+        Hash del contenido (horas, variables, marea y proveedor)
+
+        Mismo contenido -> misma versión, sin importar cuándo se descargó: sirve
+        de clave para cachear respuestas derivadas del frame. Se calcula una vez
+        por frame (los frames no se modifican); un slice usa la versión del
+        frame original + el rango, sin volver a hashear.
+        """
+        if self._data_version is None and self._parent is not None:
+            parent, start, stop, step = self._parent
+            self._data_version = f"{parent.data_version}:{start}:{stop}:{step}"
+        if self._data_version is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(self.provider.encode())
+            digest.update(np.ascontiguousarray(self.epochs).tobytes())
+            for name in sorted(self.columns):
+                digest.update(name.encode())
+                digest.update(np.ascontiguousarray(self.columns[name]).tobytes())
+            digest.update(np.ascontiguousarray(self.tide).tobytes())
+            self._data_version = digest.hexdigest()
+        return self._data_version
+
+    def missing(self, name: str) -> np.ndarray:
+        """Máscara de horas sin dato para una variable"""
+        return np.isnan(self.columns[name])
+
+    def current_index(self, now_epoch: Optional[int] = None) -> int:
+        """
+        Índice de la primera hora >= la hora UTC en curso (búsqueda binaria)
+        Si todas las horas ya pasaron, retorna la última.
+        """
+        if len(self.epochs) == 0:
+            return 0
+        now_epoch = current_hour_epoch() if now_epoch is None else now_epoch
+        idx = int(np.searchsorted(self.epochs, now_epoch, side="left"))
+        return min(idx, len(self.epochs) - 1)
+
+    def from_current(self, hours: int) -> "HourlyFrame":
+        """Las próximas `hours` horas desde la actual (vista)"""
+        start = self.current_index()
+        return self[start:start + hours]
+
+    def covers(self, hours: int) -> bool:
+        """¿Quedan al menos `hours` horas desde la actual?"""
+        return len(self.epochs) - self.current_index() >= hours
+
+    # ==================== Materialización ====================
+
+    def timestamp(self, i: int) -> str:
+        return datetime.fromtimestamp(int(self.epochs[i]), timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+    def timestamps(self) -> List[str]:
+        """Todos los timestamps en TIMESTAMP_FORMAT (vectorizado)"""
+        minutes = np.datetime_as_string(self.epochs.astype("datetime64[s]"), unit="m")
+        return [f"{ts}Z" for ts in minutes.tolist()]
+
+    def hour_labels(self, utc_offset_hours: int = -3) -> List[str]:
+        """Etiquetas "HH:00" en hora local (default Argentina, UTC-3) sin parsear strings"""
+        hours = (self.epochs // HOUR_SECONDS + utc_offset_hours) % 24
+        return [f"{h:02d}:00" for h in hours.tolist()]
+
+    def record(self, i: int) -> WeatherRecord:
+        """Hora i como WeatherRecord (tipo interno, sin validación)"""
+        values = {name: column[i] for name, column in self.columns.items()}
+        return _make_record(values, str(self.tide[i]), self.timestamp(i), self.provider)
+
+    def records(self) -> List[WeatherRecord]:
+        """Todas las horas como WeatherRecord (una sola conversión por columna)"""
+        return list(self.iter_records())
+
+    def iter_records(self) -> Iterator[WeatherRecord]:
+        """Como records() pero de a una hora (para streaming)"""
+        columns = {name: column.tolist() for name, column in self.columns.items()}
+        tides = self.tide.tolist()
+        timestamps = self.timestamps()
+        for i in range(len(timestamps)):
+            yield _make_record({name: values[i] for name, values in columns.items()}, tides[i], timestamps[i], self.provider)
+
+    def weather(self, i: int) -> WeatherData:
+        """Materializa la hora i como WeatherData (para la respuesta)"""
+        return self.record(i).to_schema()
+
+    def current(self) -> WeatherData:
+        """Condiciones de la hora actual"""
+        if len(self.epochs) == 0:
+            raise ValueError("HourlyFrame vacío")
+        return self.weather(self.current_index())
+
+    def to_weather_list(self) -> List[WeatherData]:
+        return [record.to_schema() for record in self.records()]
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arrays (para logs/benchmarks)"""
+        return self.epochs.nbytes + self.tide.nbytes + sum(c.nbytes for c in self.columns.values())
+
+    # ==================== Serialización ====================
+
+    def to_bytes(self) -> bytes:
+        """
+        Frame serializado con los bytes crudos de los arrays (para el store
+        compartido del modo cluster): from_bytes reconstruye un frame con la
+        misma data_version
+        """
+        header = orjson.dumps({"provider": self.provider, "n": len(self.epochs), "fields": list(self.columns)})
+        parts = [len(header).to_bytes(4, "little"), header, np.ascontiguousarray(self.epochs, dtype="<i8").tobytes()]
+        parts.extend(np.ascontiguousarray(column, dtype="<f8").tobytes() for column in self.columns.values())
+        parts.append(np.ascontiguousarray(self.tide, dtype=TIDE_DTYPE).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HourlyFrame":
+        """Inversa de to_bytes()"""
+        header_size = int.from_bytes(data[:4], "little")
+        header = orjson.loads(data[4:4 + header_size])
+        n = header["n"]
+        offset = 4 + header_size
+
+        def take(dtype: str) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=n, offset=offset).copy()
+            offset += array.nbytes
+            return array
+
+        epochs = take("<i8")
+        columns = {name: take("<f8") for name in header["fields"]}
+        tide = take(TIDE_DTYPE)
+        return cls(epochs, columns, tide, header["provider"])
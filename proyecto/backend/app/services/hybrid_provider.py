@@ -9,16 +9,32 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Optional, List, Tuple
 from app.services.weather_service import WeatherProvider
 from app.models.schemas import WeatherData
+from app.services.hourly_frame import HourlyFrame
+from app.services import cluster
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Cache global (en memoria) - 15 minutos es suficiente para datos meteorológicos
-_weather_cache: Dict[str, Tuple[datetime, WeatherData]] = {}
-_forecast_cache: Dict[str, Tuple[datetime, List[WeatherData]]] = {}
+# Un frame por ubicación: (momento, frame, horas pedidas). Condiciones actuales y
+# forecast salen del mismo frame; una consulta más larga invalida la entrada.
+_frame_cache: Dict[str, Tuple[datetime, HourlyFrame, int]] = {}
+
+# Descargas en curso por ubicación: (tarea, horas pedidas). Pedidos concurrentes
+# para la misma ubicación (ej: varios spots cercanos, o un burst en frío)
+# esperan la misma descarga en vez de pegarle N veces a OpenMeteo.
+_inflight: Dict[str, Tuple["asyncio.Task", int]] = {}
 
 CACHE_TTL_MINUTES = 15  # Datos frescos (OpenMeteo actualiza cada hora)
 
+# Horas que se piden cuando sólo se necesitan condiciones actuales
+# (deja el caché listo para la timeline)
+CONDITIONS_HOURS = 12
+
+# Modo cluster: el dueño de una celda la vuelve a descargar con este margen
+# antes de que venza, así los demás nodos siempre encuentran un frame vigente
+CLUSTER_REFRESH_MARGIN_MINUTES = 3
+
 
 class HybridWeatherProvider(WeatherProvider):
     """
@@ -36,7 +52,7 @@ class HybridWeatherProvider(WeatherProvider):
     
     def _get_cache_key(self, lat: float, lon: float) -> str:
         """Genera key de caché redondeando coordenadas"""
-        return f"{round(lat, 2)},{round(lon, 2)}"
+        return _location_key(lat, lon)
     
     def _is_cache_valid(self, cached_time: datetime) -> bool:
         """Verifica si el caché está fresco (15 min)"""
@@ -45,92 +61,136 @@ class HybridWeatherProvider(WeatherProvider):
         return age < timedelta(minutes=CACHE_TTL_MINUTES)
 
     async def get_conditions(self, lat: float, lon: float) -> WeatherData:
-        """Obtiene condiciones actuales - SOLO OpenMeteo con caché"""
+        """Obtiene condiciones actuales - hora actual del frame cacheado"""
+        frame = await self._get_frame(lat, lon, CONDITIONS_HOURS)
+        return frame.current()
+    
+    async def get_forecast(self, lat: float, lon: float, hours: int = 12) -> List[WeatherData]:
+        """Obtiene forecast - SOLO OpenMeteo con caché"""
+        frame = await self._get_frame(lat, lon, hours)
+        return frame.from_current(hours).to_weather_list()
+    
+    async def get_forecast_frame(self, lat: float, lon: float, hours: int = 12) -> HourlyFrame:
+        """Forecast columnar (frame completo cacheado; cortar con from_current)"""
+        return await self._get_frame(lat, lon, hours)
+    
+    async def _get_frame(self, lat: float, lon: float, hours: int) -> HourlyFrame:
+        """Frame de la ubicación - SOLO OpenMeteo con caché"""
         cache_key = self._get_cache_key(lat, lon)
+        # Nunca pedir menos que la timeline: /analyze deja el caché listo para ella
+        hours = max(hours, CONDITIONS_HOURS)
         
         # 1. Revisar caché PRIMERO (evita llamadas innecesarias)
-        if cache_key in _weather_cache:
-            cached_time, cached_data = _weather_cache[cache_key]
-            if self._is_cache_valid(cached_time):
+        if cache_key in _frame_cache:
+            cached_time, cached_frame, cached_hours = _frame_cache[cache_key]
+            if self._is_cache_valid(cached_time) and cached_hours >= hours:
                 age_sec = int((datetime.now(timezone.utc) - cached_time).total_seconds())
                 logger.info(f"📦 Cache HIT - datos de hace {age_sec}s")
-                return cached_data
+                return cached_frame
+        
+        # 2. Modo cluster: frame vigente publicado por el dueño de la celda
+        shared = await cluster.get_frame(cache_key)
+        if shared is not None and self._is_cache_valid(shared[0]) and shared[2] >= hours:
+            _frame_cache[cache_key] = shared
+            logger.info(f"🔗 Frame del cluster (dueño: {cluster.owner(cache_key)})")
+            return shared[1]
+        
+        # 3. Sumarse a una descarga en curso si alcanza
+        return await self._download(lat, lon, hours, cache_key)
+    
+    async def _download(self, lat: float, lon: float, hours: int, cache_key: str) -> HourlyFrame:
+        """Descarga compartida por ubicación (pedidos concurrentes esperan la misma tarea)"""
+        inflight = _inflight.get(cache_key)
+        if inflight is not None and inflight[1] >= hours:
+            return await asyncio.shield(inflight[0])
         
-        # 2. Llamar a OpenMeteo (única fuente)
+        task = asyncio.ensure_future(self._fetch_frame(lat, lon, hours, cache_key))
+        _inflight[cache_key] = (task, hours)
+        task.add_done_callback(lambda done: _forget_inflight(cache_key, done))
+        return await asyncio.shield(task)
+    
+    async def refresh_owned(self, locations: List[Tuple[float, float]]) -> int:
+        """
+        Modo cluster: vuelve a descargar las celdas de las que este nodo es dueño
+        y cuyo frame publicado está por vencer (o no existe). Retorna cuántas refrescó.
+        """
+        refreshed = 0
+        due = timedelta(minutes=CACHE_TTL_MINUTES - CLUSTER_REFRESH_MARGIN_MINUTES)
+        now = datetime.now(timezone.utc)
+        cells = {self._get_cache_key(lat, lon): (lat, lon) for lat, lon in locations}
+        for cache_key, (lat, lon) in cells.items():
+            if not cluster.is_owner(cache_key):
+                continue
+            info = await cluster.frame_info(cache_key)
+            if info is not None and now - info[0] < due:
+                continue
+            hours = max(info[1] if info is not None else 0, CONDITIONS_HOURS)
+            try:
+                await self._download(lat, lon, hours, cache_key)
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"Refresh de la celda {cache_key} falló: {e}")
+        return refreshed
+    
+    async def _fetch_frame(self, lat: float, lon: float, hours: int, cache_key: str) -> HourlyFrame:
+        """Descarga de OpenMeteo + validación + caché (con caché viejo de emergencia)"""
+        # Llamar a OpenMeteo (única fuente)
         if not self.openmeteo:
             raise ValueError("OpenMeteo provider no configurado")
         
         try:
             logger.info("🌐 Llamando a OpenMeteo API...")
-            data = await self.openmeteo.get_conditions(lat, lon)
+            frame = await self.openmeteo.get_forecast_frame(lat, lon, hours)
+            
+            if not len(frame):
+                raise ValueError("OpenMeteo no retornó datos de forecast")
             
             # Validar que recibimos datos reales
-            if data.wind.speed_kmh is None:
+            if frame.missing("wind_speed_kmh")[frame.current_index()]:
                 logger.error("❌ OpenMeteo retornó datos vacíos de viento")
                 raise ValueError("OpenMeteo no retornó datos de viento")
             
-            # Guardar en caché
-            _weather_cache[cache_key] = (datetime.now(timezone.utc), data)
-            logger.info(f"✅ OpenMeteo: Viento {data.wind.speed_kmh:.1f} km/h, Olas {data.waves.height_m:.2f}m")
-            return data
+            # Guardar en caché (y publicar para los demás nodos en modo cluster)
+            fetched_at = datetime.now(timezone.utc)
+            _frame_cache[cache_key] = (fetched_at, frame, hours)
+            await cluster.put_frame(cache_key, fetched_at, hours, frame)
+            logger.info(f"✅ OpenMeteo: {len(frame)} horas de datos ({frame.nbytes} bytes)")
+            return frame
             
         except Exception as e:
             logger.error(f"❌ OpenMeteo falló: {e}")
             
             # Si hay caché viejo, usarlo como emergencia
-            if cache_key in _weather_cache:
-                cached_time, cached_data = _weather_cache[cache_key]
+            if cache_key in _frame_cache:
+                cached_time, cached_frame, _ = _frame_cache[cache_key]
                 age_min = int((datetime.now(timezone.utc) - cached_time).total_seconds() / 60)
                 logger.warning(f"⚠️ Usando caché de emergencia (edad: {age_min} min)")
-                return cached_data
+                return cached_frame
             
             raise ValueError(f"OpenMeteo no disponible y no hay caché: {e}")
-    
-    async def get_forecast(self, lat: float, lon: float, hours: int = 12) -> List[WeatherData]:
-        """Obtiene forecast - SOLO OpenMeteo con caché"""
-        cache_key = f"{self._get_cache_key(lat, lon)}_forecast"
-        
-        # 1. Revisar caché PRIMERO
-        if cache_key in _forecast_cache:
-            cached_time, cached_data = _forecast_cache[cache_key]
-            if self._is_cache_valid(cached_time):
-                age_sec = int((datetime.now(timezone.utc) - cached_time).total_seconds())
-                logger.info(f"📦 Forecast cache HIT - datos de hace {age_sec}s")
-                return cached_data[:hours]
-        
-        # 2. Llamar a OpenMeteo (única fuente)
-        if not self.openmeteo:
-            raise ValueError("OpenMeteo provider no configurado")
-        
-        try:
-            logger.info("🌐 Llamando a OpenMeteo API (forecast)...")
-            data = await self.openmeteo.get_forecast(lat, lon, hours)
-            
-            if not data:
-                raise ValueError("OpenMeteo no retornó datos de forecast")
-            
-            # Guardar en caché
-            _forecast_cache[cache_key] = (datetime.now(timezone.utc), data)
-            logger.info(f"✅ OpenMeteo forecast: {len(data)} horas de datos")
-            return data
-            
-        except Exception as e:
-            logger.error(f"❌ OpenMeteo forecast falló: {e}")
-            
-            # Usar caché viejo como emergencia
-            if cache_key in _forecast_cache:
-                cached_time, cached_data = _forecast_cache[cache_key]
-                age_min = int((datetime.now(timezone.utc) - cached_time).total_seconds() / 60)
-                logger.warning(f"⚠️ Usando forecast en caché de emergencia (edad: {age_min} min)")
-                return cached_data[:hours]
-            
-            raise ValueError(f"OpenMeteo forecast no disponible y no hay caché: {e}")
+
+
+def _location_key(lat: float, lon: float) -> str:
+    return f"{round(lat, 2)},{round(lon, 2)}"
+
+
+def data_expires_at(lat: float, lon: float) -> Optional[datetime]:
+    """Cuándo vence el frame cacheado de la ubicación (None si no hay caché)"""
+    cached = _frame_cache.get(_location_key(lat, lon))
+    if cached is None:
+        return None
+    return cached[0] + timedelta(minutes=CACHE_TTL_MINUTES)
+
+
+def _forget_inflight(cache_key: str, task: "asyncio.Task"):
+    if _inflight.get(cache_key, (None,))[0] is task:
+        del _inflight[cache_key]
 
 
 def clear_cache():
     """Limpia caché (útil para testing)"""
-    global _weather_cache, _forecast_cache
-    _weather_cache = {}
-    _forecast_cache = {}
+    global _frame_cache, _inflight
+    _frame_cache = {}
+    _inflight = {}
     logger.info("🧹 Cache limpiado")
 
@@ -0,0 +1,172 @@
+"""
+Push de condiciones en vivo (Server-Sent Events)
+
+En vez de que cada app abierta haga polling a /api/analyze, el cliente se
+suscribe a (spot, perfil) y el servidor empuja un evento cuando cambian los
+datos. Un loop de refresh en background pide el frame de cada spot con
+suscriptores (el HybridWeatherProvider ya cachea upstream) y, si cambió la
+versión de datos, evalúa el engine UNA vez por perfil distinto suscripto y
+reparte los mismos bytes a todas las conexiones.
+
+Backpressure: cada suscriptor tiene una cola acotada. Como sólo importa el
+último estado, si un cliente no consume se descarta el evento más viejo
+(conflación); si acumula demasiados descartes se lo desconecta. Miles de
+clientes ociosos cuestan una tarea dormida cada uno.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+LIVE_REFRESH_SECONDS = 60       # Detecta datos nuevos y el cambio de hora
+LIVE_KEEPALIVE_SECONDS = 25     # Comentario SSE para que proxies no corten
+LIVE_QUEUE_SIZE = 4             # Eventos pendientes por suscriptor
+LIVE_SLOW_CONSUMER_DROPS = 3    # Descartes seguidos antes de desconectar (el cliente reconecta y se resincroniza)
+LIVE_MAX_SUBSCRIBERS = 10000
+
+# Ejecuta el engine para (spot, perfiles) y retorna {perfil: (versión, bytes del evento)}
+RefreshFn = Callable[[str, List[str]], Awaitable[Dict[str, Tuple[str, bytes]]]]
+
+
+def sse_event(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """Formatea un evento SSE (data en una sola línea: el JSON de orjson no tiene saltos)"""
+    head = f"event: {event}\n"
+    if event_id:
+        head += f"id: {event_id}\n"
+    return head.encode() + b"data: " + data + b"\n\n"
+
+
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+@dataclass(eq=False)
+class Subscriber:
+    spot_id: str
+    profile: str
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=LIVE_QUEUE_SIZE))
+    version: Optional[str] = None  # última versión entregada
+    dropped: int = 0
+    closed: bool = False
+
+    def offer(self, message: bytes):
+        """Encola sin bloquear; si la cola está llena descarta el evento más viejo"""
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped >= LIVE_SLOW_CONSUMER_DROPS:
+                self.closed = True
+        else:
+            self.dropped = 0
+        self.queue.put_nowait(message)
+
+
+class LiveHub:
+    """Suscripciones por (spot, perfil) + loop de refresh y fan-out"""
+
+    def __init__(self):
+        self._subscribers: Dict[Tuple[str, str], Set[Subscriber]] = {}
+        self._published: Dict[Tuple[str, str], str] = {}  # última versión enviada
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, spot_id: str, profile: str, version: Optional[str] = None) -> Subscriber:
+        """`version`: la del estado inicial que ya recibe el cliente (no se le reenvía)"""
+        if self.subscriber_count >= LIVE_MAX_SUBSCRIBERS:
+            raise RuntimeError("Demasiadas suscripciones en vivo")
+        subscriber = Subscriber(spot_id, profile, version=version)
+        self._subscribers.setdefault((spot_id, profile), set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        key = (subscriber.spot_id, subscriber.profile)
+        subs = self._subscribers.get(key)
+        if subs is None:
+            return
+        subs.discard(subscriber)
+        if not subs:
+            del self._subscribers[key]
+            self._published.pop(key, None)
+
+    def profiles_by_spot(self) -> Dict[str, List[str]]:
+        """Perfiles distintos suscriptos, agrupados por spot"""
+        spots: Dict[str, List[str]] = {}
+        for spot_id, profile in self._subscribers:
+            spots.setdefault(spot_id, []).append(profile)
+        return spots
+
+    def publish(self, spot_id: str, profile: str, version: str, message: bytes) -> int:
+        """Fan-out de los mismos bytes a todos los suscriptores; retorna a cuántos se envió"""
+        key = (spot_id, profile)
+        if self._published.get(key) == version:
+            return 0
+        self._published[key] = version
+        sent = 0
+        for subscriber in self._subscribers.get(key, ()):
+            if subscriber.version == version:
+                continue  # ya la tiene (ej: conectó con esta versión mientras corría el refresh)
+            subscriber.version = version
+            subscriber.offer(message)
+            sent += 1
+        return sent
+
+    async def refresh_once(self, refresh: RefreshFn) -> int:
+        """Una pasada: evalúa cada spot con suscriptores y publica lo que cambió"""
+        sent = 0
+        for spot_id, profiles in self.profiles_by_spot().items():
+            try:
+                events = await refresh(spot_id, profiles)
+            except Exception as e:
+                logger.warning(f"Live refresh falló para {spot_id}: {e}")
+                continue
+            for profile, (version, message) in events.items():
+                sent += self.publish(spot_id, profile, version, message)
+        return sent
+
+    async def run(self, refresh: RefreshFn, interval: float = LIVE_REFRESH_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_once(refresh)
+
+    def start(self, refresh: RefreshFn, interval: float = LIVE_REFRESH_SECONDS):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(refresh, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def stream(hub: LiveHub, subscriber: Subscriber, first: Optional[bytes] = None):
+    """
+    Generador SSE de un suscriptor: estado inicial, luego eventos y keepalives
+    Se desuscribe al desconectarse el cliente (cancelación) o por consumidor lento.
+    """
+    try:
+        if first is not None:
+            yield first
+        while not subscriber.closed:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield SSE_KEEPALIVE
+                continue
+            yield message
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+# Hub global del proceso
+hub = LiveHub()
@@ -0,0 +1,26 @@
+"""
+Codificación MessagePack de las respuestas JSON (negociada por Accept)
+
+Mismo contenido y mismos schemas que el JSON, en MessagePack estándar: un solo
+objeto, floats en 64 bits y sin tipos de extensión. Cualquier decoder sirve
+tal cual (ej: msgpack.unpackb en Python, decode de @msgpack/msgpack en JS) y
+devuelve exactamente lo mismo que parsear el JSON.
+"""
+
+from typing import Any
+
+import msgpack
+import orjson
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def encode(payload: Any) -> bytes:
+    """Payload (dict/list JSON) -> MessagePack"""
+    return msgpack.packb(payload)
+
+
+def encode_json(body: bytes) -> bytes:
+    """Bytes JSON ya renderizados (caché de respuestas) -> MessagePack"""
+    return encode(orjson.loads(body))
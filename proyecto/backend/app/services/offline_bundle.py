@@ -0,0 +1,155 @@
+"""
+Bundle offline de un spot (para la PWA sin señal en la playa)
+
+Un blob versionado con todo lo necesario para resolver CUALQUIER perfil en el
+cliente, sin volver a llamar al API:
+- las próximas BUNDLE_HOURS horas de clima en columnas (como el HourlyFrame)
+- los resultados del engine para los 54 perfiles, como enteros chicos: scores
+  0-100, flags en bitmask (bit de cada flag en "flag_bits") e índice de
+  escenario. Los perfiles con resultados idénticos comparten fila.
+- lo que no depende del perfil, una vez: confianza por hora, umbrales de
+  categoría, agregados dinámicos de la semántica y el catálogo de escenarios
+
+Se genera la primera vez que se pide cada versión (después queda en memoria)
+con el evaluador vectorizado: una pasada por perfil sobre el frame cacheado.
+En modo publisher un refresh de background además los regenera y publica
+para todos los spots (BUNDLE_REFRESH_CONCURRENCY spots a la vez).
+
+La versión es un hash de todo lo que determina el contenido; cada versión se
+sirve como blob inmutable en /api/bundle/{spot_id}/{version}. Por eso nada
+del cuerpo depende del reloj: generated_at y la frescura de la confianza se
+toman de la primera hora del frame (que es parte de su data_version).
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config.spots import SPOTS
+from app.services.hourly_frame import HourlyFrame, HOUR_SECONDS, TIMESTAMP_FORMAT
+from app.services.profile_codes import all_profiles, profile_code
+from app.services.response_cache import CachedResponse
+from app.services import spot_index
+from app.services.scenario_catalog import CATALOG_VERSION, SCENARIO_IDS, catalog_payload
+from app.services.sensei_engine import SEMANTIC_EXTRAS, SenseiEngine
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+BUNDLE_HOURS = 48
+BUNDLE_REFRESH_SECONDS = 15 * 60  # mismo TTL que el caché del provider
+BUNDLE_REFRESH_CONCURRENCY = 8      # spots descargando/evaluando a la vez en el refresh
+
+# Bundles generados: (spot, versión) -> bytes (acotado; las versiones viejas se caen)
+_bundles: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+BUNDLE_CACHE_MAX_ENTRIES = 64
+
+_task: Optional[asyncio.Task] = None
+
+
+def bundle_version(spot_id: str, scoring_version: str, data_version: str) -> str:
+    """Hash de todo lo que determina el bundle (se calcula antes de generarlo)"""
+    key = (BUNDLE_FORMAT, spot_id, spot_index.revision(spot_id), scoring_version, CATALOG_VERSION, data_version)
+    return hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+
+
+def _column(values: List[float]) -> List[Optional[float]]:
+    return [None if v != v else v for v in values]
+
+
+def build_bundle(frame: HourlyFrame, spot_id: str, version: str, engine: Optional[SenseiEngine] = None) -> dict:
+    """Dict con la forma de OfflineBundleResponse para las horas del frame"""
+    engine = engine or SenseiEngine()
+    spot = SPOTS[spot_id]
+    epochs = frame.epochs.tolist()
+
+    # Resultados por perfil (filas deduplicadas)
+    rows: List[dict] = []
+    row_index: Dict[tuple, int] = {}
+    profiles: Dict[str, int] = {}
+    for user in all_profiles():
+        arrays = engine.analyze_arrays(frame.columns, spot_id, user, frame.tide)
+        row = {name: arrays[name].tolist() for name in ("seguridad", "esfuerzo", "disfrute", "flags", "scenario")}
+        signature = tuple(tuple(values) for values in row.values())
+        if signature not in row_index:
+            row_index[signature] = len(rows)
+            rows.append(row)
+        profiles[profile_code(user)] = row_index[signature]
+
+    # La confianza no depende del perfil; la frescura se mide contra la primera hora
+    # del frame (no contra el reloj) para que el contenido sea función de la versión
+    as_of = epochs[0] if epochs else None
+    confidence = [
+        engine.confidence(record, data_epoch=epoch, now=as_of) for record, epoch in zip(frame.iter_records(), epochs)
+    ]
+
+    return {
+        "version": version,
+        "format": BUNDLE_FORMAT,
+        "spot_id": spot_id,
+        "spot": {"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
+        "generated_at": datetime.fromtimestamp(as_of, timezone.utc).strftime(TIMESTAMP_FORMAT) if epochs else None,
+        "valid_until": datetime.fromtimestamp(epochs[-1] + HOUR_SECONDS, timezone.utc).strftime(TIMESTAMP_FORMAT) if epochs else None,
+        "scoring_version": engine.model.version,
+        "catalog_version": CATALOG_VERSION,
+        "epochs": epochs,
+        "weather": {name: _column(column.tolist()) for name, column in frame.columns.items()},
+        "tide": frame.tide.tolist(),
+        "confidence": confidence,
+        "category_thresholds": {"medio": engine.model.category_medio, "alto": engine.model.category_alto},
+        "flag_bits": dict(engine.model.flag_bits),
+        "semantic_extras": [{"flag": flag, "field": field, "text": text} for flag, field, text in SEMANTIC_EXTRAS],
+        "scenario_ids": SCENARIO_IDS,
+        "profiles": profiles,
+        "results": rows,
+        "scenarios": catalog_payload()["scenarios"],
+    }
+
+
+def get(spot_id: str, version: str) -> Optional[CachedResponse]:
+    return _bundles.get((spot_id, version))
+
+
+def put(spot_id: str, version: str, body: bytes, created_at: float) -> CachedResponse:
+    entry = CachedResponse(body=body, etag=f'"{version}"', created_at=created_at)
+    _bundles[(spot_id, version)] = entry
+    _bundles.move_to_end((spot_id, version))
+    while len(_bundles) > BUNDLE_CACHE_MAX_ENTRIES:
+        _bundles.popitem(last=False)
+    return entry
+
+
+async def run(refresh: Callable[[], Awaitable[None]], interval: float = BUNDLE_REFRESH_SECONDS):
+    """Regenera los bundles de todos los spots al arrancar y cada `interval` (modo publisher)"""
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            logger.warning(f"Refresh de bundles offline falló: {e}")
+        await asyncio.sleep(interval)
+
+
+def start(refresh: Callable[[], Awaitable[None]], interval: float = BUNDLE_REFRESH_SECONDS):
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(run(refresh, interval))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def clear_cache():
+    """Limpia caché (útil para testing)"""
+    global _bundles
+    _bundles = OrderedDict()
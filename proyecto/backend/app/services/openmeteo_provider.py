@@ -1,8 +1,11 @@
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
+import math
 from app.services.weather_service import WeatherProvider
 from app.services.http_client import http_client
 from app.models.schemas import WeatherData, WindData, WaveData, TideData, AtmosphereData
+from app.services.hourly_frame import HourlyFrame, TIDE_DTYPE, column_from_list, parse_epochs
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,10 @@ class OpenMeteoProvider(WeatherProvider):
     MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
     FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
     
+    # Horizonte máximo que ofrece cada API (días)
+    MAX_FORECAST_DAYS = 16
+    MAX_MARINE_DAYS = 8
+    
     def __init__(self, tide_provider=None):
         """
         Args:
@@ -83,9 +90,20 @@ class OpenMeteoProvider(WeatherProvider):
         Obtiene pronóstico REAL para las próximas N horas
         Combina Weather Forecast API (viento) + Marine API (olas)
         """
+        frame = await self.get_forecast_frame(lat, lon, hours)
+        return frame.from_current(hours).to_weather_list()
+
+    async def get_forecast_frame(self, lat: float, lon: float, hours: int = 12) -> HourlyFrame:
+        """
+        Pronóstico en formato columnar (todas las horas recibidas, desde el
+        inicio del día en curso) - los consumidores cortan con from_current()
+        """
         forecast_data = None
         marine_data = None
         
+        # Días a pedir: las horas solicitadas desde ahora + el día en curso
+        forecast_days = min(self.MAX_FORECAST_DAYS, max(2, math.ceil(hours / 24) + 1))
+        
         # Request 1: Viento
         try:
             forecast_params = {
@@ -93,7 +111,7 @@ class OpenMeteoProvider(WeatherProvider):
                 "longitude": lon,
                 "hourly": "wind_speed_10m,wind_direction_10m,temperature_2m,precipitation,weathercode,cloudcover,uv_index,visibility",
                 "timezone": "UTC",
-                "forecast_days": 2,
+                "forecast_days": forecast_days,
                 "models": "best_match"
             }
             # Usa http_client.get que ya valida status y hace retries
@@ -114,7 +132,7 @@ class OpenMeteoProvider(WeatherProvider):
                 "longitude": lon,
                 "hourly": "wave_height,wave_period,wave_direction",
                 "timezone": "UTC",
-                "forecast_days": 2
+                "forecast_days": min(forecast_days, self.MAX_MARINE_DAYS)
             }
             marine_response_json = await http_client.get(
                 self.MARINE_URL,
@@ -146,172 +164,74 @@ class OpenMeteoProvider(WeatherProvider):
             
         if not has_forecast_data and not has_marine_data:
             raise ValueError(f"OpenMeteo Forecast: Ambas APIs retornaron datos vacíos (forecast_error={forecast_error}, marine_error={marine_error})")
-            
-        return await self._parse_combined_forecast_response(forecast_data, marine_data, lat, lon, hours)
+        
+        tide_state = await self._get_tide_state(lat, lon)
+        return self._parse_frame(forecast_data, marine_data, tide_state)
 
     async def _parse_combined_response(self, forecast_data: Optional[dict], marine_data: Optional[dict], lat: float, lon: float) -> WeatherData:
         """Combina datos de viento (forecast) y olas (marine) en WeatherData"""
-        # Usar datos de forecast si están disponibles, sino crear estructura vacía
-        forecast_hourly = forecast_data.get("hourly", {}) if forecast_data else {}
-        marine_hourly = marine_data.get("hourly", {}) if marine_data else {}
-        
-        # Intentar obtener times del forecast primero, sino del marine
-        times = forecast_hourly.get("time", []) or marine_hourly.get("time", [])
-        
-        if not times:
-            # En lugar de retornar datos vacíos, lanzar excepción para activar fallback
-            logger.error("OpenMeteo: No hay datos horarios disponibles en respuesta")
-            raise ValueError("OpenMeteo _parse_combined_response: No time series data available")
-            
-        # Encontrar índice actual
-        current_idx = self._find_current_index(times)
-        
         # Obtener estado de marea
         tide_state = await self._get_tide_state(lat, lon)
         
-        # Extraer datos combinados
-        return self._extract_combined_weather_data(forecast_hourly, marine_hourly, current_idx, tide_state)
+        # Parsear una vez y materializar sólo la hora actual
+        return self._parse_frame(forecast_data, marine_data, tide_state).current()
 
     async def _parse_combined_forecast_response(self, forecast_data: Optional[dict], marine_data: Optional[dict], lat: float, lon: float, limit_hours: int) -> List[WeatherData]:
         """Combina forecast de viento y olas para múltiples horas"""
+        # Obtener marea una sola vez
+        tide_state = await self._get_tide_state(lat, lon)
+        
+        frame = self._parse_frame(forecast_data, marine_data, tide_state)
+        return frame.from_current(limit_hours).to_weather_list()
+
+    def _parse_frame(self, forecast_data: Optional[dict], marine_data: Optional[dict], tide_state: str) -> HourlyFrame:
+        """
+        Parsea ambas respuestas a un HourlyFrame (una pasada por variable)
+        
+        Las series de Marine se alinean por posición con las de Forecast (ambas
+        piden timezone=UTC desde el inicio del día); si Marine tiene menos días
+        las horas faltantes quedan sin dato.
+        """
+        # Usar datos de forecast si están disponibles, sino crear estructura vacía
         forecast_hourly = forecast_data.get("hourly", {}) if forecast_data else {}
         marine_hourly = marine_data.get("hourly", {}) if marine_data else {}
         
         times = forecast_hourly.get("time", []) or marine_hourly.get("time", [])
         
         if not times:
-            logger.error("OpenMeteo Forecast: No hay datos de pronóstico disponibles")
-            raise ValueError("OpenMeteo _parse_combined_forecast_response: No time series data in response")
-            
-        start_idx = self._find_current_index(times)
-        result = []
-        
-        # Obtener marea una sola vez
-        tide_state = await self._get_tide_state(lat, lon)
-        
-        # Calcular hasta dónde podemos iterar
-        max_idx = min(start_idx + limit_hours, len(times))
-        
-        for i in range(start_idx, max_idx):
-            relative_offset = i - start_idx
-            wd = self._extract_combined_weather_data(forecast_hourly, marine_hourly, i, tide_state, hour_offset=relative_offset)
-            result.append(wd)
-            
-        return result
-
-    def _extract_combined_weather_data(self, forecast_hourly: dict, marine_hourly: dict, index: int, tide_state: str, hour_offset: int = 0) -> WeatherData:
-        """Extrae y combina datos de viento (forecast) y olas (marine) para un índice específico - CON VALIDACIÓN"""
-        forecast_times = forecast_hourly.get("time", [])
+            # En lugar de retornar datos vacíos, lanzar excepción para activar fallback
+            logger.error("OpenMeteo: No hay datos horarios disponibles en respuesta")
+            raise ValueError("OpenMeteo _parse_frame: No time series data available")
         
-        # Validar índice contra la longitud real de los arrays
-        if index >= len(forecast_times) and len(forecast_times) > 0:
-            index = len(forecast_times) - 1
-        elif len(forecast_times) == 0:
+        if not forecast_hourly.get("time"):
             # SIN datos de viento debemos FALLAR para activar fallback a OpenWeather
             # (que sí tiene datos de viento aunque no olas)
-            logger.error(f"OpenMeteo: No hay datos de viento en forecast para índice {index}")
-            raise ValueError(f"OpenMeteo: No wind data available (forecast_times empty) at index {index}")
-        
-        # Timestamp siempre viene del forecast (o marine como fallback)
-        # Aseguramos que tenga la marca Z de UTC si no la tiene
-        raw_ts = forecast_times[index] if forecast_times else datetime.now(timezone.utc).isoformat()
-        if not raw_ts.endswith("Z") and "+00:00" not in raw_ts:
-             timestamp = f"{raw_ts}Z"
-        else:
-             timestamp = raw_ts
-        
-        # Helper para extracción segura
-        def get_val(source, key, idx, type_func=float):
-            arr = source.get(key, [])
-            if idx < len(arr) and arr[idx] is not None:
-                try:
-                    return type_func(arr[idx])
-                except (ValueError, TypeError):
-                    return None
-            return None
-
-        # --- Viento ---
-        wind_speed = get_val(forecast_hourly, "wind_speed_10m", index)
-        wind_direction = get_val(forecast_hourly, "wind_direction_10m", index, int)
-        
-        # --- Olas (Marine) ---
-        wave_height = get_val(marine_hourly, "wave_height", index)
-        wave_period = get_val(marine_hourly, "wave_period", index)
-        wave_direction = get_val(marine_hourly, "wave_direction", index, int)
-        
-        # --- Atmósfera (Forecast) ---
-        temp = get_val(forecast_hourly, "temperature_2m", index)
-        precip = get_val(forecast_hourly, "precipitation", index)
-        clouds = get_val(forecast_hourly, "cloudcover", index, int)
-        uv = get_val(forecast_hourly, "uv_index", index)
-        visibility = get_val(forecast_hourly, "visibility", index)
-        # Convertir visibilidad de metros a km si es necesario (OpenMeteo da metros)
-        if visibility is not None:
-            visibility = visibility / 1000.0
-            
-        wcode = get_val(forecast_hourly, "weathercode", index, int)
-
-        # Construir objetos
-        wind_data = WindData(
-            speed_kmh=wind_speed,
-            direction_deg=wind_direction,
-            relative_direction=None
-        )
-        
-        wave_data = WaveData(
-            height_m=wave_height,
-            period_s=wave_period,
-            direction_deg=wave_direction
-        )
-        
-        atmosphere_data = AtmosphereData(
-            temperature_c=temp,
-            precipitation_mm=precip,
-            cloud_cover_pct=clouds,
-            uv_index=uv,
-            visibility_km=visibility,
-            weather_code=wcode
-        )
-        
-        tide_data = TideData(state=tide_state)
-        
-        return WeatherData(
-            wind=wind_data,
-            waves=wave_data,
-            atmosphere=atmosphere_data,
-            tide=tide_data,
-            timestamp=timestamp,
-            provider="openmeteo_combined"
-        )
-
-    def _find_current_index(self, times: List[str]) -> int:
-        """Encuentra el índice de la hora actual usando UTC de forma estricta.
+            logger.error("OpenMeteo: No hay datos de viento en forecast")
+            raise ValueError("OpenMeteo: No wind data available (forecast_times empty)")
+        
+        # Timestamps de la API en UTC (ej: "2026-01-14T14:00")
+        epochs = parse_epochs(times)
+        n = len(epochs)
+        
+        columns = {
+            # --- Viento ---
+            "wind_speed_kmh": column_from_list(forecast_hourly.get("wind_speed_10m"), n),
+            "wind_direction_deg": column_from_list(forecast_hourly.get("wind_direction_10m"), n),
+            # --- Olas (Marine) ---
+            "wave_height_m": column_from_list(marine_hourly.get("wave_height"), n),
+            "wave_period_s": column_from_list(marine_hourly.get("wave_period"), n),
+            "wave_direction_deg": column_from_list(marine_hourly.get("wave_direction"), n),
+            # --- Atmósfera (Forecast) ---
+            "temperature_c": column_from_list(forecast_hourly.get("temperature_2m"), n),
+            "precipitation_mm": column_from_list(forecast_hourly.get("precipitation"), n),
+            "cloud_cover_pct": column_from_list(forecast_hourly.get("cloudcover"), n),
+            "uv_index": column_from_list(forecast_hourly.get("uv_index"), n),
+            # OpenMeteo da visibilidad en metros
+            "visibility_km": column_from_list(forecast_hourly.get("visibility"), n, divisor=1000.0),
+            "weather_code": column_from_list(forecast_hourly.get("weathercode"), n),
+        }
         
-        Compara datetime.now(timezone.utc) contra los timestamps de la API (también en UTC).
-        """
-        if not times:
-            return 0
-            
-        try:
-            # 1. Obtener ahora en UTC estricto, truncado a la hora para comparar bloques
-            # Ejemplo: Si son 11:48 UTC, buscamos el bloque de las 11:00 UTC
-            now_utc = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
-            
-            # Buscar la primera hora >= la hora actual
-            for i, time_str in enumerate(times):
-                # OpenMeteo UTC devuelve ISO8601 (ej: "2026-01-14T14:00")
-                # Lo parseamos y le asignamos timezone UTC explícitamente para comparar peras con peras
-                entry_time = datetime.fromisoformat(time_str.split('+')[0].split('Z')[0]).replace(tzinfo=timezone.utc)
-                
-                # Si encontramos el bloque actual (igualdad) o uno futuro (mayor)
-                if entry_time >= now_utc:
-                    return i
-            
-            return len(times) - 1
-            
-        except Exception as e:
-            logger.error(f"Error calculando índice de tiempo: {e}")
-            return 0
+        return HourlyFrame(epochs, columns, np.full(n, tide_state, dtype=TIDE_DTYPE), "openmeteo_combined")
 
     def _create_fallback_weather_data(self, lat: float, lon: float, tide_state: str = "rising", hour_offset: int = 0) -> WeatherData:
         """Crea WeatherData con valores None pero con timestamp secuencial correcto"""
@@ -4,7 +4,8 @@ import logging
 import os
 from app.services.weather_service import WeatherProvider
 from app.services.http_client import http_client
-from app.models.schemas import WeatherData, WindData, WaveData, TideData, AtmosphereData
+from app.models.schemas import WeatherData
+from app.models.internal import WeatherRecord, WindRecord, WaveRecord, AtmosphereRecord, TideRecord
 
 logger = logging.getLogger(__name__)
 
@@ -29,16 +30,8 @@ class OpenWeatherProvider(WeatherProvider):
             raise ValueError("API Key faltante")
             
         try:
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": self.api_key,
-                "units": "metric"
-            }
-            # Usa http_client.get que ya valida status y hace retries
-            data = await http_client.get(f"{self.BASE_URL}/weather", params=params)
-            
-            return self._map_to_weather_data(data)
+            record = await self._fetch_current_record(lat, lon)
+            return record.to_schema()
         except Exception as e:
             logger.error(f"Error fetching OpenWeather conditions: {e}")
             raise
@@ -55,7 +48,7 @@ class OpenWeatherProvider(WeatherProvider):
         
         try:
              # Fetch Current
-             current_wd = await self.get_conditions(lat, lon)
+             current_wd = await self._fetch_current_record(lat, lon)
              logger.info(f"✅ DEBUG: Current weather fetch success: {current_wd.timestamp}")
         except Exception as e:
              logger.error(f"❌ DEBUG: Current weather fetch failed: {e}")
@@ -67,7 +60,7 @@ class OpenWeatherProvider(WeatherProvider):
              logger.info(f"✅ DEBUG: Forecast list fetch success: {len(forecast_list)} items")
         except Exception as e:
              logger.error(f"❌ DEBUG: Forecast fetch failed: {e}")
-             if current_wd: return [current_wd] # Devolver al menos lo que tenemos
+             if current_wd: return [current_wd.to_schema()] # Devolver al menos lo que tenemos
              raise e
             
         # 2. Procesar Forecast (Interpolación 3h -> 1h)
@@ -78,9 +71,7 @@ class OpenWeatherProvider(WeatherProvider):
             current_ts = datetime.fromisoformat(wd.timestamp.replace("Z", "+00:00"))
             for offset in range(1, 3):
                 next_ts = current_ts + timedelta(hours=offset)
-                wd_clone = wd.model_copy(deep=True)
-                wd_clone.timestamp = next_ts.isoformat()
-                processed_forecast.append(wd_clone)
+                processed_forecast.append(wd.at(next_ts.isoformat()))
         
         # Ordenar forecast procesado
         processed_forecast.sort(key=lambda x: x.timestamp)
@@ -107,9 +98,7 @@ class OpenWeatherProvider(WeatherProvider):
                 
                 for i in range(1, gap_hours):
                     fill_ts = curr_hour + timedelta(hours=i)
-                    fill_wd = current_wd.model_copy(deep=True)
-                    fill_wd.timestamp = fill_ts.isoformat()
-                    final_list.append(fill_wd)
+                    final_list.append(current_wd.at(fill_ts.isoformat()))
         
         # 4. Combinar con forecast (evitando duplicados de hora)
         # Usamos un set para trackear horas ya agregadas
@@ -134,7 +123,20 @@ class OpenWeatherProvider(WeatherProvider):
         ]
         
         final_list.sort(key=lambda x: x.timestamp)
-        return final_list[:hours]
+        # Recién acá se pasa a pydantic (sin re-validar: los armamos nosotros)
+        return [item.to_schema() for item in final_list[:hours]]
+
+    async def _fetch_current_record(self, lat: float, lon: float) -> WeatherRecord:
+        """Condiciones actuales (/weather) como tipo interno"""
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        # Usa http_client.get que ya valida status y hace retries
+        data = await http_client.get(f"{self.BASE_URL}/weather", params=params)
+        return self._map_to_record(data)
 
     async def _fetch_raw_forecast(self, lat, lon, hours):
         """Helper para obtener solo la lista raw de forecast usando ResilientHttpClient"""
@@ -149,11 +151,11 @@ class OpenWeatherProvider(WeatherProvider):
         
         result = []
         for item in data.get("list", []):
-            result.append(self._map_to_weather_data(item))
+            result.append(self._map_to_record(item))
         return result
 
-    def _map_to_weather_data(self, data: dict) -> WeatherData:
-        """Mapea respuesta JSON de OpenWeather a WeatherData"""
+    def _map_to_record(self, data: dict) -> WeatherRecord:
+        """Mapea respuesta JSON de OpenWeather a WeatherRecord (tipo interno)"""
         
         # Timestamp (dt es unix timestamp)
         ts_unix = data.get("dt")
@@ -192,20 +194,20 @@ class OpenWeatherProvider(WeatherProvider):
 
         # --- Construcción de Objetos ---
         
-        wind_obj = WindData(
+        wind_obj = WindRecord(
             speed_kmh=round(wind_speed_kmh, 1) if wind_speed_kmh is not None else None,
             direction_deg=wind_deg,
             relative_direction=None
         )
         
         # OpenWeather Free NO TIENE OLAS. Devolvemos None.
-        wave_obj = WaveData(
+        wave_obj = WaveRecord(
             height_m=None,
             period_s=None,
             direction_deg=None
         )
         
-        atmosphere_obj = AtmosphereData(
+        atmosphere_obj = AtmosphereRecord(
             temperature_c=temp,
             precipitation_mm=precip,
             cloud_cover_pct=clouds,
@@ -215,9 +217,9 @@ class OpenWeatherProvider(WeatherProvider):
         )
         
         # Tide no disponible
-        tide_obj = TideData(state="rising") # Placeholder
+        tide_obj = TideRecord(state="rising") # Placeholder
         
-        return WeatherData(
+        return WeatherRecord(
             wind=wind_obj,
             waves=wave_obj,
             atmosphere=atmosphere_obj,
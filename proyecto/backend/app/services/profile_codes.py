@@ -0,0 +1,56 @@
+"""
+Códigos compactos de perfil de usuario
+
+Hay solo 54 perfiles posibles (tabla × experiencia × potencia × objetivo).
+Cada uno tiene un código canónico de 4 letras (ej: "rbmc" = rigid, beginner,
+medium, calma) que se usa como clave de caché y en query strings.
+"""
+
+import itertools
+from typing import Dict, List
+from app.models.schemas import UserProfile
+
+BOARD_CODES: Dict[str, str] = {"rigid": "r", "inflable": "i"}
+EXPERIENCE_CODES: Dict[str, str] = {"beginner": "b", "intermediate": "i", "advanced": "a"}
+POWER_CODES: Dict[str, str] = {"low": "l", "medium": "m", "high": "h"}
+GOAL_CODES: Dict[str, str] = {"calma": "c", "entrenamiento": "e", "desafio": "d"}
+
+
+def profile_code(user: UserProfile) -> str:
+    """Código canónico del perfil (ej: 'rbmc')"""
+    return (
+        BOARD_CODES[user.board_type]
+        + EXPERIENCE_CODES[user.experience]
+        + POWER_CODES[user.paddle_power]
+        + GOAL_CODES[user.session_goal]
+    )
+
+
+def parse_profile_code(code: str) -> UserProfile:
+    """
+    Inversa de profile_code ('rbmc' -> UserProfile)
+    
+    Raises:
+        ValueError: si el código no corresponde a ningún perfil
+    """
+    code = code.strip().lower()
+    if len(code) != 4:
+        raise ValueError(f"Código de perfil inválido: '{code}'")
+    fields = []
+    for letter, codes in zip(code, (BOARD_CODES, EXPERIENCE_CODES, POWER_CODES, GOAL_CODES)):
+        value = next((name for name, short in codes.items() if short == letter), None)
+        if value is None:
+            raise ValueError(f"Código de perfil inválido: '{code}'")
+        fields.append(value)
+    board, experience, power, goal = fields
+    return UserProfile(board_type=board, experience=experience, paddle_power=power, session_goal=goal)
+
+
+def all_profiles() -> List[UserProfile]:
+    """Los 54 perfiles posibles, en orden estable"""
+    return [
+        UserProfile(board_type=board, experience=experience, paddle_power=power, session_goal=goal)
+        for board, experience, power, goal in itertools.product(
+            BOARD_CODES, EXPERIENCE_CODES, POWER_CODES, GOAL_CODES
+        )
+    ]
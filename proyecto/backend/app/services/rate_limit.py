@@ -0,0 +1,259 @@
+"""
+Límites de entrada por cliente: token buckets + cola justa por nivel de ruta
+
+Cada ruta de /api cae en un nivel (ROUTE_TIERS, por prefijo):
+- "expensive": rutas que saltean los cachés y le pegan a upstream o a un LLM
+  (audit, debug, pedagogy), o que evalúan mucho por pedido (batch, surface)
+- "cheap": el resto (analyze, timeline, dashboard... sirven casi siempre del caché)
+- "stream": conexiones largas (/live SSE): sólo bucket, no ocupan cupo
+
+Por (cliente, nivel) hay un token bucket (rate + burst). Sin tokens se
+responde 429 con Retry-After (segundos hasta el próximo token).
+
+Cola justa: cada nivel con max_concurrent tiene un cupo de pedidos en curso.
+Con el cupo lleno los pedidos esperan en una cola POR CLIENTE y los cupos que
+se liberan se reparten en round-robin entre clientes: alguien con 20 pedidos
+encolados no hace esperar al que tiene uno. Cada cliente puede tener a lo sumo
+max_queued esperando (más, 429) y nadie espera más de queue_timeout (503).
+
+El cliente es la API key si viene una conocida (RATE_LIMIT_API_KEYS) y si no
+la IP. Detrás de proxies (Render) TRUSTED_PROXY_HOPS indica cuántos saltos de
+X-Forwarded-For agregó nuestra infraestructura: se toma la IP que agregó el
+último proxy de confianza (las anteriores las puede inventar el cliente).
+
+Middleware ASGI puro (sin BaseHTTPMiddleware): no bufferea los streams.
+Se activa con RATE_LIMIT_ENABLED=1 o, si esa variable no está, cuando
+TRUSTED_PROXY_HOPS está definida (0 = expuesto directo): detrás de un proxy sin
+configurar todos los clientes llegarían con la IP del proxy y compartirían un
+mismo bucket.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Tier:
+    rate: float                            # tokens por segundo
+    burst: int                             # capacidad del bucket
+    max_concurrent: Optional[int] = None   # cupo de pedidos en curso (None = sin cola)
+    max_queued: int = 4                    # pedidos esperando por cliente
+    queue_timeout: float = 10.0            # segundos máximos en la cola
+
+
+TIERS: Dict[str, Tier] = {
+    "cheap": Tier(rate=10, burst=40, max_concurrent=64),
+    "expensive": Tier(rate=1 / 30, burst=3, max_concurrent=2, max_queued=1, queue_timeout=30.0),
+    "stream": Tier(rate=1 / 10, burst=5),
+}
+
+# Prefijo de ruta -> nivel (el primero que coincide; None = sin límite)
+ROUTE_TIERS: List[Tuple[str, Optional[str]]] = [
+    ("/api/health", None),
+    ("/api/live/", "stream"),
+    ("/api/audit", "expensive"),
+    ("/api/debug/", "expensive"),
+    ("/api/pedagogy/", "expensive"),
+    ("/api/analyze/batch", "expensive"),
+    ("/api/surface", "expensive"),
+    ("/api/", "cheap"),
+]
+
+MAX_TRACKED_CLIENTS = 50000  # buckets en memoria (los más viejos se descartan: vuelven llenos)
+
+
+def route_tier(path: str) -> Optional[str]:
+    for prefix, tier in ROUTE_TIERS:
+        if path.startswith(prefix):
+            return tier
+    return None
+
+
+class TokenBuckets:
+    """Token buckets por (cliente, nivel), con refill perezoso al consultar"""
+
+    def __init__(self, tiers: Dict[str, Tier], max_clients: int = MAX_TRACKED_CLIENTS):
+        self.tiers = tiers
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()  # -> [tokens, último refill]
+
+    def take(self, client: str, tier_name: str, now: Optional[float] = None) -> float:
+        """Consume un token. Retorna 0 si pasó, o los segundos hasta que haya uno."""
+        tier = self.tiers[tier_name]
+        now = time.monotonic() if now is None else now
+        key = (client, tier_name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(tier.burst), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(tier.burst, bucket[0] + (now - bucket[1]) * tier.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / tier.rate
+
+
+class QueueFull(Exception):
+    pass
+
+
+class FairQueue:
+    """Cupo de pedidos en curso con espera round-robin entre clientes"""
+
+    def __init__(self, slots: int, max_queued: int, timeout: float):
+        self.slots = slots
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.active = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    async def acquire(self, client: str):
+        """
+        Raises:
+            QueueFull: si el cliente ya tiene max_queued pedidos esperando
+            asyncio.TimeoutError: si el cupo no se liberó en `timeout`
+        """
+        if self.active < self.slots and not self._waiting:
+            self.active += 1
+            return
+        waiters = self._waiting.get(client)
+        if waiters is not None and len(waiters) >= self.max_queued:
+            raise QueueFull(client)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(client, deque()).append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if future.done() and not future.cancelled():
+                self.release()  # el cupo llegó justo al vencer: pasarlo al siguiente
+            else:
+                future.cancel()
+                self._discard(client, future)
+            raise
+
+    def release(self):
+        """Libera un cupo: pasa directo al próximo cliente en la ronda (o queda libre)"""
+        while self._waiting:
+            client, waiters = next(iter(self._waiting.items()))
+            future = waiters.popleft()
+            if waiters:
+                self._waiting.move_to_end(client)  # el resto de sus pedidos, al final de la ronda
+            else:
+                del self._waiting[client]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, client: str, future: asyncio.Future):
+        waiters = self._waiting.get(client)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiting[client]
+
+
+def _api_keys() -> frozenset:
+    return frozenset(key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip())
+
+
+def client_id(scope: dict, api_keys: frozenset, proxy_hops: int) -> str:
+    """API key conocida, o la IP del cliente (vista por el último proxy de confianza)"""
+    headers = dict(scope.get("headers") or ())
+    api_key = headers.get(b"x-api-key")
+    if api_key is not None and api_key.decode("latin-1") in api_keys:
+        return "key:" + api_key.decode("latin-1")
+    if proxy_hops > 0:
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.decode("latin-1").split(",") if hop.strip()]
+            if hops:
+                return "ip:" + hops[-min(proxy_hops, len(hops))]
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """Token bucket + cola justa por cliente y nivel de ruta (ver docstring del módulo)"""
+
+    def __init__(self, app, tiers: Optional[Dict[str, Tier]] = None, enabled: Optional[bool] = None):
+        self.app = app
+        self.tiers = tiers or TIERS
+        if enabled is None:
+            flag = os.getenv("RATE_LIMIT_ENABLED")
+            if flag is None:
+                enabled = "TRUSTED_PROXY_HOPS" in os.environ
+            else:
+                enabled = flag.lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self.buckets = TokenBuckets(self.tiers)
+        self.queues: Dict[str, FairQueue] = {
+            name: FairQueue(tier.max_concurrent, tier.max_queued, tier.queue_timeout)
+            for name, tier in self.tiers.items() if tier.max_concurrent
+        }
+        self.api_keys = _api_keys()
+        self.proxy_hops = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+        tier = route_tier(scope["path"])
+        if tier is None:
+            return await self.app(scope, receive, send)
+
+        client = client_id(scope, self.api_keys, self.proxy_hops)
+        wait = self.buckets.take(client, tier)
+        if wait > 0:
+            logger.info(f"🚦 429 {client} en {scope['path']} (nivel {tier}, reintentar en {wait:.1f}s)")
+            return await _reject(send, 429, "Demasiados pedidos, probá de nuevo en unos segundos", wait)
+
+        queue = self.queues.get(tier)
+        if queue is None:
+            return await self.app(scope, receive, send)
+        try:
+            await queue.acquire(client)
+        except QueueFull:
+            return await _reject(send, 429, "Demasiados pedidos en curso", 1)
+        except asyncio.TimeoutError:
+            return await _reject(send, 503, "Servidor ocupado, probá de nuevo en unos segundos", 1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
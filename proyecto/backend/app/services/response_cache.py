@@ -0,0 +1,249 @@
+"""
+Caché de respuestas pre-serializadas
+
+Las respuestas de los endpoints cacheables (timeline, analyze, windows) son
+función pura de (endpoint, spot, perfil, versión de scoring, versión de datos):
+si ninguna cambia, los bytes JSON tampoco. Se guardan ya serializados y un HIT
+se responde como Response crudo, sin recorrer modelos ni volver a codificar.
+
+La versión de datos es el hash de contenido del HourlyFrame servido
+(HourlyFrame.data_version), así que un refresh del provider con datos nuevos
+invalida solo; un refresh con los mismos datos sigue pegando en caché.
+
+Serialización con orjson (varias veces más rápido que json.dumps de FastAPI).
+
+ETags: como la clave determina los bytes, el ETag es un hash de la clave y se
+puede calcular ANTES de ejecutar el engine. Si el cliente manda If-None-Match
+con ese ETag se responde 304 sin evaluar ni serializar nada.
+
+Compresión: las variantes br/gzip de cada entrada se comprimen UNA vez (la
+primera vez que un cliente las pide) y quedan guardadas junto a los bytes
+crudos; los HITs siguientes sólo eligen variante según Accept-Encoding.
+
+MessagePack: con Accept: application/msgpack la misma entrada se sirve
+codificada con msgpack_codec (también calculada una vez y guardada, con sus
+propias variantes comprimidas y su propio ETag).
+
+Los GET de analyze/timeline (perfil en la query) agregan Cache-Control con el
+vencimiento real de los datos, para que caches compartidos absorban lecturas.
+"""
+
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import brotli
+import orjson
+from fastapi import Response
+
+from app.services import msgpack_codec, spot_index
+
+# Cache global (en memoria) - acotado para no crecer sin límite
+_response_cache: Dict[Tuple, "CachedResponse"] = {}
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Compresión: niveles medios (brotli 6 ~ 10x en la timeline en ~1.5ms; 11 tarda 50x más por ~10%)
+ENCODINGS = ("br", "gzip")  # orden de preferencia del servidor
+BROTLI_QUALITY = 6
+GZIP_LEVEL = 6
+MIN_COMPRESS_BYTES = 512  # por debajo no vale la pena
+
+
+FORMATS = ("msgpack",)  # representaciones alternativas al JSON (None = JSON)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    created_at: float
+    variants: Dict[str, bytes] = field(default_factory=dict)  # "[formato+]encoding" -> bytes
+
+    def representation(self, fmt: Optional[str]) -> bytes:
+        """Cuerpo en el formato pedido (None = JSON); se convierte la primera vez y queda guardado"""
+        if fmt is None:
+            return self.body
+        body = self.variants.get(fmt)
+        if body is None:
+            if fmt != "msgpack":
+                raise ValueError(f"Formato '{fmt}' no soportado")
+            body = msgpack_codec.encode_json(self.body)
+            self.variants[fmt] = body
+        return body
+
+    def encoded(self, encoding: str, fmt: Optional[str] = None) -> bytes:
+        """Variante comprimida (se calcula la primera vez y queda guardada)"""
+        variant = encoding if fmt is None else f"{fmt}+{encoding}"
+        body = self.variants.get(variant)
+        if body is None:
+            body = compress(self.representation(fmt), encoding)
+            self.variants[variant] = body
+        return body
+
+
+def render_json(payload: Any) -> bytes:
+    """Serializa con orjson (acepta arrays/escalares numpy)"""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def embed(entry: "CachedResponse") -> orjson.Fragment:
+    """Bytes de una entrada como JSON ya serializado, para componer respuestas sin re-encodear"""
+    return orjson.Fragment(entry.body)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Encoding '{encoding}' no soportado")
+
+
+def _qvalues(header: str) -> Dict[str, float]:
+    """Valores aceptados de un header Accept / Accept-Encoding -> q (1.0 si no se indica)"""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        name, *params = item.split(";")
+        q = 1.0
+        for param in params:
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige br / gzip según Accept-Encoding (respeta q=0); None = sin comprimir
+    Entre los aceptados con el mismo q gana el orden de ENCODINGS.
+    """
+    if not accept_encoding:
+        return None
+    accepted = _qvalues(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """
+    "msgpack" si Accept lo pide con q > 0 y no prefiere JSON; None = JSON
+    (sin Accept, o con */* solo, se responde JSON)
+    """
+    if not accept:
+        return None
+    accepted = _qvalues(accept)
+    msgpack_q = max((accepted.get(media, 0.0) for media in msgpack_codec.MSGPACK_MEDIA_TYPES), default=0.0)
+    json_q = accepted.get(JSON_MEDIA_TYPE, accepted.get("application/*", 0.0))
+    return "msgpack" if msgpack_q > 0 and msgpack_q >= json_q else None
+
+
+def cache_key(endpoint: str, spot_id: str, profile: str, scoring_version: str, data_version: str, *extra) -> Tuple:
+    """Clave de caché: todo lo que determina los bytes de la respuesta (incluida la definición del spot)"""
+    return (endpoint, spot_id, spot_index.revision(spot_id), profile, scoring_version, data_version) + extra
+
+
+def etag_for(key: Tuple) -> str:
+    """ETag fuerte derivado de la clave (estable entre procesos y reinicios)"""
+    return '"' + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + '"'
+
+
+FORMAT_ETAG_SUFFIXES = {"msgpack": "mp"}
+
+
+def _variant_etag(etag: str, encoding: Optional[str], fmt: Optional[str] = None) -> str:
+    """Cada formato/codificación es otra representación: ETag propio ("abc" -> "abc-br", "abc-mp-br")"""
+    suffix = "".join(f"-{part}" for part in (FORMAT_ETAG_SUFFIXES.get(fmt), encoding) if part)
+    return f'{etag[:-1]}{suffix}"' if suffix else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """¿El header If-None-Match incluye este ETag o una de sus variantes? (acepta listas, "*" y W/)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*" or candidate == etag:
+            return True
+        for fmt in (None, *FORMATS):
+            if any(candidate == _variant_etag(etag, encoding, fmt) for encoding in (None, *ENCODINGS)):
+                return True
+    return False
+
+
+def cache_control(expires_at: float, stale_while_revalidate: int, now: Optional[float] = None) -> str:
+    """
+    Cache-Control para navegador / service worker / CDN: fresco hasta
+    expires_at (epoch), después se puede servir viejo mientras se revalida
+    """
+    now = time.time() if now is None else now
+    max_age = max(0, int(expires_at - now))
+    return f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+
+
+def not_modified(etag: str, accept_encoding: Optional[str] = None, accept: Optional[str] = None) -> Response:
+    """304 sin cuerpo (con el ETag de la variante que correspondería)"""
+    return Response(status_code=304, headers={
+        "ETag": _variant_etag(etag, negotiate_encoding(accept_encoding), negotiate_format(accept)),
+        "Vary": "Accept, Accept-Encoding"
+    })
+
+
+def get(key: Tuple) -> Optional[CachedResponse]:
+    return _response_cache.get(key)
+
+
+def put(key: Tuple, body: bytes) -> CachedResponse:
+    if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+        _response_cache.pop(next(iter(_response_cache)))
+    entry = CachedResponse(body=body, etag=etag_for(key), created_at=time.time())
+    _response_cache[key] = entry
+    return entry
+
+
+def json_response(
+    entry: CachedResponse,
+    headers: Optional[Dict[str, str]] = None,
+    accept_encoding: Optional[str] = None,
+    media_type: str = JSON_MEDIA_TYPE,
+    accept: Optional[str] = None
+) -> Response:
+    """
+    Response crudo con los bytes cacheados (sin validación ni re-encoding) + ETag
+    Con accept_encoding elige la variante br/gzip precomprimida; las respuestas
+    JSON se sirven en MessagePack si Accept lo pide.
+    """
+    fmt = None
+    vary = "Accept-Encoding"
+    if media_type == JSON_MEDIA_TYPE:
+        vary = "Accept, Accept-Encoding"
+        fmt = negotiate_format(accept)
+        if fmt is not None:
+            media_type = msgpack_codec.MSGPACK_MEDIA_TYPE
+    body = entry.representation(fmt)
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+    response_headers = {"ETag": _variant_etag(entry.etag, encoding, fmt), "Vary": vary}
+    if encoding is not None:
+        body = entry.encoded(encoding, fmt)
+        response_headers["Content-Encoding"] = encoding
+    if headers:
+        response_headers.update(headers)
+    return Response(content=body, media_type=media_type, headers=response_headers)
+
+
+def clear_cache():
+    """Limpia caché (útil para testing)"""
+    global _response_cache
+    _response_cache = {}
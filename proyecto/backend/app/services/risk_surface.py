@@ -0,0 +1,130 @@
+"""
+Superficie de riesgo (material de coaching)
+
+Evalúa el motor sobre una grilla densa de velocidad de viento × dirección ×
+altura de olas para un spot, un perfil y un estado de marea. Usa el evaluador
+vectorizado del SenseiEngine: ~65k celdas se evalúan en milisegundos.
+
+Los resultados se cachean por (spot, perfil, versión de scoring, marea, grilla):
+el modelo es determinístico, así que la superficie no cambia hasta que cambia
+el modelo.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config.spots import SPOTS
+from app.models.schemas import UserProfile, RiskSurfaceResponse
+from app.services.profile_codes import profile_code
+from app.services.scenario_catalog import SCENARIO_IDS
+from app.services.sensei_engine import SenseiEngine
+
+logger = logging.getLogger(__name__)
+
+# Cache global (en memoria) - acotado para no crecer sin límite
+_surface_cache: Dict[tuple, RiskSurfaceResponse] = {}
+SURFACE_CACHE_MAX_ENTRIES = 256
+
+
+def _first_crossing(below: np.ndarray, wind_axis: np.ndarray) -> List[List[Optional[float]]]:
+    """
+    Primera velocidad de viento (eje 1) donde la máscara se cumple.
+
+    Returns:
+        Matriz [dirección][ola] con la velocidad en km/h, o None si nunca cruza
+    """
+    crosses = below.any(axis=1)
+    first_idx = below.argmax(axis=1)
+    speeds = np.where(crosses, wind_axis[first_idx], np.nan)
+    return [[None if np.isnan(v) else round(float(v), 1) for v in row] for row in speeds]
+
+
+def build_risk_surface(
+    spot_id: str,
+    user: UserProfile,
+    tide_state: str,
+    wind_steps: int = 60,
+    direction_steps: int = 36,
+    wave_steps: int = 30,
+    max_wind_kmh: float = 59.0,
+    max_wave_m: float = 2.9,
+    wave_period_s: Optional[float] = None,
+    engine: Optional[SenseiEngine] = None
+) -> RiskSurfaceResponse:
+    """
+    Calcula (o retorna de caché) la superficie de riesgo
+
+    Args:
+        wave_period_s: Periodo de ola fijo para toda la grilla (None = sin dato)
+
+    Returns:
+        RiskSurfaceResponse con superficies aplanadas en orden [dirección][viento][ola]
+    """
+    spot = SPOTS.get(spot_id)
+    if not spot:
+        raise ValueError(f"Spot '{spot_id}' no encontrado")
+
+    engine = engine or SenseiEngine()
+    cache_key = (
+        spot_id, profile_code(user), engine.model.version, tide_state,
+        wind_steps, direction_steps, wave_steps, max_wind_kmh, max_wave_m, wave_period_s
+    )
+    cached = _surface_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"📦 Surface cache HIT - {spot_id}/{cache_key[1]}/{cache_key[2]}")
+        return cached
+
+    # Ejes de la grilla
+    wind_axis = np.linspace(0.0, max_wind_kmh, wind_steps)
+    direction_axis = np.arange(direction_steps) * (360.0 / direction_steps)
+    wave_axis = np.linspace(0.0, max_wave_m, wave_steps)
+
+    directions, winds, waves = np.meshgrid(direction_axis, wind_axis, wave_axis, indexing="ij")
+    shape = directions.shape
+    n = directions.size
+
+    columns = {
+        "wind_speed_kmh": winds.ravel(),
+        "wind_direction_deg": directions.ravel(),
+        "wave_height_m": waves.ravel(),
+        "wave_period_s": np.full(n, np.nan if wave_period_s is None else wave_period_s),
+    }
+    arrays = engine.analyze_arrays(columns, spot_id, user, tide_state)
+
+    # Dónde el perfil deja de estar en "alto" y dónde cae a "bajo"
+    seguridad_cat = engine.model.categorize_arrays(arrays["seguridad"]).reshape(shape)
+    crossings = {
+        "medio": _first_crossing(seguridad_cat < 2, wind_axis),
+        "bajo": _first_crossing(seguridad_cat < 1, wind_axis),
+    }
+
+    response = RiskSurfaceResponse(
+        spot={"name": spot["name"], "lat": spot["lat"], "lon": spot["lon"]},
+        profile=profile_code(user),
+        tide_state=tide_state,
+        scoring_version=engine.model.version,
+        shape=list(shape),
+        wind_speed_kmh=[round(float(v), 2) for v in wind_axis],
+        wind_direction_deg=[round(float(v), 2) for v in direction_axis],
+        wave_height_m=[round(float(v), 3) for v in wave_axis],
+        seguridad=arrays["seguridad"].tolist(),
+        esfuerzo=arrays["esfuerzo"].tolist(),
+        disfrute=arrays["disfrute"].tolist(),
+        scenario_ids=SCENARIO_IDS,
+        scenario=arrays["scenario"].tolist(),
+        seguridad_crossings=crossings
+    )
+
+    if len(_surface_cache) >= SURFACE_CACHE_MAX_ENTRIES:
+        _surface_cache.pop(next(iter(_surface_cache)))
+    _surface_cache[cache_key] = response
+    logger.info(f"✅ Surface calculada: {n} celdas para {spot_id}/{cache_key[1]}")
+    return response
+
+
+def clear_cache():
+    """Limpia caché (útil para testing)"""
+    global _surface_cache
+    _surface_cache = {}
@@ -10,7 +10,11 @@ El motor ya no genera piezas sueltas.
 Genera un ESCENARIO que dicta todo lo demás.
 """
 
-from typing import List, NamedTuple, Dict
+import hashlib
+import json
+from typing import List, NamedTuple, Dict, Optional
+import numpy as np
+from app.services.scoring_model import RELATIVE_CODES
 
 class ScenarioOutput(NamedTuple):
     """Output humano del escenario - micro-narrativas completas"""
@@ -251,6 +255,55 @@ def classify_scenario(
     return "marea_activa"
 
 
+# Índice estable de escenarios para resultados vectorizados
+SCENARIO_IDS: List[str] = list(SCENARIOS.keys())
+_SCENARIO_INDEX = {scenario_id: i for i, scenario_id in enumerate(SCENARIO_IDS)}
+
+
+def classify_scenario_arrays(
+    wind_speed: np.ndarray,
+    wind_rel: np.ndarray,
+    wave_height: np.ndarray,
+    tide_state,
+    critical: np.ndarray,
+    riesgo_deriva: np.ndarray
+) -> np.ndarray:
+    """
+    Versión vectorizada de classify_scenario (mismas reglas, mismo orden).
+    
+    Args:
+        wind_rel: Códigos RELATIVE_CODES
+        tide_state: Estado de marea (str o array por fila)
+        critical: Máscara tormenta_electrica | visibilidad_nula
+        riesgo_deriva: Máscara del flag riesgo_deriva
+        
+    Returns:
+        Índices en SCENARIO_IDS (uint8)
+    """
+    tide_active = np.isin(np.asarray(tide_state), ["rising", "falling"])
+    conditions = [
+        critical,
+        riesgo_deriva | ((wind_rel == RELATIVE_CODES["offshore"]) & (wind_speed > 8)),
+        (wind_speed > 15) & (wave_height > 0.8),
+        (wave_height > 1.0) & (wind_speed < 12),
+        (wind_rel == RELATIVE_CODES["onshore"]) & (wind_speed > 12),
+        (wind_rel == RELATIVE_CODES["cross"]) & (wind_speed > 10),
+        tide_active & (wind_speed < 10) & (wave_height < 0.6),
+        (wind_speed < 8) & (wave_height < 0.4),
+    ]
+    choices = [
+        _SCENARIO_INDEX["tormenta_peligrosa"],
+        _SCENARIO_INDEX["viento_offshore"],
+        _SCENARIO_INDEX["combinado_activo"],
+        _SCENARIO_INDEX["swell_grande"],
+        _SCENARIO_INDEX["viento_onshore"],
+        _SCENARIO_INDEX["viento_cross"],
+        _SCENARIO_INDEX["marea_activa"],
+        _SCENARIO_INDEX["mar_plancho"],
+    ]
+    return np.select(conditions, choices, default=_SCENARIO_INDEX["marea_activa"]).astype(np.uint8)
+
+
 def get_scenario(scenario_id: str) -> ScenarioOutput:
     """Retorna el escenario completo"""
     return SCENARIOS.get(scenario_id, SCENARIOS["marea_activa"])
@@ -259,3 +312,38 @@ def get_scenario(scenario_id: str) -> ScenarioOutput:
 def get_glossary_term(term: str) -> str:
     """Retorna la definición de un término del glosario"""
     return GLOSSARY.get(term.lower(), "")
+
+
+# ==================== Catálogo versionado ====================
+
+def scenario_narrative(scenario: ScenarioOutput) -> Dict[str, object]:
+    """Texto fijo de un escenario (todo menos el id), con la forma de ScenarioNarrative"""
+    narrative = scenario._asdict()
+    narrative.pop("id")
+    narrative["visual_cues"] = list(scenario.visual_cues)
+    return narrative
+
+
+def _catalog_version() -> str:
+    """Hash del contenido del catálogo: cambia sólo si cambia algún texto"""
+    content = json.dumps(
+        {scenario_id: scenario_narrative(scenario) for scenario_id, scenario in SCENARIOS.items()},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+CATALOG_VERSION: str = _catalog_version()
+
+
+def catalog_payload(scenario_ids: Optional[List[str]] = None) -> Dict[str, object]:
+    """
+    Catálogo con su versión (forma de ScenarioCatalogResponse)
+    Con scenario_ids sólo incluye esos escenarios, en ese orden.
+    """
+    ids = SCENARIO_IDS if scenario_ids is None else scenario_ids
+    return {
+        "version": CATALOG_VERSION,
+        "scenarios": {scenario_id: scenario_narrative(get_scenario(scenario_id)) for scenario_id in ids},
+    }
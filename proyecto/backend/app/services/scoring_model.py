@@ -0,0 +1,425 @@
+"""
+Compilador del modelo de scoring declarativo (Layer A)
+
+Toma un spec de app/config/scoring.py y lo convierte en evaluadores listos
+para el hot path:
+- Escalar: una hora, un perfil (usado por SenseiEngine.analyze)
+- Vectorizado: miles de horas/celdas con numpy (timeline, superficies, bundles)
+
+Los parámetros que dependen del perfil (potencia, experiencia, objetivo, tabla)
+se resuelven UNA vez por perfil y quedan cacheados: hay solo 54 perfiles posibles.
+
+Ambos evaluadores aplican las mismas operaciones en el mismo orden, así que
+producen exactamente los mismos scores.
+"""
+
+import operator
+import os
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.config.scoring import SCORING_MODELS, DEFAULT_SCORING_VERSION
+from app.config.spots import SPOTS
+from app.models.schemas import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Códigos numéricos de dirección relativa para evaluación vectorizada
+RELATIVE_CODES = {"none": 0, "onshore": 1, "cross": 2, "offshore": 3}
+
+
+class Conditions(NamedTuple):
+    """Variables de una hora que usa el modelo (viento/olas/periodo ya con defaults seguros)"""
+    wind_speed: float
+    wave_height: float
+    wave_period: float
+    relative: str
+    weather_code: Optional[int]
+    visibility_km: Optional[float]
+    precipitation_mm: Optional[float]
+    uv_index: Optional[float]
+
+
+# Condiciones numéricas del spec: clave -> (variable, comparación)
+_NUMERIC_CONDITIONS = {
+    "wind_gt_kmh": ("wind_speed", operator.gt),
+    "wind_lt_kmh": ("wind_speed", operator.lt),
+    "wave_gt_m": ("wave_height", operator.gt),
+    "wave_lt_m": ("wave_height", operator.lt),
+    "period_gt_s": ("wave_period", operator.gt),
+    "period_lt_s": ("wave_period", operator.lt),
+    "visibility_lt_km": ("visibility_km", operator.lt),
+    "precipitation_gt_mm": ("precipitation_mm", operator.gt),
+    "uv_gte": ("uv_index", operator.ge),
+}
+
+# Condiciones sobre el perfil: clave -> atributo de UserProfile
+_PROFILE_CONDITIONS = {
+    "board_types": "board_type",
+    "experience": "experience",
+}
+
+ScalarPredicate = Callable[[Conditions], bool]
+VectorPredicate = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+
+def _always_scalar(c: Conditions) -> bool:
+    return True
+
+
+def _always_vector(cols: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.ones(len(cols["wind_speed"]), dtype=bool)
+
+
+def _compile_atom(key: str, value, user: UserProfile) -> Optional[Tuple[ScalarPredicate, VectorPredicate]]:
+    """
+    Compila una condición atómica del spec.
+
+    Returns:
+        (predicado escalar, predicado vectorizado), o None si la condición
+        depende del perfil y NO se cumple (el término nunca aplica)
+    """
+    if key in _PROFILE_CONDITIONS:
+        if getattr(user, _PROFILE_CONDITIONS[key]) in value:
+            return _always_scalar, _always_vector
+        return None
+
+    if key in _NUMERIC_CONDITIONS:
+        var, op = _NUMERIC_CONDITIONS[key]
+
+        def scalar(c: Conditions) -> bool:
+            v = getattr(c, var)
+            return v is not None and op(v, value)
+
+        def vector(cols: Dict[str, np.ndarray]) -> np.ndarray:
+            # NaN (dato faltante) siempre compara False, igual que None en escalar
+            return op(cols[var], value)
+
+        return scalar, vector
+
+    if key == "weather_codes":
+        codes = list(value)
+        return (
+            lambda c: c.weather_code in codes,
+            lambda cols: np.isin(cols["weather_code"], codes)
+        )
+
+    if key == "relative":
+        code = RELATIVE_CODES[value]
+        return (
+            lambda c: c.relative == value,
+            lambda cols: cols["relative"] == code
+        )
+
+    raise ValueError(f"Condición de scoring desconocida: '{key}'")
+
+
+def _compile_conditions(spec: dict, user: UserProfile) -> Optional[Tuple[ScalarPredicate, VectorPredicate]]:
+    """Compila un bloque de condiciones (AND; 'any' agrupa un OR)"""
+    scalars: List[ScalarPredicate] = []
+    vectors: List[VectorPredicate] = []
+
+    for key, value in spec.items():
+        if key == "any":
+            options = [_compile_atom(k, v, user) for k, v in value.items()]
+            options = [o for o in options if o is not None]
+            if not options:
+                return None
+            any_scalars = [o[0] for o in options]
+            any_vectors = [o[1] for o in options]
+            scalars.append(lambda c, fs=any_scalars: any(f(c) for f in fs))
+            vectors.append(lambda cols, fs=any_vectors: np.logical_or.reduce([f(cols) for f in fs]))
+            continue
+
+        atom = _compile_atom(key, value, user)
+        if atom is None:
+            return None
+        if atom[0] is not _always_scalar:
+            scalars.append(atom[0])
+            vectors.append(atom[1])
+
+    if not scalars:
+        return _always_scalar, _always_vector
+    if len(scalars) == 1:
+        return scalars[0], vectors[0]
+    return (
+        lambda c: all(f(c) for f in scalars),
+        lambda cols: np.logical_and.reduce([f(cols) for f in vectors])
+    )
+
+
+def _truncate_clamp(values: np.ndarray) -> np.ndarray:
+    """Equivalente vectorizado de max(0, min(100, int(score)))"""
+    return np.clip(np.trunc(values), 0, 100).astype(np.int16)
+
+
+class ProfileScorer:
+    """
+    Evaluador del modelo ya especializado para un perfil de usuario.
+    Se construye con CompiledScoringModel.for_profile().
+    """
+
+    def __init__(self, spec: dict, user: UserProfile):
+        # --- Flags ---
+        self.flags: List[Tuple[str, ScalarPredicate, VectorPredicate]] = []
+        for name, conditions in spec["flags"].items():
+            compiled = _compile_conditions(conditions, user)
+            if compiled is not None:
+                self.flags.append((name, compiled[0], compiled[1]))
+
+        # --- Seguridad ---
+        seguridad = spec["seguridad"]
+        self.security_base = seguridad["base"]
+        self.security_terms: List[tuple] = []
+        for term in seguridad["terms"]:
+            if "flag" in term:
+                self.security_terms.append(("flag", term["flag"], term["penalty"]))
+            elif "relative" in term:
+                self.security_terms.append(("relative", term["relative"], term["penalty"]))
+            elif "wind_excess" in term:
+                params = term["wind_excess"].get(user.experience)
+                if params:
+                    self.security_terms.append(("wind_excess", params["above_kmh"], params["per_kmh"]))
+            else:
+                raise ValueError(f"Término de seguridad desconocido: {term}")
+        self.critical_flags = list(seguridad.get("critical_flags", []))
+
+        # --- Esfuerzo ---
+        esfuerzo = spec["esfuerzo"]
+        self.effort_wind_factor = esfuerzo["wind_factor"]
+        self.effort_power = esfuerzo["power_multiplier"].get(user.paddle_power, 1.0)
+        self.effort_relative = dict(esfuerzo.get("relative_multiplier", {}))
+        self.effort_wave_factor = esfuerzo["wave_factor"]
+        self.effort_flag_bonus = dict(esfuerzo.get("flag_bonus", {}))
+
+        # --- Disfrute ---
+        disfrute = spec["disfrute"]
+        self.low_security_below = disfrute["low_security"]["below"]
+        self.low_security_penalty = disfrute["low_security"]["penalty"]
+        goal = disfrute["goals"].get(user.session_goal)
+        self.goal_default = goal.get("default", disfrute["fallback"]) if goal else disfrute["fallback"]
+        self.goal_linear = None
+        self.goal_bands: List[Tuple[ScalarPredicate, VectorPredicate, float]] = []
+        self.goal_min_security = None
+        goal_enabled = goal is not None
+        if goal:
+            requires = dict(goal.get("requires", {}))
+            self.goal_min_security = requires.pop("min_seguridad", None)
+            if requires and _compile_conditions(requires, user) is None:
+                goal_enabled = False
+        if goal_enabled:
+            if "linear" in goal:
+                self.goal_linear = (goal["linear"]["base"], goal["linear"]["wind"], goal["linear"]["wave"])
+            for band in goal.get("bands", []):
+                conditions = {k: v for k, v in band.items() if k != "score"}
+                compiled = _compile_conditions(conditions, user)
+                if compiled is not None:
+                    self.goal_bands.append((compiled[0], compiled[1], band["score"]))
+        else:
+            self.goal_min_security = None
+        self.goal_enabled = goal_enabled and (self.goal_linear is not None or bool(self.goal_bands))
+        wind_multiplier = disfrute.get("wind_multiplier", {}).get(user.experience)
+        self.enjoyment_wind_multiplier = (
+            (wind_multiplier["above_kmh"], wind_multiplier["factor"]) if wind_multiplier else None
+        )
+
+    # ==================== Evaluador escalar ====================
+
+    def evaluate_flags(self, c: Conditions) -> List[str]:
+        """Flags del modelo (sin reglas de spot), en orden de reporte"""
+        return [name for name, scalar, _ in self.flags if scalar(c)]
+
+    def security(self, c: Conditions, flags: List[str]) -> int:
+        score = self.security_base
+        for kind, key, amount in self.security_terms:
+            if kind == "flag":
+                if key in flags:
+                    score -= amount
+            elif kind == "relative":
+                if c.relative == key:
+                    score -= amount
+            elif c.wind_speed > key:
+                score -= (c.wind_speed - key) * amount
+        for flag in self.critical_flags:
+            if flag in flags:
+                score = 0
+                break
+        return max(0, min(100, int(score)))
+
+    def effort(self, c: Conditions, flags: List[str]) -> int:
+        effort = c.wind_speed * self.effort_wind_factor * self.effort_power
+        multiplier = self.effort_relative.get(c.relative)
+        if multiplier is not None:
+            effort *= multiplier
+        effort += c.wave_height * self.effort_wave_factor
+        for flag, bonus in self.effort_flag_bonus.items():
+            if flag in flags:
+                effort += bonus
+        return max(0, min(100, int(effort)))
+
+    def enjoyment(self, c: Conditions, seguridad: int) -> int:
+        if seguridad < self.low_security_below:
+            return max(0, seguridad - self.low_security_penalty)
+
+        enjoyment = self.goal_default
+        if self.goal_enabled and (self.goal_min_security is None or seguridad >= self.goal_min_security):
+            if self.goal_bands:
+                for scalar, _, score in self.goal_bands:
+                    if scalar(c):
+                        enjoyment = score
+                        break
+            else:
+                base, wind, wave = self.goal_linear
+                enjoyment = base + (c.wind_speed * wind) + (c.wave_height * wave)
+
+        if self.enjoyment_wind_multiplier and c.wind_speed > self.enjoyment_wind_multiplier[0]:
+            enjoyment *= self.enjoyment_wind_multiplier[1]
+        return max(0, min(100, int(enjoyment)))
+
+    def score(self, c: Conditions, flags: List[str]) -> Tuple[int, int, int]:
+        """Retorna (seguridad, esfuerzo, disfrute) para una hora"""
+        seguridad = self.security(c, flags)
+        return seguridad, self.effort(c, flags), self.enjoyment(c, seguridad)
+
+    # ==================== Evaluador vectorizado ====================
+
+    def evaluate_flag_arrays(self, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Máscara booleana por flag del modelo"""
+        return {name: vector(cols) for name, _, vector in self.flags}
+
+    def score_arrays(
+        self,
+        cols: Dict[str, np.ndarray],
+        flag_masks: Dict[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Versión vectorizada de score(): arrays int16 (seguridad, esfuerzo, disfrute)"""
+        n = len(cols["wind_speed"])
+        wind = cols["wind_speed"]
+        wave = cols["wave_height"]
+        relative = cols["relative"]
+        no_flag = np.zeros(n, dtype=bool)
+
+        # Seguridad
+        score = np.full(n, float(self.security_base))
+        for kind, key, amount in self.security_terms:
+            if kind == "flag":
+                score = score - np.where(flag_masks.get(key, no_flag), amount, 0.0)
+            elif kind == "relative":
+                score = score - np.where(relative == RELATIVE_CODES[key], amount, 0.0)
+            else:
+                score = score - np.where(wind > key, (wind - key) * amount, 0.0)
+        critical = np.logical_or.reduce([flag_masks.get(f, no_flag) for f in self.critical_flags] + [no_flag])
+        score = np.where(critical, 0.0, score)
+        seguridad = _truncate_clamp(score)
+
+        # Esfuerzo
+        effort = wind * self.effort_wind_factor * self.effort_power
+        for rel, multiplier in self.effort_relative.items():
+            effort = effort * np.where(relative == RELATIVE_CODES[rel], multiplier, 1.0)
+        effort = effort + wave * self.effort_wave_factor
+        for flag, bonus in self.effort_flag_bonus.items():
+            effort = effort + np.where(flag_masks.get(flag, no_flag), bonus, 0.0)
+        esfuerzo = _truncate_clamp(effort)
+
+        # Disfrute
+        enjoyment = np.full(n, float(self.goal_default))
+        if self.goal_enabled:
+            if self.goal_bands:
+                enjoyment = np.select(
+                    [vector(cols) for _, vector, _ in self.goal_bands],
+                    [float(score) for _, _, score in self.goal_bands],
+                    default=float(self.goal_default)
+                )
+            else:
+                base, wind_k, wave_k = self.goal_linear
+                enjoyment = base + (wind * wind_k) + (wave * wave_k)
+            if self.goal_min_security is not None:
+                enjoyment = np.where(seguridad >= self.goal_min_security, enjoyment, float(self.goal_default))
+        if self.enjoyment_wind_multiplier:
+            above, factor = self.enjoyment_wind_multiplier
+            enjoyment = enjoyment * np.where(wind > above, factor, 1.0)
+        disfrute = _truncate_clamp(enjoyment)
+        low = seguridad < self.low_security_below
+        disfrute = np.where(low, np.maximum(0, seguridad - self.low_security_penalty), disfrute).astype(np.int16)
+
+        return seguridad, esfuerzo, disfrute
+
+
+class CompiledScoringModel:
+    """
+    Modelo de scoring compilado desde un spec declarativo.
+    Inmutable: para cambiar pesos se registra una nueva versión.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.version: str = spec["version"]
+        self.category_alto = spec["categories"]["alto"]
+        self.category_medio = spec["categories"]["medio"]
+
+        # Catálogo de flags con bit estable: flags del modelo + reglas de spots
+        names = list(spec["flags"].keys())
+        for spot in SPOTS.values():
+            for regla in spot.get("reglas_especificas", []):
+                if regla["flag"] not in names:
+                    names.append(regla["flag"])
+        self.flag_names: List[str] = names
+        self.flag_bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(names)}
+
+        self._profiles: Dict[tuple, ProfileScorer] = {}
+
+    def for_profile(self, user: UserProfile) -> ProfileScorer:
+        """Evaluador especializado para el perfil (cacheado)"""
+        key = (user.board_type, user.experience, user.paddle_power, user.session_goal)
+        scorer = self._profiles.get(key)
+        if scorer is None:
+            scorer = ProfileScorer(self.spec, user)
+            self._profiles[key] = scorer
+        return scorer
+
+    def categorize(self, score: int) -> str:
+        if score >= self.category_alto:
+            return "alto"
+        elif score >= self.category_medio:
+            return "medio"
+        return "bajo"
+
+    def categorize_arrays(self, scores: np.ndarray) -> np.ndarray:
+        """Categorías vectorizadas como códigos: 0=bajo, 1=medio, 2=alto"""
+        return (scores >= self.category_medio).astype(np.int8) + (scores >= self.category_alto).astype(np.int8)
+
+
+_compiled_models: Dict[str, CompiledScoringModel] = {}
+
+
+def get_scoring_model(version: Optional[str] = None) -> CompiledScoringModel:
+    """
+    Retorna el modelo compilado para la versión pedida.
+    Sin versión explícita usa SCORING_MODEL_VERSION (env) o el default.
+    """
+    version = version or os.getenv("SCORING_MODEL_VERSION") or DEFAULT_SCORING_VERSION
+    model = _compiled_models.get(version)
+    if model is None:
+        if version not in SCORING_MODELS:
+            raise ValueError(f"Modelo de scoring '{version}' no registrado")
+        model = CompiledScoringModel(SCORING_MODELS[version])
+        _compiled_models[version] = model
+    return model
+
+
+def compile_all_models() -> List[str]:
+    """Compila todos los modelos registrados (al iniciar la app, falla rápido si hay specs inválidos)"""
+    for version in SCORING_MODELS:
+        model = get_scoring_model(version)
+        # Especializar para un perfil fuerza la validación de todos los términos
+        model.for_profile(UserProfile(board_type="rigid", experience="beginner", paddle_power="medium"))
+    logger.info(f"🧮 Modelos de scoring compilados: {list(_compiled_models)}")
+    return list(_compiled_models)
+
+
+def clear_cache():
+    """Descarta los modelos compilados (se recompilan a demanda)"""
+    global _compiled_models
+    _compiled_models = {}
@@ -1,24 +1,44 @@
 import math
-from typing import List, Tuple
-from app.models.schemas import (
-    WeatherData, UserProfile, EngineResult, 
-    Scores, Categories, ConfidenceFactors
-)
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from app.models.schemas import WeatherData, UserProfile, EngineResult
+from app.models.internal import WeatherRecord, EngineRecord, SemanticsRecord
 from app.config.spots import SPOTS
+from app.services.scoring_model import (
+    CompiledScoringModel, Conditions, RELATIVE_CODES, get_scoring_model
+)
 from datetime import datetime, timezone
 
+# Agregados dinámicos a la semántica según flags: (flag, campo, texto); {uv} = índice UV
+SEMANTIC_EXTRAS: Tuple[Tuple[str, str, str], ...] = (
+    ("uv_alto", "strategy", " ☀️ El sol está muy fuerte (UV {uv:.1f}). Usá lycra, gorro y mucho protector solar."),
+    ("lluvia", "risk", " 🌧️ La lluvia reduce la visibilidad y enfría el cuerpo rápido. "),
+    ("mar_picado", "risk", " 🌊 El mar está picado (periodo corto), te va a costar más mantener el equilibrio."),
+)
+
 class SenseiEngine:
     """
     Motor determinístico (Layer A)
     Calcula seguridad, esfuerzo y disfrute SIN usar IA
     100% reproducible: mismo input → mismo output
+    
+    Los pesos y umbrales viven en un modelo de scoring declarativo
+    (app/config/scoring.py) compilado en app/services/scoring_model.py.
     """
     
+    def __init__(self, scoring_model: Optional[CompiledScoringModel] = None):
+        """
+        Args:
+            scoring_model: Opcional - modelo compilado (default: SCORING_MODEL_VERSION o v1)
+        """
+        self.model = scoring_model or get_scoring_model()
+    
     def analyze(
         self, 
-        weather: WeatherData, 
+        weather: Union[WeatherData, WeatherRecord], 
         spot_id: str, 
-        user: UserProfile
+        user: UserProfile,
+        data_epoch: Optional[int] = None
     ) -> EngineResult:
         """
         Análisis completo de condiciones
@@ -26,14 +46,28 @@ class SenseiEngine:
         Returns:
             EngineResult con scores, categorías, flags y confianza
         """
+        return self.evaluate(weather, spot_id, user, data_epoch).to_schema()
+    
+    def evaluate(
+        self, 
+        weather: Union[WeatherData, WeatherRecord], 
+        spot_id: str, 
+        user: UserProfile,
+        data_epoch: Optional[int] = None
+    ) -> EngineRecord:
+        """
+        Igual que analyze() pero retorna el tipo interno EngineRecord (sin pydantic)
+        
+        Args:
+            weather: WeatherData o su equivalente interno WeatherRecord
+            data_epoch: Opcional - hora de los datos en epoch (evita re-parsear weather.timestamp)
+        """
         spot = SPOTS.get(spot_id)
         if not spot:
             raise ValueError(f"Spot '{spot_id}' no encontrado")
         
         # Safe defaults for None values (API failures)
-        wind_speed = weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0
         wind_deg = weather.wind.direction_deg if weather.wind.direction_deg is not None else 0
-        wave_height = weather.waves.height_m if weather.waves.height_m is not None else 0.0
         
         # Calcular dirección relativa del viento
         wind_relative = self._calculate_wind_relative_direction(
@@ -43,52 +77,143 @@ class SenseiEngine:
         weather.wind.relative_direction = wind_relative
         
         # Evaluar flags de alerta
-        flags = self._evaluate_flags(weather, user, spot)
+        scorer = self.model.for_profile(user)
+        conditions = self._build_conditions(weather)
+        flags = self._evaluate_flags(weather, user, spot, conditions)
         
         # Calcular scores
-        seguridad = self._calculate_security_score(weather, user, flags)
-        esfuerzo = self._calculate_effort_score(weather, user)
-        disfrute = self._calculate_enjoyment_score(weather, user, seguridad)
-        
-        # Categorizar scores
-        cat_seguridad = self._categorize_score(seguridad)
-        cat_esfuerzo = self._categorize_score(esfuerzo)
-        cat_disfrute = self._categorize_score(disfrute)
+        seguridad, esfuerzo, disfrute = scorer.score(conditions, flags)
         
         # Calcular confianza
-        confidence, conf_factors = self._calculate_confidence(weather)
+        confidence, (completeness, freshness, volatility) = self._calculate_confidence(weather, data_epoch)
         
         # Calcular semántica (Sensei 3.0)
         semantics = self._analyze_semantics(weather, user, flags, spot)
         
-        return EngineResult(
-            scores=Scores(
-                seguridad=seguridad,
-                esfuerzo=esfuerzo,
-                disfrute=disfrute
-            ),
-            categories=Categories(
-                seguridad=cat_seguridad,
-                esfuerzo=cat_esfuerzo,
-                disfrute=cat_disfrute
-            ),
+        return EngineRecord(
+            seguridad=seguridad,
+            esfuerzo=esfuerzo,
+            disfrute=disfrute,
+            # Categorizar scores
+            cat_seguridad=self._categorize_score(seguridad),
+            cat_esfuerzo=self._categorize_score(esfuerzo),
+            cat_disfrute=self._categorize_score(disfrute),
             flags=flags,
             semantics=semantics,
             confidence=confidence,
-            confidence_factors=conf_factors
+            data_completeness=completeness,
+            data_freshness=freshness,
+            volatility=volatility,
+            scoring_version=self.model.version
         )
     
+    def analyze_arrays(
+        self,
+        columns: Dict[str, np.ndarray],
+        spot_id: str,
+        user: UserProfile,
+        tide_state: Union[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Evaluador vectorizado: scores y flags para N horas (o celdas) a la vez
+        
+        Args:
+            columns: Arrays por variable (NaN = dato faltante): wind_speed_kmh,
+                wind_direction_deg, wave_height_m, wave_period_s, precipitation_mm,
+                uv_index, visibility_km, weather_code
+            tide_state: Estado de marea (uno para todas las filas, o array por fila)
+            
+        Returns:
+            Dict con "relative" (códigos RELATIVE_CODES), "flags" (bitmask según
+            model.flag_bits), "seguridad"/"esfuerzo"/"disfrute" (int16) y
+            "scenario" (índices en scenario_catalog.SCENARIO_IDS)
+        """
+        from app.services.scenario_catalog import classify_scenario_arrays
+        
+        spot = SPOTS.get(spot_id)
+        if not spot:
+            raise ValueError(f"Spot '{spot_id}' no encontrado")
+        
+        wind_speed = np.asarray(columns["wind_speed_kmh"], dtype=float)
+        n = len(wind_speed)
+        
+        def column(name: str, default: float = np.nan) -> np.ndarray:
+            values = columns.get(name)
+            if values is None:
+                return np.full(n, default)
+            values = np.asarray(values, dtype=float)
+            return values if np.isnan(default) else np.where(np.isnan(values), default, values)
+        
+        # Safe defaults for None values (API failures)
+        wind_deg = column("wind_direction_deg", 0.0)
+        relative = self._calculate_wind_relative_codes(wind_deg)
+        cols = {
+            "wind_speed": np.where(np.isnan(wind_speed), 0.0, wind_speed),
+            "wave_height": column("wave_height_m", 0.0),
+            "wave_period": column("wave_period_s", 0.0),
+            "relative": relative,
+            "weather_code": column("weather_code"),
+            "visibility_km": column("visibility_km"),
+            "precipitation_mm": column("precipitation_mm"),
+            "uv_index": column("uv_index"),
+        }
+        
+        scorer = self.model.for_profile(user)
+        masks = scorer.evaluate_flag_arrays(cols)
+        for regla in spot.get("reglas_especificas", []):
+            masks[regla["flag"]] = self._evaluate_spot_rule_arrays(regla, relative, tide_state)
+        
+        seguridad, esfuerzo, disfrute = scorer.score_arrays(cols, masks)
+        
+        no_flag = np.zeros(n, dtype=bool)
+        scenario = classify_scenario_arrays(
+            wind_speed=cols["wind_speed"],
+            wind_rel=relative,
+            wave_height=cols["wave_height"],
+            tide_state=tide_state,
+            critical=masks.get("tormenta_electrica", no_flag) | masks.get("visibilidad_nula", no_flag),
+            riesgo_deriva=masks.get("riesgo_deriva", no_flag)
+        )
+        
+        bits = np.zeros(n, dtype=np.uint32)
+        for name, mask in masks.items():
+            bits |= np.where(mask, np.uint32(self.model.flag_bits[name]), np.uint32(0))
+        
+        return {
+            "relative": relative,
+            "flags": bits,
+            "seguridad": seguridad,
+            "esfuerzo": esfuerzo,
+            "disfrute": disfrute,
+            "scenario": scenario,
+        }
+    
+    def confidence(
+        self,
+        weather: Union[WeatherData, WeatherRecord],
+        data_epoch: Optional[int] = None,
+        now: Optional[float] = None
+    ) -> str:
+        """
+        Nivel de confianza de los datos de una hora (no depende del perfil)
+        `now` (epoch) fija el momento de referencia de la frescura (default: ahora).
+        """
+        return self._calculate_confidence(weather, data_epoch, now)[0]
+    
+    def flag_names_from_bits(self, bits: int) -> List[str]:
+        """Decodifica un bitmask de analyze_arrays() a nombres de flags"""
+        return [name for name in self.model.flag_names if bits & self.model.flag_bits[name]]
+    
     def _analyze_semantics(
         self,
         weather: WeatherData,
         user: UserProfile,
         flags: List[str],
         spot: dict
-    ) -> "SemanticAnalysis":
+    ) -> SemanticsRecord:
         """
         HAX v6: Escenario coherente + personalización + cierre pedagógico
         """
-        from app.models.schemas import SemanticAnalysis
         from app.services.scenario_catalog import classify_scenario, get_scenario
         
         # Use safe defaults for None values (API failures)
@@ -112,19 +237,16 @@ class SenseiEngine:
         strategy_addite = ""
         risk_addite = ""
         
-        if "uv_alto" in flags:
-            uv_val = weather.atmosphere.uv_index
-            strategy_addite += f" ☀️ El sol está muy fuerte (UV {uv_val:.1f}). Usá lycra, gorro y mucho protector solar."
-            
-        if "lluvia" in flags:
-            driver = "lluvia" if "lluvia" in flags else "" # Placeholder
-            risk_addite += " 🌧️ La lluvia reduce la visibilidad y enfría el cuerpo rápido. "
-            
-        if "mar_picado" in flags:
-            risk_addite += " 🌊 El mar está picado (periodo corto), te va a costar más mantener el equilibrio."
+        for flag, target, text in SEMANTIC_EXTRAS:
+            if flag not in flags:
+                continue
+            if target == "strategy":
+                strategy_addite += text.format(uv=weather.atmosphere.uv_index)
+            else:
+                risk_addite += text
 
         # 4. Retornar semántica enriquecida
-        return SemanticAnalysis(
+        return SemanticsRecord(
             scenario_id=scenario.id,
             driver_desc=scenario.driver_desc,
             behavior_desc=scenario.behavior_desc,
@@ -135,7 +257,9 @@ class SenseiEngine:
             strategy_desc=scenario.strategy_desc + strategy_addite,
             beginner_tip=scenario.beginner_tip,
             advanced_tip=scenario.advanced_tip,
-            learning_focus=scenario.learning_focus
+            learning_focus=scenario.learning_focus,
+            risk_extra=risk_addite,
+            strategy_extra=strategy_addite
         )
     
     def _calculate_wind_relative_direction(
@@ -173,68 +297,47 @@ class SenseiEngine:
             return "offshore"  # Viento de tierra hacia el mar (SSO a NNO)
         else:
             return "cross"     # Sector Norte (337.5 - 360 - 22.5)
+    
+    def _calculate_wind_relative_codes(self, wind_deg: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de _calculate_wind_relative_direction
+        Retorna códigos RELATIVE_CODES (mismos rangos de Mar del Plata)
+        """
+        deg = np.mod(wind_deg, 360)
+        return np.select(
+            [(deg >= 22.5) & (deg <= 157.5), (deg >= 202.5) & (deg <= 337.5)],
+            [RELATIVE_CODES["onshore"], RELATIVE_CODES["offshore"]],
+            default=RELATIVE_CODES["cross"]
+        ).astype(np.int8)
             
+    def _build_conditions(self, weather: WeatherData) -> Conditions:
+        """Variables de entrada del modelo de scoring (con defaults seguros)"""
+        atmosphere = weather.atmosphere
+        return Conditions(
+            wind_speed=weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0,
+            wave_height=weather.waves.height_m if weather.waves.height_m is not None else 0.0,
+            wave_period=weather.waves.period_s if weather.waves.period_s is not None else 0.0,
+            relative=weather.wind.relative_direction or "none",
+            weather_code=atmosphere.weather_code if atmosphere else None,
+            visibility_km=atmosphere.visibility_km if atmosphere else None,
+            precipitation_mm=atmosphere.precipitation_mm if atmosphere else None,
+            uv_index=atmosphere.uv_index if atmosphere else None
+        )
+    
     def _evaluate_flags(
         self, 
         weather: WeatherData, 
         user: UserProfile, 
-        spot: dict
+        spot: dict,
+        conditions: Optional[Conditions] = None
     ) -> List[str]:
         """
         Evalúa condiciones y retorna flags de alerta
+        (umbrales definidos en el modelo de scoring + reglas del spot)
         """
-        flags = []
-        
-        # Safe defaults for None
-        wind_speed = weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0
-        wave_height = weather.waves.height_m if weather.waves.height_m is not None else 0.0
-        wave_period = weather.waves.period_s if weather.waves.period_s is not None else 0.0
-        
-        # --- Flags Críticos de Seguridad ---
-        
-        # Tormenta Eléctrica (Códigos WMO 95, 96, 99)
-        wcode = weather.atmosphere.weather_code
-        if wcode in [95, 96, 99]:
-            flags.append("tormenta_electrica")
-            
-        # Visibilidad Nula (< 1km)
-        vis = weather.atmosphere.visibility_km
-        if vis is not None and vis < 1.0:
-            flags.append("visibilidad_nula")
-        
-        # --- Flags de Condiciones ---
-        
-        # Viento fuerte
-        if wind_speed > 30:
-            flags.append("viento_fuerte")
-        
-        # Riesgo de deriva (offshore + inflable)
-        if (weather.wind.relative_direction == "offshore" and 
-            user.board_type == "inflable"):
-            flags.append("riesgo_deriva")
-        
-        # Olas grandes
-        if wave_height > 1.5:
-            flags.append("olas_grandes")
-            
-        # Mar Picado (Choppy): Periodo corto con cierta altura
-        if wave_period > 0 and wave_period < 5.0 and wave_height > 0.5:
-            flags.append("mar_picado")
-        
-        # Lluvia
-        precip = weather.atmosphere.precipitation_mm
-        if precip is not None and precip > 0.5:
-            flags.append("lluvia")
-            
-        # UV Alto
-        uv = weather.atmosphere.uv_index
-        if uv is not None and uv >= 6.0:
-            flags.append("uv_alto")
-        
-        # Principiante en condiciones moderadas
-        if (user.experience == "beginner" and 
-            (wind_speed > 20 or wave_height > 1.0)):
-            flags.append("principiante_condiciones_moderadas")
+        if conditions is None:
+            conditions = self._build_conditions(weather)
+        flags = self.model.for_profile(user).evaluate_flags(conditions)
         
         # Reglas específicas del spot
         for regla in spot.get("reglas_especificas", []):
@@ -256,176 +359,58 @@ class SenseiEngine:
         
         return False
     
-    def _calculate_security_score(
-        self, 
-        weather: WeatherData, 
-        user: UserProfile, 
-        flags: List[str]
-    ) -> int:
-        """
-        Calcula score de SEGURIDAD (0-100, donde 100 = muy seguro)
-        ⚠️ NO "riesgo" - el score está invertido
-        """
-        score = 100  # Empezamos en máxima seguridad
-        
-        # Penalizaciones por flags
-        if "viento_fuerte" in flags:
-            score -= 30
-        
-        if "riesgo_deriva" in flags:
-            score -= 40  # Muy peligroso
-        
-        if "olas_grandes" in flags:
-            score -= 25
-        
-        if "principiante_condiciones_moderadas" in flags:
-            score -= 15
-        
-        if "deriva_varese" in flags:
-            score -= 20
-        
-        # Penalización adicional por viento según experiencia
-        wind_speed = weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0
-        if user.experience == "beginner" and wind_speed > 15:
-            score -= (wind_speed - 15) * 1.5
-        
-        # Ajuste por offshore (siempre reduce seguridad)
-        if weather.wind.relative_direction == "offshore":
-            score -= 15
-            
-        # Penalización por Mar Picado (inestabilidad)
-        if "mar_picado" in flags:
-            score -= 10
-            
-        # Penalización por Visibilidad/Lluvia
-        if "visibilidad_nula" in flags or "tormenta_electrica" in flags:
-            score = 0  # CRÍTICO: Anular seguridad
-        elif "lluvia" in flags:
-            score -= 10
-        
-        # Clamp entre 0-100
-        return max(0, min(100, int(score)))
-    
-    def _calculate_effort_score(
-        self, 
-        weather: WeatherData, 
-        user: UserProfile
-    ) -> int:
-        """
-        Calcula score de ESFUERZO (0-100, donde 100 = muy exigente)
-        Basado en viento vs potencia de remada
-        """
-        wind_speed = weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0
-        wave_height = weather.waves.height_m if weather.waves.height_m is not None else 0.0
-        base_effort = wind_speed * 2  # Base proporcional al viento
-        
-        # Ajuste por potencia de remada
-        power_multiplier = {
-            "low": 1.5,    # Baja potencia = más esfuerzo
-            "medium": 1.0,
-            "high": 0.7    # Alta potencia = menos esfuerzo
-        }
-        effort = base_effort * power_multiplier.get(user.paddle_power, 1.0)
-        
-        # Offshore requiere más esfuerzo (difícil volver)
-        if weather.wind.relative_direction == "offshore":
-            effort *= 1.3
-        
-        # Olas aumentan esfuerzo
-        effort += wave_height * 15
-        
-        # Mar Picado aumenta esfuerzo significativamente (constante corrección)
-        if weather.waves.period_s and weather.waves.period_s < 5.0 and wave_height > 0.5:
-            effort += 20
-        
-        # Clamp entre 0-100
-        return max(0, min(100, int(effort)))
-    
-    def _calculate_enjoyment_score(
-        self, 
-        weather: WeatherData, 
-        user: UserProfile,
-        seguridad: int
-    ) -> int:
-        """
-        Calcula score de DISFRUTE (0-100, donde 100 = muy disfrutable)
-        ⚠️ CRÍTICO: Basado en objetivo de sesión, NO inverso de riesgo
-        """
-        goal = user.session_goal
-        wind_speed = weather.wind.speed_kmh if weather.wind.speed_kmh is not None else 0.0
-        wave_height = weather.waves.height_m if weather.waves.height_m is not None else 0.0
-        
-        # Si seguridad es muy baja, disfrute también baja (no importa objetivo)
-        if seguridad < 30:
-            return max(0, seguridad - 10)
-        
-        # Cálculo según objetivo
-        if goal == "calma":
-            # Prefiere condiciones suaves
-            enjoyment = 90
-            enjoyment -= wind_speed * 2  # Menos viento = mejor
-            enjoyment -= wave_height * 20  # Menos olas = mejor
-            
-        elif goal == "entrenamiento":
-            # Prefiere condiciones moderadas  que desafíen sin abrumar
-            if 15 < wind_speed < 25 and wave_height < 1.5:
-                enjoyment = 85  # Condiciones ideales para entrenar
-            elif wind_speed < 10:
-                enjoyment = 40  # Demasiado tranquilo para entrenar
-            else:
-                enjoyment = 50  # Demasiado exigente
-                
-        elif goal == "desafio":
-            # Avanzados disfrutan condiciones exig entes (pero seguras)
-            if user.experience == "advanced" and seguridad >= 50:
-                # Más viento y olas = más diversión
-                enjoyment = 50 + (wind_speed * 1.5) + (wave_height * 15)
-            else:
-                # No avanzado o inseguro
-                enjoyment = 30
-        else:
-            enjoyment = 50  # Fallback
+    def _evaluate_spot_rule_arrays(
+        self,
+        regla: dict,
+        relative: np.ndarray,
+        tide_state: Union[str, np.ndarray]
+    ) -> np.ndarray:
+        """Versión vectorizada de _evaluate_spot_rule"""
+        condition = regla.get("condition", "")
         
-        # Ajuste por experiencia
-        if user.experience == "beginner" and wind_speed > 20:
-            enjoyment *= 0.7  # Principiantes no disfrutan viento fuerte
+        if condition == "tide_falling_and_wind_offshore":
+            tide_falling = np.asarray(tide_state) == "falling"
+            return tide_falling & (relative == RELATIVE_CODES["offshore"])
         
-        # Clamp entre 0-100
-        return max(0, min(100, int(enjoyment)))
+        return np.zeros(len(relative), dtype=bool)
     
     def _categorize_score(self, score: int) -> str:
         """
         Convierte score numérico a categoría
         """
-        if score >= 70:
-            return "alto"
-        elif score >= 40:
-            return "medio"
-        else:
-            return "bajo"
+        return self.model.categorize(score)
     
     def _calculate_confidence(
         self, 
-        weather: WeatherData
-    ) -> Tuple[str, ConfidenceFactors]:
+        weather: WeatherData,
+        data_epoch: Optional[int] = None,
+        now: Optional[float] = None
+    ) -> Tuple[str, Tuple[float, float, float]]:
         """
         Calcula confianza del modelo de forma FORMAL
         No es metadata, es parte del resultado
+        
+        Returns:
+            (nivel, (completitud, frescura, volatilidad))
         """
         score = 100.0
         
         # Factor 1: Completitud de datos
         completeness = 1.0
-        if weather.wind.speed_kmh == 0:
+        if not weather.wind.speed_kmh:  # 0 o sin dato
             completeness -= 0.5
-        if weather.waves.height_m == 0:
+        if not weather.waves.height_m:
             completeness -= 0.3
         
         # Factor 2: Frescura de datos
         try:
-            data_time = datetime.fromisoformat(weather.timestamp.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            age_hours = (now - data_time).total_seconds() / 3600
+            if now is None:
+                now = datetime.now(timezone.utc).timestamp()
+            if data_epoch is not None:
+                age_hours = (now - data_epoch) / 3600
+            else:
+                data_time = datetime.fromisoformat(weather.timestamp.replace('Z', '+00:00'))
+                age_hours = (datetime.fromtimestamp(now, timezone.utc) - data_time).total_seconds() / 3600
             
             if age_hours > 3:
                 freshness = max(0, 1.0 - (age_hours - 3) / 10)
@@ -448,10 +433,4 @@ class SenseiEngine:
         else:
             confidence_level = "baja"
         
-        factors = ConfidenceFactors(
-            data_completeness=completeness,
-            data_freshness=freshness,
-            volatility=volatility
-        )
-        
-        return confidence_level, factors
+        return confidence_level, (completeness, freshness, volatility)
@@ -0,0 +1,150 @@
+"""
+Buscador de ventanas de sesión
+
+Recorre todo el horizonte del pronóstico buscando ventanas contiguas de N horas
+que maximicen el disfrute manteniendo la seguridad por encima de un piso.
+
+Estrategia: el motor se evalúa UNA vez por hora con el evaluador vectorizado y
+las ventanas se agregan con sumas prefijas / ventanas deslizantes sobre esos
+arrays. Una semana completa para un perfil cuesta fracciones de milisegundo,
+así que se puede correr para los 54 perfiles en cada refresh.
+"""
+
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.models.schemas import WeatherData, UserProfile, SessionWindow
+from app.services.hourly_frame import HourlyFrame, TIMESTAMP_FORMAT
+from app.services.profile_codes import all_profiles, profile_code
+from app.services.scenario_catalog import SCENARIO_IDS
+from app.services.sensei_engine import SenseiEngine
+
+# Hora local de Argentina (UTC-3), igual que la timeline
+ARGENTINA_TZ = timezone(timedelta(hours=-3))
+
+HOUR_SECONDS = 3600
+
+
+def forecast_columns(forecast: List[WeatherData]) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """
+    Convierte una lista de WeatherData en columnas para SenseiEngine.analyze_arrays
+    (los providers que ya entregan HourlyFrame no la necesitan)
+    
+    Returns:
+        (epochs en segundos, columnas por variable, estado de marea por hora)
+    """
+    frame = HourlyFrame.from_weather_data(forecast)
+    return frame.epochs, frame.columns, frame.tide
+
+
+def _window_sums(values: np.ndarray, size: int) -> np.ndarray:
+    """Suma de cada ventana de `size` elementos usando sumas prefijas"""
+    prefix = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    return prefix[size:] - prefix[:-size]
+
+
+def _select_non_overlapping(order: np.ndarray, size: int, n_hours: int, top_k: int) -> List[int]:
+    """Greedy: toma las mejores ventanas que no se pisan con las ya elegidas"""
+    taken = np.zeros(n_hours, dtype=bool)
+    chosen: List[int] = []
+    for start in order:
+        if taken[start:start + size].any():
+            continue
+        taken[start:start + size] = True
+        chosen.append(int(start))
+        if len(chosen) == top_k:
+            break
+    return chosen
+
+
+def find_session_windows(
+    epochs: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    tide: np.ndarray,
+    spot_id: str,
+    user: UserProfile,
+    duration_hours: int,
+    min_seguridad: int,
+    top_k: int,
+    engine: Optional[SenseiEngine] = None
+) -> List[SessionWindow]:
+    """
+    Top-k ventanas no superpuestas de `duration_hours` horas contiguas
+
+    Una ventana es válida si TODAS sus horas tienen seguridad >= min_seguridad.
+    Se ordenan por disfrute promedio (desempate: mejor seguridad mínima, más temprano).
+    """
+    engine = engine or SenseiEngine()
+    n = len(epochs)
+    size = duration_hours
+    if n < size:
+        return []
+
+    arrays = engine.analyze_arrays(columns, spot_id, user, tide)
+    seguridad = arrays["seguridad"]
+    disfrute = arrays["disfrute"]
+
+    # Ventanas con alguna hora insegura o algún hueco horario quedan afuera
+    unsafe = _window_sums((seguridad < min_seguridad).astype(np.int64), size)
+    gaps = np.concatenate(([0], (np.diff(epochs) != HOUR_SECONDS).astype(np.int64)))
+    gap_counts = _window_sums(gaps, size) - gaps[:n - size + 1]
+    valid = (unsafe == 0) & (gap_counts == 0)
+    if not valid.any():
+        return []
+
+    disfrute_sum = _window_sums(disfrute, size)
+    esfuerzo_sum = _window_sums(arrays["esfuerzo"], size)
+    seguridad_min = sliding_window_view(seguridad, size).min(axis=1)
+    flags_union = np.bitwise_or.reduce(sliding_window_view(arrays["flags"], size), axis=1)
+
+    candidates = np.flatnonzero(valid)
+    # lexsort: la última clave es la principal
+    order = candidates[np.lexsort((candidates, -seguridad_min[candidates], -disfrute_sum[candidates]))]
+    chosen = _select_non_overlapping(order, size, n, top_k)
+
+    windows = []
+    for start in chosen:
+        end = start + size
+        start_local = datetime.fromtimestamp(int(epochs[start]), ARGENTINA_TZ)
+        end_local = datetime.fromtimestamp(int(epochs[end - 1]) + HOUR_SECONDS, ARGENTINA_TZ)
+        scenario_ids = []
+        for idx in arrays["scenario"][start:end]:
+            if SCENARIO_IDS[idx] not in scenario_ids:
+                scenario_ids.append(SCENARIO_IDS[idx])
+        windows.append(SessionWindow(
+            start=datetime.fromtimestamp(int(epochs[start]), timezone.utc).strftime(TIMESTAMP_FORMAT),
+            end=datetime.fromtimestamp(int(epochs[end - 1]) + HOUR_SECONDS, timezone.utc).strftime(TIMESTAMP_FORMAT),
+            date_label=start_local.strftime("%Y-%m-%d"),
+            start_label=start_local.strftime("%H:00"),
+            end_label=end_local.strftime("%H:00"),
+            disfrute_avg=round(float(disfrute_sum[start]) / size, 1),
+            esfuerzo_avg=round(float(esfuerzo_sum[start]) / size, 1),
+            seguridad_min=int(seguridad_min[start]),
+            flags=engine.flag_names_from_bits(int(flags_union[start])),
+            scenario_ids=scenario_ids
+        ))
+    return windows
+
+
+def find_windows_for_all_profiles(
+    frame: HourlyFrame,
+    spot_id: str,
+    duration_hours: int,
+    min_seguridad: int,
+    top_k: int,
+    engine: Optional[SenseiEngine] = None
+) -> Dict[str, List[SessionWindow]]:
+    """
+    Ventanas para los 54 perfiles (pensado para correr en cada refresh)
+    Las columnas del frame se reutilizan para todos los perfiles.
+    """
+    engine = engine or SenseiEngine()
+    return {
+        profile_code(user): find_session_windows(
+            frame.epochs, frame.columns, frame.tide, spot_id, user, duration_hours, min_seguridad, top_k, engine
+        )
+        for user in all_profiles()
+    }
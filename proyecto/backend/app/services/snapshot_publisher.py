@@ -0,0 +1,132 @@
+"""
+Publisher de snapshots estáticos (modo publisher: SNAPSHOT_PUBLISHER=1)
+
+En cada refresh de bundles se escribe el bundle offline de cada spot (clima +
+resultados de los 54 perfiles, ver offline_bundle) como archivo estático
+versionado y precomprimido, en SNAPSHOT_DIR (los sirve la ruta /snapshots/ de
+main.py o un CDN que apunte al directorio):
+
+    snapshots/index.json                    -> última versión de cada spot
+    snapshots/{spot}/{version}.json         (+ .json.br, .json.gz)
+
+El directorio queda fuera de app/static a propósito: main.py monta la SPA si
+existe app/static, y crearlo sin el build del frontend rompería el catch-all.
+
+Los archivos versionados no cambian nunca (cache inmutable en navegador/CDN);
+sólo index.json se reescribe. Las escrituras son atómicas (archivo temporal +
+rename): un lector nunca ve un archivo a medio escribir. Se conservan las
+últimas SNAPSHOT_KEEP_VERSIONS versiones por spot para los clientes que
+todavía tienen un index.json viejo.
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from app.services.hourly_frame import TIMESTAMP_FORMAT
+from app.services.response_cache import CachedResponse, JSON_MEDIA_TYPE, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_URL_PREFIX = "/snapshots"
+SNAPSHOT_KEEP_VERSIONS = 3
+SNAPSHOT_INDEX_MAX_AGE = 60  # index.json: los clientes ven una versión nueva en ~1 min
+
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Última versión publicada por spot (espejo de index.json)
+_index: Dict[str, dict] = {}
+
+
+def enabled() -> bool:
+    return os.getenv("SNAPSHOT_PUBLISHER", "").lower() in ("1", "true", "yes")
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _prune(spot_dir: str, keep: str):
+    """Borra las versiones viejas del spot (conserva las SNAPSHOT_KEEP_VERSIONS más nuevas)"""
+    versions = sorted(
+        (name for name in os.listdir(spot_dir) if name.endswith(".json")),
+        key=lambda name: os.path.getmtime(os.path.join(spot_dir, name)),
+        reverse=True
+    )
+    for name in versions[SNAPSHOT_KEEP_VERSIONS:]:
+        if name == f"{keep}.json":
+            continue
+        for suffix in ("", *ENCODING_SUFFIXES.values()):
+            try:
+                os.remove(os.path.join(spot_dir, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def publish(spot_id: str, version: str, entry: CachedResponse, valid_until: Optional[str] = None) -> bool:
+    """
+    Escribe el snapshot (y sus variantes br/gzip) y actualiza index.json
+    Retorna False si esa versión ya estaba publicada.
+    """
+    if _index.get(spot_id, {}).get("version") == version:
+        return False
+
+    spot_dir = os.path.join(SNAPSHOT_DIR, spot_id)
+    os.makedirs(spot_dir, exist_ok=True)
+    path = os.path.join(spot_dir, f"{version}.json")
+    # Variantes primero: cuando aparece el .json ya están todas
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        _write_atomic(path + suffix, entry.encoded(encoding))
+    _write_atomic(path, entry.body)
+
+    _index[spot_id] = {
+        "version": version,
+        "url": f"{SNAPSHOT_URL_PREFIX}/{spot_id}/{version}.json",
+        "published_at": datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT),
+        "valid_until": valid_until,
+    }
+    _write_atomic(os.path.join(SNAPSHOT_DIR, "index.json"), orjson.dumps({"spots": _index}))
+    _prune(spot_dir, version)
+    logger.info(f"📦 Snapshot publicado: {spot_id} {version}")
+    return True
+
+
+def snapshot_response(file_path: str, accept_encoding: Optional[str] = None) -> Response:
+    """
+    Archivo publicado, eligiendo la variante precomprimida según Accept-Encoding
+    (para cuando el proceso sirve los snapshots sin CDN adelante)
+
+    Raises:
+        FileNotFoundError: si el archivo no existe o está fuera del directorio
+    """
+    root = os.path.realpath(SNAPSHOT_DIR)
+    path = os.path.realpath(os.path.join(root, file_path))
+    if not path.startswith(root + os.sep) or not path.endswith(".json") or not os.path.isfile(path):
+        raise FileNotFoundError(file_path)
+
+    if os.path.basename(path) == "index.json":
+        cache_control = f"public, max-age={SNAPSHOT_INDEX_MAX_AGE}"
+    else:
+        cache_control = "public, max-age=31536000, immutable"
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is not None and os.path.isfile(path + ENCODING_SUFFIXES[encoding]):
+        headers["Content-Encoding"] = encoding
+        path += ENCODING_SUFFIXES[encoding]
+    return FileResponse(path, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def clear_cache():
+    """Limpia caché (útil para testing)"""
+    global _index
+    _index = {}
@@ -0,0 +1,344 @@
+"""
+Índice espacial del catálogo de spots (app/config/spots.json)
+
+Grilla de celdas de CELL_DEG grados (tipo geohash) con los spots como vectores
+unitarios. Una consulta por radio:
+1. calcula el bounding box del círculo (latitud ± radio; en longitud el
+   ensanche máximo del círculo, o todas si el círculo contiene un polo)
+2. recorre sólo las celdas del box (prefiltro barato)
+3. compara cuerdas al cuadrado contra la del radio (tres restas y tres
+   productos por candidato) y convierte a km sólo los que quedan
+
+Para radios grandes (más de GRID_MAX_CELLS celdas) se usa la versión
+vectorizada: spots ordenados por latitud, franja por búsqueda binaria,
+prefiltro de longitud y haversine con numpy.
+
+k vecinos: consultas por radio crecientes hasta juntar k (o cubrir el globo).
+Con miles de spots el spot más cercano a un usuario toca unas pocas celdas:
+microsegundos, no un recorrido del catálogo entero.
+
+El "spot más cercano" respeta el radio de las regiones (max_distance_km desde
+el centro de cada región): fuera de toda región no hay spot cercano.
+
+Recarga en caliente: un task de background mira el archivo cada
+SPOT_RELOAD_CHECK_SECONDS; si cambió se construye un índice NUEVO y se
+reemplaza en una sola asignación (los lectores ven el índice viejo o el nuevo,
+nunca uno a medio armar). Si el archivo es inválido se loguea y se sigue con
+el catálogo vigente.
+
+Cada spot tiene una revisión (hash de su definición) que entra en las claves
+del caché de respuestas y en la versión de los bundles: editar un spot
+invalida sus respuestas y ETags sin tocar los demás.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import math
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import orjson
+
+from app.config import spots as spot_catalog
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+SPOT_RELOAD_CHECK_SECONDS = 10
+
+CELL_DEG = 0.5  # ~55 km de lado en latitud
+GRID_ROWS = int(180 / CELL_DEG) + 1
+GRID_COLS = int(360 / CELL_DEG)
+GRID_MAX_CELLS = 64
+REGION_MAX_CELLS = 4096  # regiones más grandes se revisan en todas las consultas
+
+NEAREST_START_KM = 25  # radio inicial de la búsqueda de k vecinos (se multiplica hasta juntar k)
+NEAREST_GROWTH = 4
+
+Vector = Tuple[float, float, float]
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distancia en km desde (lat, lon) a cada punto (vectorizado)"""
+    phi1 = np.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lons - lon)
+    a = np.sin(delta_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _unit_vector(lat: float, lon: float) -> Vector:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _chord2(angular: float) -> float:
+    """Cuerda al cuadrado (esfera unitaria) de un ángulo central"""
+    return (2 * math.sin(min(angular, math.pi) / 2)) ** 2
+
+
+def _chord2_to_km(chord2: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord2) / 2))
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (min(int((lat + 90) // CELL_DEG), GRID_ROWS - 1), int((lon + 180) // CELL_DEG) % GRID_COLS)
+
+
+def _revision(definition: dict) -> str:
+    return hashlib.blake2b(orjson.dumps(definition, option=orjson.OPT_SORT_KEYS), digest_size=6).hexdigest()
+
+
+class SpotIndex:
+    """Índice inmutable de un catálogo: se construye entero y se reemplaza en bloque"""
+
+    def __init__(self, spots: Dict[str, dict], regions: Dict[str, dict]):
+        # Posición = orden por latitud (lo usa la consulta vectorizada)
+        order = sorted(spots, key=lambda spot_id: spots[spot_id]["lat"])
+        self.ids: List[str] = order
+        self.lats = np.array([spots[s]["lat"] for s in order], dtype=np.float64)
+        self.lons = np.array([spots[s]["lon"] for s in order], dtype=np.float64)
+
+        self.region_ids: List[str] = list(regions)
+        self.region_vectors: List[Vector] = [_unit_vector(r["lat"], r["lon"]) for r in regions.values()]
+        self.region_chord2: List[float] = [_chord2(r["max_distance_km"] / EARTH_RADIUS_KM) for r in regions.values()]
+        # Cada región se anota en las celdas de su bounding box (las enormes, en todas)
+        self.region_cells: Dict[Tuple[int, int], List[int]] = {}
+        self.global_regions: List[int] = []
+        for i, region in enumerate(regions.values()):
+            cells = self._grid_cells(region["lat"], region["lon"], region["max_distance_km"] / EARTH_RADIUS_KM, REGION_MAX_CELLS)
+            if cells is None:
+                self.global_regions.append(i)
+            for cell in cells or ():
+                self.region_cells.setdefault(cell, []).append(i)
+        region_pos = {region_id: i for i, region_id in enumerate(self.region_ids)}
+        self.spot_region = np.array([region_pos[spots[s]["region"]] for s in order], dtype=np.int32)
+
+        # Celda -> [(x, y, z, posición, región)] (todo lo que mira el loop de la consulta)
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, float, int, int]]] = {}
+        for position, spot_id in enumerate(order):
+            spot = spots[spot_id]
+            entry = (*_unit_vector(spot["lat"], spot["lon"]), position, region_pos[spot["region"]])
+            self.cells.setdefault(_cell(spot["lat"], spot["lon"]), []).append(entry)
+
+        self.revisions: Dict[str, str] = {spot_id: _revision(spot) for spot_id, spot in spots.items()}
+        self.catalog_revision = _revision({"spots": self.revisions, "regions": regions})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _grid_cells(self, lat: float, lon: float, angular: float, max_cells: int = GRID_MAX_CELLS) -> Optional[List[Tuple[int, int]]]:
+        """Celdas del bounding box del círculo (None si son más de max_cells)"""
+        lat_rad = math.radians(lat)
+        if abs(lat_rad) + angular >= math.pi / 2:  # el círculo contiene un polo: todas las longitudes
+            return None
+        delta_lat = math.degrees(angular)
+        delta_lon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(lat_rad))))
+        row0 = max(int((lat - delta_lat + 90) // CELL_DEG), 0)
+        row1 = min(int((lat + delta_lat + 90) // CELL_DEG), GRID_ROWS - 1)
+        col0 = int((lon - delta_lon + 180) // CELL_DEG)
+        cols = min(int((lon + delta_lon + 180) // CELL_DEG) - col0 + 1, GRID_COLS)
+        if (row1 - row0 + 1) * cols > max_cells:
+            return None
+        return [(row, (col0 + i) % GRID_COLS) for row in range(row0, row1 + 1) for i in range(cols)]
+
+    def _query_vectorized(self, lat: float, lon: float, angular: float, regions: Optional[Set[int]]) -> List[Tuple[float, int]]:
+        """Franja de latitud por búsqueda binaria + prefiltro de longitud + haversine (radios grandes)"""
+        delta_lat = math.degrees(angular)
+        lo = np.searchsorted(self.lats, lat - delta_lat, side="left")
+        hi = np.searchsorted(self.lats, lat + delta_lat, side="right")
+        positions = np.arange(lo, hi)
+        lat_rad = math.radians(lat)
+        if abs(lat_rad) + angular < math.pi / 2:
+            delta_lon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(lat_rad))))
+            gap = np.abs((self.lons[lo:hi] - lon + 180) % 360 - 180)
+            positions = positions[gap <= delta_lon]
+        if regions is not None:
+            positions = positions[np.isin(self.spot_region[positions], list(regions))]
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= angular * EARTH_RADIUS_KM
+        chord2 = (2 * np.sin(distances[inside] / (2 * EARTH_RADIUS_KM))) ** 2
+        return list(zip(chord2.tolist(), positions[inside].tolist()))
+
+    def _query(self, lat: float, lon: float, radius_km: float, regions: Optional[Set[int]] = None) -> List[Tuple[float, int]]:
+        """[(cuerda al cuadrado, posición)] dentro del radio, sin ordenar (la cuerda ordena igual que la distancia)"""
+        angular = min(radius_km / EARTH_RADIUS_KM, math.pi)
+        cells = self._grid_cells(lat, lon, angular)
+        if cells is None:
+            return self._query_vectorized(lat, lon, angular, regions)
+
+        x, y, z = _unit_vector(lat, lon)
+        limit = _chord2(angular)
+        found = []
+        for cell in cells:
+            for px, py, pz, position, region in self.cells.get(cell, ()):
+                chord2 = (px - x) * (px - x) + (py - y) * (py - y) + (pz - z) * (pz - z)
+                if chord2 <= limit and (regions is None or region in regions):
+                    found.append((chord2, position))
+        return found
+
+    def _sorted(self, found: List[Tuple[float, int]], limit: Optional[int]) -> List[Tuple[str, float]]:
+        ordered = heapq.nsmallest(limit, found) if limit is not None else sorted(found)
+        return [(self.ids[position], _chord2_to_km(chord2)) for chord2, position in ordered]
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """[(spot_id, distancia km)] dentro del radio, del más cercano al más lejano"""
+        if not len(self):
+            return []
+        return self._sorted(self._query(lat, lon, radius_km), limit)
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: Optional[float] = None,
+                regions: Optional[Set[int]] = None) -> List[Tuple[str, float]]:
+        """
+        Los k spots más cercanos [(spot_id, distancia km)]
+
+        Args:
+            max_km: Radio máximo (None = sin límite)
+            regions: Sólo spots de estas regiones (posiciones en region_ids)
+        """
+        if not len(self) or k < 1:
+            return []
+        half_circumference = math.pi * EARTH_RADIUS_KM
+        radius = max_km if max_km is not None else NEAREST_START_KM
+        while True:
+            found = self._query(lat, lon, radius, regions)
+            if len(found) >= k or max_km is not None or radius >= half_circumference:
+                return self._sorted(found, k)
+            radius = min(radius * NEAREST_GROWTH, half_circumference)
+
+    def covering_regions(self, lat: float, lon: float) -> Set[int]:
+        """Regiones cuyo radio (max_distance_km) incluye la ubicación"""
+        x, y, z = _unit_vector(lat, lon)
+        candidates = self.region_cells.get(_cell(lat, lon), [])
+        if self.global_regions:
+            candidates = candidates + self.global_regions
+        covering = set()
+        for i in candidates:
+            rx, ry, rz = self.region_vectors[i]
+            if (rx - x) ** 2 + (ry - y) ** 2 + (rz - z) ** 2 <= self.region_chord2[i]:
+                covering.add(i)
+        return covering
+
+    def serving_spot(self, lat: float, lon: float) -> Optional[Tuple[str, float]]:
+        """Spot más cercano entre las regiones que cubren la ubicación (None si ninguna la cubre)"""
+        regions = self.covering_regions(lat, lon)
+        if not regions:
+            return None
+        found = self.nearest(lat, lon, k=1, regions=regions)
+        return found[0] if found else None
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_index = SpotIndex(spot_catalog.SPOTS, spot_catalog.REGIONS)
+_file_stamp: Optional[Tuple[int, int]] = _stamp(spot_catalog.SPOTS_FILE)
+_task: Optional[asyncio.Task] = None
+
+
+def get_index() -> SpotIndex:
+    return _index
+
+
+def revision(spot_id: str) -> str:
+    """Revisión de la definición del spot ("*" o spot desconocido: revisión del catálogo)"""
+    index = _index
+    return index.revisions.get(spot_id, index.catalog_revision)
+
+
+def _invalidate_derived(changed: List[str], flags_changed: bool):
+    """Cachés que dependen de la definición de los spots (se recalculan a demanda)"""
+    from app.services import offline_bundle, response_cache, risk_surface, scoring_model, timeline_history
+
+    response_cache.clear_cache()
+    offline_bundle.clear_cache()
+    risk_surface.clear_cache()
+    timeline_history.clear_cache()
+    if flags_changed:
+        # Los bits de flags incluyen las reglas de los spots
+        scoring_model.clear_cache()
+    logger.info(f"🗺️ Spots modificados: {changed[:10]}{'...' if len(changed) > 10 else ''}")
+
+
+def _rule_flags(spots: Dict[str, dict]) -> List[str]:
+    return [regla["flag"] for spot in spots.values() for regla in spot.get("reglas_especificas", [])]
+
+
+def reload(path: Optional[str] = None) -> bool:
+    """
+    Recarga el catálogo y reemplaza el índice
+    Retorna True si el catálogo cambió. Si el archivo es inválido se mantiene el vigente.
+    """
+    global _index, _file_stamp
+    path = path or spot_catalog.SPOTS_FILE
+    stamp = _stamp(path)
+    try:
+        catalog = spot_catalog.load_catalog(path)
+        index = SpotIndex(catalog["spots"], catalog["regions"])
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Catálogo de spots inválido ({path}), se mantiene el vigente: {e}")
+        _file_stamp = stamp
+        return False
+    _file_stamp = stamp
+
+    old = _index
+    if index.catalog_revision == old.catalog_revision:
+        return False
+    changed = sorted(
+        spot_id for spot_id in set(old.revisions) | set(index.revisions)
+        if old.revisions.get(spot_id) != index.revisions.get(spot_id)
+    )
+    flags_changed = _rule_flags(spot_catalog.SPOTS) != _rule_flags(catalog["spots"])
+
+    # Swap: altas/modificaciones antes que bajas (un spot que sigue nunca falta),
+    # SPOTS/REGIONS en el lugar para los módulos que los importaron
+    for current, new in ((spot_catalog.REGIONS, catalog["regions"]), (spot_catalog.SPOTS, catalog["spots"])):
+        current.update(new)
+        for removed in set(current) - set(new):
+            del current[removed]
+    _index = index
+    _invalidate_derived(changed, flags_changed)
+    logger.info(f"🗺️ Catálogo de spots recargado: {len(index)} spots, {len(index.region_ids)} regiones")
+    return True
+
+
+def reload_if_changed() -> bool:
+    """Recarga sólo si el archivo cambió (mtime/tamaño) desde la última lectura"""
+    if _stamp(spot_catalog.SPOTS_FILE) == _file_stamp:
+        return False
+    return reload()
+
+
+async def run(interval: float = SPOT_RELOAD_CHECK_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            reload_if_changed()
+        except Exception as e:
+            logger.warning(f"Recarga del catálogo de spots falló: {e}")
+
+
+def start(interval: float = SPOT_RELOAD_CHECK_SECONDS):
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(run(interval))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
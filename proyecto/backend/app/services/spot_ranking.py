@@ -0,0 +1,99 @@
+"""
+Ranking de spots: "¿dónde remo ahora?"
+
+Evalúa la hora actual de todos los spots de SPOTS para un perfil y los ordena:
+primero por categoría de seguridad (alto > medio > bajo), después por disfrute
+y por seguridad. Los frames se piden todos juntos (asyncio.gather): cada
+ubicación se descarga una vez aunque varios spots caigan en la misma celda
+(el HybridWeatherProvider comparte las descargas en curso). El endpoint cachea
+la respuesta (response_cache) por perfil, versión de scoring y versión de datos
+de cada spot.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.spots import SPOTS
+from app.models.schemas import UserProfile
+from app.services.sensei_engine import SenseiEngine
+from app.services.spot_index import haversine_km
+
+SAFETY_RANK: Dict[str, int] = {"alto": 2, "medio": 1, "bajo": 0}
+
+
+def _ranking_order(entry: dict) -> tuple:
+    return (
+        -SAFETY_RANK[entry["categories"]["seguridad"]],
+        -entry["scores"]["disfrute"],
+        -entry["scores"]["seguridad"],
+        entry["spot_id"],
+    )
+
+
+async def fetch_current_frames(weather_service, spot_ids: List[str]) -> Tuple[Dict[str, object], List[str]]:
+    """
+    Frame de la hora actual de cada spot, en paralelo
+
+    Returns:
+        ({spot_id: frame}, spots sin datos)
+    """
+    results = await asyncio.gather(
+        *(weather_service.get_forecast_frame(SPOTS[spot_id]["lat"], SPOTS[spot_id]["lon"], hours=1) for spot_id in spot_ids),
+        return_exceptions=True
+    )
+    frames, unavailable = {}, []
+    for spot_id, result in zip(spot_ids, results):
+        if isinstance(result, BaseException) or not len(result):
+            unavailable.append(spot_id)
+        else:
+            frames[spot_id] = result
+    return frames, unavailable
+
+
+def rank_spots(frames: Dict[str, object], user: UserProfile, engine: Optional[SenseiEngine] = None) -> List[dict]:
+    """
+    Ranking (dicts con la forma de RankedSpot, sin rank ni distancia) para la
+    primera hora de cada frame
+    """
+    engine = engine or SenseiEngine()
+    entries = []
+    for spot_id, frame in frames.items():
+        spot = SPOTS[spot_id]
+        record = frame.record(0)
+        result = engine.evaluate(record, spot_id, user)
+        entries.append({
+            "spot_id": spot_id,
+            "name": spot["name"],
+            "lat": spot["lat"],
+            "lon": spot["lon"],
+            "timestamp": record.timestamp,
+            "scores": {"seguridad": result.seguridad, "esfuerzo": result.esfuerzo, "disfrute": result.disfrute},
+            "categories": {
+                "seguridad": result.cat_seguridad,
+                "esfuerzo": result.cat_esfuerzo,
+                "disfrute": result.cat_disfrute,
+            },
+            "flags": list(result.flags),
+            "scenario_id": result.semantics.scenario_id,
+            "confidence": result.confidence,
+        })
+    entries.sort(key=_ranking_order)
+    return entries
+
+
+def filter_by_distance(entries: List[dict], lat: float, lon: float, max_km: Optional[float]) -> List[dict]:
+    """Agrega distance_km y descarta los spots más lejos que max_km (mantiene el orden)"""
+    if not entries:
+        return []
+    distances = haversine_km(
+        lat, lon,
+        np.array([e["lat"] for e in entries]),
+        np.array([e["lon"] for e in entries])
+    )
+    return [
+        {**entry, "distance_km": round(float(distance), 2)}
+        for entry, distance in zip(entries, distances.tolist())
+        if max_km is None or distance <= max_km
+    ]
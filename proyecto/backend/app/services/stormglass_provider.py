@@ -10,7 +10,8 @@ import os
 from datetime import datetime, timezone
 from typing import List, Optional
 from app.services.weather_service import WeatherProvider
-from app.models.schemas import WeatherData, WindData, WaveData, TideData
+from app.models.schemas import WeatherData
+from app.models.internal import WeatherRecord, WindRecord, WaveRecord, TideRecord
 import logging
 
 logger = logging.getLogger(__name__)
@@ -189,7 +190,7 @@ class StormglassProvider(WeatherProvider):
         return 0
     
     def _extract_weather_data(self, hour_data: dict, tide_state: str) -> WeatherData:
-        """Extrae WeatherData de un registro horario de Stormglass"""
+        """Extrae WeatherData de un registro horario de Stormglass (sin re-validar)"""
         
         # Stormglass retorna datos de múltiples fuentes, usamos "sg" (Stormglass)
         # El formato es: {"windSpeed": {"sg": 5.2, "noaa": 4.8}}
@@ -210,19 +211,20 @@ class StormglassProvider(WeatherProvider):
         
         timestamp = hour_data.get("time", datetime.now(timezone.utc).isoformat())
         
-        return WeatherData(
-            wind=WindData(
+        return WeatherRecord(
+            wind=WindRecord(
                 speed_kmh=round(wind_speed_kmh, 1) if wind_speed_kmh else None,
                 direction_deg=int(wind_direction) if wind_direction else None,
                 relative_direction=None
             ),
-            waves=WaveData(
+            waves=WaveRecord(
                 height_m=round(wave_height, 2) if wave_height else None
             ),
-            tide=TideData(state=tide_state),
+            atmosphere=None,
+            tide=TideRecord(state=tide_state),
             timestamp=timestamp,
             provider="stormglass"
-        )
+        ).to_schema()
     
     async def _get_tide_state(self, lat: float, lon: float) -> str:
         """Obtiene estado de marea del provider configurado"""
@@ -0,0 +1,189 @@
+"""
+Timeline agregada (bloques de 3 horas o días), vista "scores" y paginado por cursor
+
+Para planificar varios días no hace falta mandar cientos de TimelinePoint: cada
+bloque resume sus horas con mínimos/máximos, el peor caso (seguridad más baja,
+esfuerzo más alto) y la unión de flags.
+
+Todo corre sobre las columnas del HourlyFrame ya cacheado: el engine se evalúa
+con el evaluador vectorizado (una pasada para todo el horizonte) y los bloques
+se reducen con ufunc.reduceat. No hay llamadas extra upstream.
+
+Los bloques se alinean a la hora local (Argentina, UTC-3), igual que las
+etiquetas de la timeline: "daily" = días calendario locales.
+"""
+
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.schemas import UserProfile
+from app.services.hourly_frame import HourlyFrame, HOUR_SECONDS, TIMESTAMP_FORMAT
+from app.services.scenario_catalog import SCENARIO_IDS
+from app.services.sensei_engine import SenseiEngine
+
+ARGENTINA_TZ = timezone(timedelta(hours=-3))
+UTC_OFFSET_SECONDS = -3 * HOUR_SECONDS
+
+RESOLUTION_HOURS: Dict[str, int] = {"1h": 1, "3h": 3, "daily": 24}
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Cursor de paginado -> epoch (segundos UTC) del primer elemento de la página
+
+    Raises:
+        ValueError: si el cursor no es válido
+    """
+    if cursor is None:
+        return None
+    if not cursor.isdigit():
+        raise ValueError(f"Cursor inválido: '{cursor}'")
+    return int(cursor)
+
+
+def page_bounds(starts: np.ndarray, cursor_epoch: Optional[int], page_size: int) -> tuple:
+    """
+    (inicio, fin, next_cursor) de la página: elementos con start >= cursor
+
+    El cursor es un instante, no un offset: sigue siendo válido si entre página
+    y página llegan datos nuevos o avanza la hora actual.
+    """
+    start = 0 if cursor_epoch is None else int(np.searchsorted(starts, cursor_epoch, side="left"))
+    stop = min(start + page_size, len(starts))
+    next_cursor = str(int(starts[stop])) if stop < len(starts) else None
+    return start, stop, next_cursor
+
+
+def bucket_starts(epochs: np.ndarray, resolution: str) -> np.ndarray:
+    """Índices de la primera hora de cada bloque de `resolution` (alineados a hora local)"""
+    if len(epochs) == 0:
+        return np.zeros(0, dtype=np.int64)
+    keys = (epochs + UTC_OFFSET_SECONDS) // (RESOLUTION_HOURS[resolution] * HOUR_SECONDS)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def _optional_values(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else round(float(v), 2) for v in values.tolist()]
+
+
+def _label(epoch: int, bucket_hours: int) -> str:
+    local = datetime.fromtimestamp(epoch, ARGENTINA_TZ)
+    return local.strftime("%Y-%m-%d") if bucket_hours >= 24 else local.strftime("%Y-%m-%d %H:00")
+
+
+def score_points(
+    frame: HourlyFrame,
+    spot_id: str,
+    user: UserProfile,
+    engine: Optional[SenseiEngine] = None
+) -> List[dict]:
+    """
+    Proyección "scores": dicts con la forma de ScoresPoint, hora por hora
+
+    Sale del evaluador vectorizado: no arma WeatherRecord por hora ni calcula
+    semántica ni confianza, que esta vista no devuelve.
+    """
+    engine = engine or SenseiEngine()
+    if len(frame) == 0:
+        return []
+    arrays = engine.analyze_arrays(frame.columns, spot_id, user, frame.tide)
+    categorize = engine.model.categorize
+    names = ("seguridad", "esfuerzo", "disfrute")
+    columns = [arrays[name].tolist() for name in names]
+    return [
+        {
+            "timestamp": timestamp,
+            "hour_label": hour_label,
+            "scores": dict(zip(names, scores)),
+            "categories": {name: categorize(score) for name, score in zip(names, scores)},
+            "flags": engine.flag_names_from_bits(bits),
+        }
+        for timestamp, hour_label, bits, *scores in zip(
+            frame.timestamps(), frame.hour_labels(), arrays["flags"].tolist(), *columns
+        )
+    ]
+
+
+def aggregate_timeline(
+    frame: HourlyFrame,
+    spot_id: str,
+    user: UserProfile,
+    resolution: str,
+    engine: Optional[SenseiEngine] = None
+) -> List[dict]:
+    """
+    Bloques de la timeline como dicts con la forma de TimelineBucket
+
+    Un bloque junta las horas del frame que caen en el mismo intervalo local de
+    `resolution` (el primero puede ser parcial: arranca en la hora actual).
+    Para paginar, pasar un slice del frame que empiece en un inicio de bloque.
+    """
+    engine = engine or SenseiEngine()
+    n = len(frame)
+    if n == 0:
+        return []
+    bucket_hours = RESOLUTION_HOURS[resolution]
+
+    arrays = engine.analyze_arrays(frame.columns, spot_id, user, frame.tide)
+    epochs = frame.epochs
+    starts = bucket_starts(epochs, resolution)
+    ends = np.append(starts[1:], n)
+
+    scores_min = {name: np.minimum.reduceat(arrays[name], starts) for name in ("seguridad", "esfuerzo", "disfrute")}
+    scores_max = {name: np.maximum.reduceat(arrays[name], starts) for name in ("seguridad", "esfuerzo", "disfrute")}
+    flags_union = np.bitwise_or.reduceat(arrays["flags"], starts)
+
+    columns = frame.columns
+    present = {name: np.add.reduceat((~np.isnan(columns[name])).astype(np.int64), starts) for name in
+               ("wind_speed_kmh", "wave_height_m", "precipitation_mm", "uv_index", "temperature_c")}
+
+    def fmax(name):
+        values = np.fmax.reduceat(columns[name], starts)
+        return _optional_values(np.where(present[name] > 0, values, np.nan))
+
+    def fmin(name):
+        values = np.fmin.reduceat(columns[name], starts)
+        return _optional_values(np.where(present[name] > 0, values, np.nan))
+
+    precipitation = np.add.reduceat(np.nan_to_num(columns["precipitation_mm"]), starts)
+    precipitation_total = _optional_values(np.where(present["precipitation_mm"] > 0, precipitation, np.nan))
+    wind_max = fmax("wind_speed_kmh")
+    wave_max = fmax("wave_height_m")
+    uv_max = fmax("uv_index")
+    temperature_min = fmin("temperature_c")
+    temperature_max = fmax("temperature_c")
+
+    seguridad = arrays["seguridad"]
+    scenario = arrays["scenario"]
+    epoch_list = epochs.tolist()
+    buckets = []
+    for b, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        worst = start + int(np.argmin(seguridad[start:end]))
+        scenario_ids = [SCENARIO_IDS[idx] for idx in dict.fromkeys(scenario[start:end].tolist())]
+        worst_scores = {
+            "seguridad": int(scores_min["seguridad"][b]),
+            "esfuerzo": int(scores_max["esfuerzo"][b]),
+            "disfrute": int(scores_min["disfrute"][b]),
+        }
+        buckets.append({
+            "start": datetime.fromtimestamp(epoch_list[start], timezone.utc).strftime(TIMESTAMP_FORMAT),
+            "end": datetime.fromtimestamp(epoch_list[end - 1] + HOUR_SECONDS, timezone.utc).strftime(TIMESTAMP_FORMAT),
+            "label": _label(epoch_list[start], bucket_hours),
+            "hours": end - start,
+            "scores_min": {name: int(values[b]) for name, values in scores_min.items()},
+            "scores_max": {name: int(values[b]) for name, values in scores_max.items()},
+            "worst_categories": {name: engine.model.categorize(score) for name, score in worst_scores.items()},
+            "flags": engine.flag_names_from_bits(int(flags_union[b])),
+            "scenario_ids": scenario_ids,
+            "worst_hour": datetime.fromtimestamp(epoch_list[worst], timezone.utc).strftime(TIMESTAMP_FORMAT),
+            "wind_speed_max_kmh": wind_max[b],
+            "wave_height_max_m": wave_max[b],
+            "precipitation_total_mm": precipitation_total[b],
+            "uv_index_max": uv_max[b],
+            "temperature_min_c": temperature_min[b],
+            "temperature_max_c": temperature_max[b],
+        })
+    return buckets
+
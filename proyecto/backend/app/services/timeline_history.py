@@ -0,0 +1,64 @@
+"""
+Historial corto de versiones de timeline (para respuestas incrementales)
+
+Por cada serie (spot, perfil, versión de scoring, modo) se guardan las últimas
+TIMELINE_HISTORY_DEPTH versiones con sus puntos indexados por timestamp. Un
+cliente que ya tiene la versión X pide `since=X` y recibe sólo las horas que
+cambiaron (clima o resultado del engine), las nuevas al final y las pasadas
+que se cayeron, en vez de la timeline completa.
+
+La versión es el ETag de la respuesta completa (sin comillas ni sufijo de
+codificación): el cliente puede mandar directamente el ETag que recibió.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Cache global (en memoria): serie -> {versión: {timestamp: punto}}
+_history: Dict[Tuple, "OrderedDict[str, Dict[str, dict]]"] = {}
+TIMELINE_HISTORY_DEPTH = 8
+TIMELINE_HISTORY_MAX_SERIES = 512
+
+
+def normalize_version(value: str) -> str:
+    """Acepta la versión pelada o un ETag ("abc", W/"abc", "abc-br", "abc-mp-gzip")"""
+    value = value.strip().removeprefix("W/").strip('"')
+    for suffix in ("-br", "-gzip", "-mp"):
+        value = value.removesuffix(suffix)
+    return value
+
+
+def record(series: Tuple, version: str, points: List[dict]):
+    """Guarda los puntos de una versión (descarta la más vieja de la serie si está llena)"""
+    versions = _history.get(series)
+    if versions is None:
+        if len(_history) >= TIMELINE_HISTORY_MAX_SERIES:
+            _history.pop(next(iter(_history)))
+        versions = _history[series] = OrderedDict()
+    versions[version] = {point["timestamp"]: point for point in points}
+    versions.move_to_end(version)
+    while len(versions) > TIMELINE_HISTORY_DEPTH:
+        versions.popitem(last=False)
+
+
+def get(series: Tuple, version: str) -> Optional[Dict[str, dict]]:
+    versions = _history.get(series)
+    return versions.get(version) if versions is not None else None
+
+
+def diff(old: Dict[str, dict], new: Dict[str, dict]) -> Tuple[List[dict], List[str]]:
+    """
+    Diferencia entre dos versiones
+
+    Returns:
+        (puntos nuevos o cambiados en orden de la timeline, timestamps que ya no están)
+    """
+    changed = [point for timestamp, point in new.items() if old.get(timestamp) != point]
+    dropped = [timestamp for timestamp in old if timestamp not in new]
+    return changed, dropped
+
+
+def clear_cache():
+    """Limpia caché (útil para testing)"""
+    global _history
+    _history = {}
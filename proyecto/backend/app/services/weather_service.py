@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Optional
 from datetime import datetime
 from app.models.schemas import WeatherData, WindData, WaveData, TideData
+from app.services.hourly_frame import HourlyFrame
 
 class WeatherProvider(ABC):
     """
@@ -30,6 +31,15 @@ class WeatherProvider(ABC):
         """
         pass
 
+    async def get_forecast_frame(self, lat: float, lon: float, hours: int = 12) -> HourlyFrame:
+        """
+        Pronóstico en formato columnar (HourlyFrame)
+        
+        Puede incluir horas anteriores a la actual: cortar con from_current().
+        Default: adapta get_forecast() para providers que no parsean directo a frame.
+        """
+        return HourlyFrame.from_weather_data(await self.get_forecast(lat, lon, hours))
+
 class WeatherService:
     """
     Servicio de clima con inyección de dependencia
@@ -50,3 +60,10 @@ class WeatherService:
         Obtiene pronóstico horario
         """
         return await self.provider.get_forecast(lat, lon, hours)
+
+    async def get_forecast_frame(self, lat: float, lon: float, hours: int = 12) -> HourlyFrame:
+        """
+        Pronóstico horario columnar: las próximas N horas desde la actual (vista del frame)
+        """
+        frame = await self.provider.get_forecast_frame(lat, lon, hours)
+        return frame.from_current(hours)
@@ -0,0 +1 @@
+# Suite de microbenchmarks offline (ver run_benchmarks.py)
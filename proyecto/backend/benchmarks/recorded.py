@@ -0,0 +1,74 @@
+"""
+Payloads sintéticos de los proveedores (benchmarks/fixtures)
+
+No son capturas reales: se armaron a mano con el formato exacto de cada API
+para el spot de Varese, así que sirven para medir el parseo pero no para
+comparar su comportamiento contra respuestas de producción. Como los providers
+buscan "la hora actual", al cargarlas se corren todas las fechas en días
+enteros para que el día de referencia sea HOY (UTC): así el parseo recorre el
+mismo camino que en producción.
+"""
+
+import json
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Día (UTC) de referencia de las fechas de los payloads
+RECORDED_AT = datetime(2026, 1, 14, tzinfo=timezone.utc)
+
+
+def _day_shift() -> timedelta:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - RECORDED_AT
+
+
+def _load(name: str) -> Dict[str, Any]:
+    with open(FIXTURES_DIR / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _shift_iso(value: str, shift: timedelta, fmt: Optional[str] = None) -> str:
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    shifted = ts + shift
+    return shifted.strftime(fmt) if fmt else shifted.isoformat()
+
+
+def openmeteo(kind: str) -> Dict[str, Any]:
+    """kind: 'forecast' (viento/atmósfera) o 'marine' (olas)"""
+    data = _load(f"openmeteo_{kind}.json")
+    shift = _day_shift()
+    data["hourly"]["time"] = [_shift_iso(t, shift, "%Y-%m-%dT%H:%M") for t in data["hourly"]["time"]]
+    return data
+
+
+def openweather(kind: str) -> Dict[str, Any]:
+    """kind: 'current' (/weather) o 'forecast' (/forecast, pasos de 3h)"""
+    data = _load(f"openweather_{kind}.json")
+    seconds = int(_day_shift().total_seconds())
+    items = data["list"] if kind == "forecast" else [data]
+    for item in items:
+        item["dt"] += seconds
+        if "dt_txt" in item:
+            item["dt_txt"] = datetime.fromtimestamp(item["dt"], timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return data
+
+
+def windy(kind: str) -> Dict[str, Any]:
+    """kind: 'gfs' (viento) o 'wave' (gfsWave)"""
+    data = _load(f"windy_{kind}.json")
+    millis = int(_day_shift().total_seconds() * 1000)
+    data["ts"] = [ts + millis for ts in data["ts"]]
+    return data
+
+
+def stormglass() -> Dict[str, Any]:
+    data = _load("stormglass_point.json")
+    shift = _day_shift()
+    for hour in data["hours"]:
+        hour["time"] = _shift_iso(hour["time"], shift)
+    return data
@@ -0,0 +1,451 @@
+"""
+Microbenchmarks del hot path (engine, parsers y providers) - 100% offline
+
+Corre contra payloads sintéticos con el formato de Open-Meteo, OpenWeather, Windy y Stormglass
+(benchmarks/fixtures) sin tocar la red: el cliente HTTP y el cliente de Windy
+se reemplazan por esas respuestas, y el resto del código corre sin cambios.
+
+Mide throughput (µs/op, ops/s) y memoria asignada por operación (tracemalloc)
+a 12, 48 y 168 horas, y emite JSON para comparar corridas.
+
+Uso (desde proyecto/backend):
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json --threshold 0.25
+    python -m benchmarks.run_benchmarks --filter timeline --quick
+
+Con --compare el proceso termina con código 1 si algún benchmark empeoró más
+que el umbral (tiempo mediano o memoria pico por operación).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks import recorded
+
+SIZES = (12, 48, 168)
+
+logger = logging.getLogger("benchmarks")
+
+
+# ==================== Red grabada ====================
+
+def _slice_openmeteo(data: Dict[str, Any], days: int) -> Dict[str, Any]:
+    """Recorta el payload a los días pedidos (igual que hace la API real)"""
+    hours = days * 24
+    sliced = dict(data)
+    sliced["hourly"] = {key: values[:hours] for key, values in data["hourly"].items()}
+    return sliced
+
+
+def install_recorded_network():
+    """Reemplaza http_client.get y el cliente httpx de Windy por los payloads sintéticos"""
+    from app.services import http_client as http_module
+    from app.services import windy_provider
+
+    payloads = {
+        "openmeteo_forecast": recorded.openmeteo("forecast"),
+        "openmeteo_marine": recorded.openmeteo("marine"),
+        "openweather_current": recorded.openweather("current"),
+        "openweather_forecast": recorded.openweather("forecast"),
+    }
+
+    async def recorded_get(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        params = params or {}
+        if "marine-api.open-meteo.com" in url:
+            return _slice_openmeteo(payloads["openmeteo_marine"], params.get("forecast_days", 7))
+        if "api.open-meteo.com" in url:
+            return _slice_openmeteo(payloads["openmeteo_forecast"], params.get("forecast_days", 7))
+        if url.endswith("/weather"):
+            return payloads["openweather_current"]
+        if url.endswith("/forecast"):
+            data = dict(payloads["openweather_forecast"])
+            data["list"] = data["list"][:params.get("cnt", len(data["list"]))]
+            return data
+        raise RuntimeError(f"Sin payload sintético para {url}")
+
+    http_module.http_client.get = recorded_get
+
+    windy_payloads = {"gfs": recorded.windy("gfs"), "gfsWave": recorded.windy("wave")}
+
+    def windy_handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        return httpx.Response(200, json=windy_payloads[model])
+
+    def windy_client(*args, **kwargs) -> httpx.AsyncClient:
+        kwargs["transport"] = httpx.MockTransport(windy_handler)
+        return httpx.AsyncClient(*args, **kwargs)
+
+    windy_provider.httpx = types.SimpleNamespace(AsyncClient=windy_client)
+
+
+# ==================== Medición ====================
+
+def _measure_time(fn: Callable[[], Any], min_repeat_seconds: float, repeats: int) -> Dict[str, float]:
+    # Calibrar: cuántas llamadas por repetición para superar min_repeat_seconds
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_repeat_seconds or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_repeat_seconds / elapsed) + 1))
+
+    per_op = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(per_op)
+    return {
+        "iterations": number * repeats,
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(min(per_op) * 1e6, 3),
+        "mean_us": round(statistics.mean(per_op) * 1e6, 3),
+        "stdev_us": round(statistics.pstdev(per_op) * 1e6, 3),
+        "ops_per_sec": round(1.0 / median, 1) if median > 0 else None,
+    }
+
+
+def _measure_memory(fn: Callable[[], Any], samples: int) -> Dict[str, float]:
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_alloc_bytes": int(statistics.median(peaks)),
+        "retained_bytes": int(statistics.median(retained)),
+    }
+
+
+class Suite:
+    def __init__(self, name_filter: Optional[str], quick: bool):
+        self.name_filter = name_filter
+        self.min_repeat_seconds = 0.02 if quick else 0.1
+        self.repeats = 3 if quick else 5
+        self.memory_samples = 3 if quick else 10
+        self.results: List[Dict[str, Any]] = []
+
+    def run(self, name: str, size: int, fn: Callable[[], Any], **extra):
+        if self.name_filter and self.name_filter not in name:
+            return
+        fn()  # warm-up (caches, imports, compilación de perfiles)
+        result = {"name": name, "size": size}
+        result.update(_measure_time(fn, self.min_repeat_seconds, self.repeats))
+        result.update(_measure_memory(fn, self.memory_samples))
+        result.update(extra)
+        self.results.append(result)
+        print(
+            f"{name:<48} size={size:<4} {result['median_us']:>12.1f} µs/op "
+            f"{result['peak_alloc_bytes'] / 1024:>10.1f} KiB peak",
+            file=sys.stderr
+        )
+
+
+# ==================== Benchmarks ====================
+
+def run_suite(suite: Suite):
+    from app.config.spots import SPOTS
+    from app.models.schemas import UserProfile, TimelineRequest
+    from app.routers import api
+    from app.services import hybrid_provider, response_cache
+    from app.services.noaa_tides_provider import NOAATidesProvider
+    from app.services.openmeteo_provider import OpenMeteoProvider
+    from app.services.openweather_provider import OpenWeatherProvider
+    from app.services.scenario_catalog import classify_scenario
+    from app.services.sensei_engine import SenseiEngine
+    from app.services.stormglass_provider import StormglassProvider
+    from app.services.windy_provider import WindyProvider
+
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+
+    spot_id = "varese"
+    spot = SPOTS[spot_id]
+    lat, lon = spot["lat"], spot["lon"]
+    user = UserProfile(board_type="inflable", experience="beginner", paddle_power="low", session_goal="calma")
+    engine = SenseiEngine()
+
+    tides = NOAATidesProvider()
+    openmeteo = OpenMeteoProvider(tide_provider=tides)
+    forecast_raw = recorded.openmeteo("forecast")
+    marine_raw = recorded.openmeteo("marine")
+
+    # --- Parser Open-Meteo ---
+    for size in SIZES:
+        suite.run(
+            "openmeteo.parse_combined_forecast", size,
+            lambda size=size: run(openmeteo._parse_combined_forecast_response(forecast_raw, marine_raw, lat, lon, size))
+        )
+
+    suite.run(
+        "openmeteo.parse_frame", len(forecast_raw["hourly"]["time"]),
+        lambda: openmeteo._parse_frame(forecast_raw, marine_raw, "rising")
+    )
+
+    frame = openmeteo._parse_frame(forecast_raw, marine_raw, "rising")
+    forecast_168 = frame.from_current(168).to_weather_list()
+
+    # --- Engine escalar ---
+    current = forecast_168[0]
+    suite.run("engine.analyze", 1, lambda: engine.analyze(current, spot_id, user))
+
+    scenario_inputs = [
+        (wd.wind.speed_kmh or 0.0, wd.wind.relative_direction or "none", wd.waves.height_m or 0.0, wd.tide.state, [])
+        for wd in forecast_168
+    ]
+
+    def classify_all():
+        for args in scenario_inputs:
+            classify_scenario(*args)
+
+    suite.run("scenario.classify_scenario", len(scenario_inputs), classify_all)
+
+    # --- Engine vectorizado ---
+    for size in SIZES:
+        hours = frame.from_current(size)
+        suite.run(
+            "engine.analyze_arrays", size,
+            lambda hours=hours: engine.analyze_arrays(hours.columns, spot_id, user, hours.tide)
+        )
+
+    # --- OpenWeather: interpolación 3h -> 1h ---
+    os.environ.setdefault("OPENWEATHER_API_KEY", "recorded")
+    openweather = OpenWeatherProvider()
+    for size in SIZES:
+        produced = len(run(openweather.get_forecast(lat, lon, size)))
+        suite.run(
+            "openweather.get_forecast", size,
+            lambda size=size: run(openweather.get_forecast(lat, lon, size)),
+            hours_produced=produced
+        )
+
+    # --- Stormglass ---
+    stormglass = StormglassProvider(api_key="recorded", tide_provider=tides)
+    stormglass_raw = recorded.stormglass()
+    for size in SIZES:
+        suite.run(
+            "stormglass.parse_forecast", size,
+            lambda size=size: run(stormglass._parse_forecast_response(stormglass_raw, lat, lon, size))
+        )
+
+    # --- Windy (httpx con transporte grabado) ---
+    windy = WindyProvider(api_key="recorded", tide_provider=None)
+    suite.run("windy.get_conditions", 1, lambda: run(windy.get_conditions(lat, lon)))
+
+    # --- Índice de spots: catálogo sintético (5000 spots en 50 regiones costeras) ---
+    from app.services.spot_index import SpotIndex, haversine_km
+    rng = np.random.default_rng(0)
+    regions = {
+        f"r{i}": {"name": f"r{i}", "lat": float(rng.uniform(-60, 60)), "lon": float(rng.uniform(-180, 180)), "max_distance_km": 80}
+        for i in range(50)
+    }
+    region_ids = list(regions)
+    catalog = {}
+    for i in range(5000):
+        region = regions[region_ids[i % len(region_ids)]]
+        catalog[f"s{i}"] = {
+            "name": f"s{i}", "region": region_ids[i % len(region_ids)], "orientation_costa_deg": 90,
+            "lat": region["lat"] + float(rng.normal(0, 0.3)), "lon": region["lon"] + float(rng.normal(0, 0.3)),
+        }
+    spot_idx = SpotIndex(catalog, regions)
+    all_lats = np.array([spot["lat"] for spot in catalog.values()])
+    all_lons = np.array([spot["lon"] for spot in catalog.values()])
+    user_lat, user_lon = catalog["s7"]["lat"] + 0.02, catalog["s7"]["lon"] - 0.01
+    suite.run("spot_index.serving_spot", len(catalog), lambda: spot_idx.serving_spot(user_lat, user_lon))
+    suite.run("spot_index.nearest (k=5)", len(catalog), lambda: spot_idx.nearest(user_lat, user_lon, k=5))
+    suite.run("spot_index.within (30 km)", len(catalog), lambda: spot_idx.within(user_lat, user_lon, 30))
+    suite.run("spot_index.recorrido lineal (numpy)", len(catalog), lambda: int(np.argmin(haversine_km(user_lat, user_lon, all_lats, all_lons))))
+
+    # --- Timeline ---
+    for size in SIZES:
+        hours = frame.from_current(size)
+        suite.run(
+            "timeline.build_points", size,
+            lambda hours=hours: api._build_timeline_points(hours, spot_id, user, engine)
+        )
+        suite.run(
+            "timeline.build_points (view=scores)", size,
+            lambda hours=hours: api._build_timeline_points(hours, spot_id, user, engine, "scores")
+        )
+
+    from app.services.timeline_aggregation import aggregate_timeline
+    week = frame.from_current(168)
+    for resolution in ("3h", "daily"):
+        suite.run(
+            f"timeline.aggregate ({resolution})", len(week),
+            lambda resolution=resolution: aggregate_timeline(week, spot_id, user, resolution, engine)
+        )
+
+    hybrid_provider.clear_cache()
+    request = TimelineRequest(spot_id=spot_id, user=user)
+
+    def timeline_miss():
+        # Frame en caché pero sin bytes de respuesta: engine + validación + orjson
+        response_cache.clear_cache()
+        return run(api.get_timeline(request, if_none_match=None, accept_encoding=None, accept=None))
+
+    suite.run("api.get_timeline (sin caché de respuesta)", 12, timeline_miss)
+    suite.run("api.get_timeline (cache caliente)", 12, lambda: run(api.get_timeline(request, if_none_match=None, accept_encoding=None, accept=None)))
+
+    compact_request = TimelineRequest(spot_id=spot_id, user=user, compact=True)
+
+    def timeline_compact_miss():
+        response_cache.clear_cache()
+        return run(api.get_timeline(compact_request, if_none_match=None, accept_encoding=None, accept=None))
+
+    suite.run(
+        "api.get_timeline compacto (sin caché de respuesta)", 12, timeline_compact_miss,
+        body_bytes=len(timeline_compact_miss().body), full_body_bytes=len(timeline_miss().body)
+    )
+
+    # MessagePack: codificar (una vez por entrada del caché) y decodificar, vs JSON
+    import msgpack
+    from app.services import msgpack_codec
+    week_request = TimelineRequest(spot_id=spot_id, user=user, horizon_hours=168, page_size=168)
+    week_json = run(api.get_timeline(week_request, if_none_match=None, accept_encoding=None, accept=None)).body
+    week_msgpack = msgpack_codec.encode_json(week_json)
+    suite.run(
+        "msgpack.encode_json (timeline)", 168, lambda: msgpack_codec.encode_json(week_json),
+        body_bytes=len(week_msgpack), full_body_bytes=len(week_json)
+    )
+    suite.run("decode timeline (json.loads)", 168, lambda: json.loads(week_json))
+    suite.run("decode timeline (msgpack.unpackb)", 168, lambda: msgpack.unpackb(week_msgpack))
+
+    # Endpoint completo (validación de response_model + serialización JSON).
+    # Sin límites de entrada: el loop supera el burst de un cliente (el limitador se mide aparte)
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    from fastapi.testclient import TestClient
+    from app.main import app
+    client = TestClient(app)
+    body = {"spot_id": spot_id, "user": user.model_dump()}
+    suite.run("http.post /api/timeline (cache caliente)", 12, lambda: client.post("/api/timeline", json=body).content)
+
+    # Limitador de entrada: costo por pedido con muchos clientes distintos
+    from app.services.rate_limit import TIERS, TokenBuckets
+    buckets = TokenBuckets(TIERS)
+    clients = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(10000)]
+
+    def take_all():
+        for client_id in clients:
+            buckets.take(client_id, "cheap")
+
+    suite.run("rate_limit.take (10k clientes)", len(clients), take_all)
+
+    loop.close()
+
+
+# ==================== Salida y comparación ====================
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Retorna la lista de regresiones contra una corrida anterior"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["name"], result["size"]))
+        if not previous:
+            continue
+        time_ratio = result["median_us"] / previous["median_us"] if previous["median_us"] else 1.0
+        # 1 KiB de tolerancia absoluta para el ruido de tracemalloc
+        mem_limit = previous["peak_alloc_bytes"] * (1 + threshold) + 1024
+        line = f"{result['name']} size={result['size']}: tiempo x{time_ratio:.2f}"
+        if time_ratio > 1 + threshold:
+            regressions.append(line + f" ({previous['median_us']} -> {result['median_us']} µs)")
+        if result["peak_alloc_bytes"] > mem_limit:
+            regressions.append(
+                f"{result['name']} size={result['size']}: memoria "
+                f"{previous['peak_alloc_bytes']} -> {result['peak_alloc_bytes']} bytes"
+            )
+        print(line, file=sys.stderr)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks offline de Rumbo SUP")
+    parser.add_argument("--output", help="Archivo JSON de salida (default: stdout)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regresión tolerada (0.25 = 25%%)")
+    parser.add_argument("--filter", help="Correr solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--quick", action="store_true", help="Menos repeticiones (smoke test)")
+    args = parser.parse_args(argv)
+
+    # Los providers loguean cada request: silenciarlos para no medir logging
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("app").setLevel(logging.ERROR)
+
+    install_recorded_network()
+    suite = Suite(args.filter, args.quick)
+    run_suite(suite)
+
+    from app.services.scoring_model import get_scoring_model
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "scoring_version": get_scoring_model().version,
+            "quick": args.quick,
+        },
+        "results": suite.results,
+    }
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        regressions = compare(suite.results, args.compare, args.threshold)
+        if regressions:
+            print("\n❌ Regresiones detectadas:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            return 1
+        print("\n✅ Sin regresiones", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Fixtures compartidos: red grabada (benchmarks/fixtures) y cachés limpios por test
+
+Los tests corren 100% offline contra los mismos payloads sintéticos que los
+benchmarks (corridos para que el día de referencia sea HOY), desde proyecto/backend:
+    python -m pytest -q
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+# Sin límites de entrada ni refresh de publisher salvo en los tests que los prueban
+os.environ.pop("RATE_LIMIT_ENABLED", None)
+os.environ.pop("TRUSTED_PROXY_HOPS", None)
+os.environ.pop("SNAPSHOT_PUBLISHER", None)
+os.environ.pop("CLUSTER_STORE", None)
+
+from benchmarks.run_benchmarks import install_recorded_network  # noqa: E402
+
+install_recorded_network()
+
+SPOT_ID = "varese"
+PROFILE_CODE = "iblc"  # inflable, beginner, low, calma
+USER = {"board_type": "inflable", "experience": "beginner", "paddle_power": "low", "session_goal": "calma"}
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    from app.services import hybrid_provider, offline_bundle, response_cache, timeline_history
+
+    hybrid_provider.clear_cache()
+    response_cache.clear_cache()
+    timeline_history.clear_cache()
+    offline_bundle.clear_cache()
+    yield
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # Sin `with`: no corren los eventos de startup (loops de background)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    from app.models.schemas import UserProfile
+
+    return UserProfile(**USER)
+
+
+@pytest.fixture
+def frame():
+    """Próximas 48 h del spot de prueba (HourlyFrame)"""
+    from app.config.spots import SPOTS
+    from app.routers.api import _build_weather_service
+
+    spot = SPOTS[SPOT_ID]
+    return asyncio.run(_build_weather_service().get_forecast_frame(spot["lat"], spot["lon"], hours=48))
+
+
+def write_catalog(path, extra_spots: dict):
+    """spots.json con el catálogo real + extra_spots (misma región salvo que indiquen otra)"""
+    from app.config.spots import load_catalog
+
+    catalog = load_catalog()
+    base = catalog["spots"][SPOT_ID]
+    spots = dict(catalog["spots"])
+    spots.update({spot_id: {**base, "reglas_especificas": [], **spot} for spot_id, spot in extra_spots.items()})
+    path.write_text(json.dumps({"regions": catalog["regions"], "spots": spots}), encoding="utf-8")
+
+
+@pytest.fixture
+def spot_catalog_file(tmp_path, monkeypatch):
+    """Catálogo de spots en un archivo temporal; al terminar se vuelve al original"""
+    from app.config import spots as spot_catalog
+    from app.services import spot_index
+
+    original = spot_catalog.SPOTS_FILE
+    path = tmp_path / "spots.json"
+    write_catalog(path, {})
+    monkeypatch.setattr(spot_catalog, "SPOTS_FILE", str(path))
+    spot_index.reload()
+    yield path
+    spot_index.reload(original)
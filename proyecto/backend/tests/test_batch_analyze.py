@@ -0,0 +1,80 @@
+from app.models.schemas import MAX_HORIZON_HOURS, UserProfile
+from app.routers import api
+from app.services import http_client as http_module
+from app.services.profile_codes import profile_code
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import PROFILE_CODE, SPOT_ID, USER
+
+ADVANCED = {**USER, "experience": "advanced"}
+
+
+def test_results_keep_request_order_and_share_work(client, monkeypatch):
+    evaluations, fetches = [], []
+    evaluate = SenseiEngine.evaluate
+    recorded_get = http_module.http_client.get
+
+    def counting_evaluate(self, *args, **kwargs):
+        evaluations.append(args[1])
+        return evaluate(self, *args, **kwargs)
+
+    async def counting_get(url, params=None):
+        fetches.append(url)
+        return await recorded_get(url, params)
+
+    monkeypatch.setattr(SenseiEngine, "evaluate", counting_evaluate)
+    monkeypatch.setattr(http_module.http_client, "get", counting_get)
+
+    items = [
+        {"spot_id": SPOT_ID, "user": USER, "hour": 0},
+        {"spot_id": SPOT_ID, "user": ADVANCED, "hour": 2},
+        {"spot_id": SPOT_ID, "user": USER, "hour": 0},
+        {"spot_id": SPOT_ID, "user": USER, "hour": 2},
+    ] * 5
+    body = client.post("/api/analyze/batch", json={"items": items}).json()
+
+    codes = {PROFILE_CODE: USER, profile_code(UserProfile(**ADVANCED)): ADVANCED}
+    assert [(r["hour"], codes[r["profile"]]) for r in body["results"]] == [(i["hour"], i["user"]) for i in items]
+    assert body["distinct_spots"] == 1
+    assert body["distinct_evaluations"] == len(evaluations) == 3
+    assert sorted(body["weather"]) == [f"{SPOT_ID}@0", f"{SPOT_ID}@2"]
+    assert len(fetches) <= 2  # forecast + marine, una vez
+
+
+def test_results_match_single_analysis(client, frame, user):
+    body = client.post("/api/analyze/batch", json={"items": [{"spot_id": SPOT_ID, "user": USER, "hour": 3}]}).json()
+    result = body["results"][0]
+    assert result["timestamp"] == frame.timestamp(frame.current_index() + 3)
+    expected = SenseiEngine().evaluate(frame.record(frame.current_index() + 3), SPOT_ID, user).to_dict()
+    assert result["result"]["scores"] == expected["scores"]
+    assert result["result"]["semantics"]["scenario_id"] == expected["semantics"]["scenario_id"]
+
+
+def test_errors_are_per_item(client, monkeypatch):
+    real_service = api._build_weather_service()
+
+    class ShortForecast:
+        """Pronóstico de 24 h (ej: un proveedor que no cubre todo el horizonte)"""
+        async def get_forecast_frame(self, lat, lon, hours=12):
+            return (await real_service.get_forecast_frame(lat, lon, hours=hours))[:24]
+
+    monkeypatch.setattr(api, "_build_weather_service", ShortForecast)
+    items = [
+        {"spot_id": "waikiki", "user": USER},
+        {"spot_id": SPOT_ID, "user": USER, "hour": 100},
+        {"spot_id": SPOT_ID, "user": USER},
+    ]
+    results = client.post("/api/analyze/batch", json={"items": items}).json()["results"]
+    assert "no encontrado" in results[0]["error"]
+    assert "fuera del horizonte" in results[1]["error"]
+    assert results[2]["error"] is None and results[2]["result"] is not None
+    assert client.post("/api/analyze/batch", json={"items": []}).status_code == 422
+
+
+def test_hours_past_the_marine_horizon_are_rejected(client):
+    # El forecast sintético llega a 216 h, pero pasado MAX_HORIZON_HOURS no hay oleaje
+    last = {"spot_id": SPOT_ID, "user": USER, "hour": MAX_HORIZON_HOURS - 1}
+    assert client.post("/api/analyze/batch", json={"items": [last]}).json()["results"][0]["error"] is None
+    for hour in (MAX_HORIZON_HOURS, 200):
+        item = {"spot_id": SPOT_ID, "user": USER, "hour": hour}
+        assert client.post("/api/analyze/batch", json={"items": [item]}).status_code == 422
@@ -0,0 +1,163 @@
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.config.spots import SPOTS
+from app.routers import api
+from app.services import cluster, hybrid_provider
+from app.services import http_client as http_module
+from app.services.cluster import HashRing, SQLiteStore
+from app.services.hourly_frame import HourlyFrame
+
+from tests.conftest import SPOT_ID
+
+KEYS = [f"{lat / 100:.2f},{lon / 100:.2f}" for lat in range(-4000, -3600, 7) for lon in range(-5900, -5700, 7)]
+
+
+def _owners(ring: HashRing) -> dict:
+    return {key: ring.owner(key) for key in KEYS}
+
+
+def test_ring_is_deterministic_and_balanced():
+    ring = HashRing(["a", "b", "c", "d"])
+    assert _owners(ring) == _owners(HashRing(["d", "c", "b", "a", "a"]))
+    assert HashRing(()).owner("x") is None
+    counts = {node: list(_owners(ring).values()).count(node) for node in ring.nodes}
+    assert all(0.12 < count / len(KEYS) < 0.4 for count in counts.values())
+
+
+def test_membership_changes_move_only_the_affected_cells():
+    before = _owners(HashRing(["a", "b", "c", "d"]))
+    grown = _owners(HashRing(["a", "b", "c", "d", "e"]))
+    moved = [key for key in KEYS if before[key] != grown[key]]
+    assert all(grown[key] == "e" for key in moved)
+    assert 0.05 < len(moved) / len(KEYS) < 0.35
+
+    shrunk = _owners(HashRing(["a", "b", "d"]))
+    assert all(shrunk[key] == before[key] for key in KEYS if before[key] != "c")
+
+
+def test_sqlite_store_is_shared_and_never_goes_back_in_time(tmp_path):
+    path = str(tmp_path / "cluster.db")
+    writer, reader = SQLiteStore(path), SQLiteStore(path)
+    writer.put_frame("k", 100.0, 12, b"nuevo")
+    writer.put_frame("k", 50.0, 48, b"viejo")
+    assert reader.get_frame("k") == (100.0, 12, b"nuevo")
+    assert reader.frame_info("k") == (100.0, 12)
+    assert reader.get_frame("otro") is None
+
+    writer.heartbeat("a", 10.0)
+    reader.heartbeat("b", 20.0)
+    assert sorted(writer.members(since=5.0)) == ["a", "b"]
+    assert writer.members(since=15.0) == ["b"]
+    reader.leave("b")
+    assert writer.members(since=5.0) == ["a"]
+    writer.close()
+    reader.close()
+
+
+def test_open_store_validates_the_url(tmp_path):
+    assert isinstance(cluster.open_store(f"sqlite:///{tmp_path}/c.db"), SQLiteStore)
+    for url in ("redis://host", "sqlite:/c.db", f"nope:///{tmp_path}/c.db"):
+        with pytest.raises(ValueError):
+            cluster.open_store(url)
+
+
+def _provider_frame(hours: int = 48) -> HourlyFrame:
+    """Frame completo del provider (lo que se publica en el store), no la vista desde la hora actual"""
+    spot = SPOTS[SPOT_ID]
+    return asyncio.run(api._build_weather_service().provider.get_forecast_frame(spot["lat"], spot["lon"], hours=hours))
+
+
+def test_frame_bytes_round_trip(frame):
+    columns = {name: column.copy() for name, column in frame.columns.items()}
+    columns["wave_height_m"][2] = np.nan
+    frame = HourlyFrame(frame.epochs.copy(), columns, frame.tide.copy(), frame.provider)
+    rebuilt = HourlyFrame.from_bytes(frame.to_bytes())
+    assert rebuilt.data_version == frame.data_version
+    assert rebuilt.provider == frame.provider
+    assert rebuilt.tide.tolist() == frame.tide.tolist()
+    for name, column in frame.columns.items():
+        np.testing.assert_array_equal(rebuilt.columns[name], column)
+
+
+@pytest.fixture
+def cluster_node(tmp_path):
+    url = f"sqlite:///{tmp_path}/cluster.db"
+    assert cluster.configure(url, node_id="a")
+    yield str(tmp_path / "cluster.db")
+    asyncio.run(cluster.stop())
+
+
+def test_membership_follows_heartbeats(cluster_node):
+    other = SQLiteStore(cluster_node)
+    now = time.time()
+    other.heartbeat("b", now)
+    assert asyncio.run(cluster.sync_membership(now))
+    assert cluster.members() == ("a", "b")
+    ring = HashRing(["a", "b"])
+    assert all(cluster.is_owner(key) == (ring.owner(key) == "a") for key in KEYS)
+
+    # b deja de latir: sale del anillo al vencer el TTL y "a" pasa a ser dueño de todo
+    assert asyncio.run(cluster.sync_membership(now + cluster.MEMBER_TTL_SECONDS + 1))
+    assert cluster.members() == ("a",)
+    assert all(cluster.is_owner(key) for key in KEYS)
+    other.close()
+
+
+def test_published_frame_is_read_instead_of_downloaded(cluster_node, monkeypatch):
+    frame = _provider_frame()
+    hybrid_provider.clear_cache()
+    spot = SPOTS[SPOT_ID]
+    key = hybrid_provider._location_key(spot["lat"], spot["lon"])
+    owner = SQLiteStore(cluster_node)
+    owner.put_frame(key, datetime.now(timezone.utc).timestamp(), 48, frame.to_bytes())
+
+    async def offline_get(url, params=None):
+        raise AssertionError("no debería descargar: el dueño ya publicó el frame")
+
+    monkeypatch.setattr(http_module.http_client, "get", offline_get)
+    assert _provider_frame(24).data_version == frame.data_version
+    owner.close()
+
+
+def test_downloads_are_published_for_the_other_nodes(cluster_node):
+    spot = SPOTS[SPOT_ID]
+    downloaded = _provider_frame(24)
+    other = SQLiteStore(cluster_node)
+    fetched_at, hours, payload = other.get_frame(hybrid_provider._location_key(spot["lat"], spot["lon"]))
+    other.close()
+    assert hours >= 24
+    assert HourlyFrame.from_bytes(payload).data_version == downloaded.data_version
+
+
+def test_a_locked_store_does_not_stall_the_event_loop(cluster_node, frame):
+    # Otro nodo con el archivo tomado: la escritura espera en un thread, el loop sigue atendiendo
+    blocker = sqlite3.connect(cluster_node, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        publishing = asyncio.create_task(cluster.put_frame("k", datetime.now(timezone.utc), 48, frame))
+        await asyncio.sleep(0.3)
+        assert not publishing.done()
+        blocker.execute("COMMIT")
+        await publishing
+        ticking.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 10
+    blocker.close()
+    assert SQLiteStore(cluster_node).frame_info("k")[1] == 48
@@ -0,0 +1,45 @@
+from app.services import scenario_catalog
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _expand(compact: dict, catalog: dict) -> dict:
+    """Reconstruye la semántica completa a partir del catálogo + agregados dinámicos"""
+    semantics = dict(catalog[compact["scenario_id"]])
+    semantics["risk_desc"] += compact["risk_extra"]
+    semantics["strategy_desc"] += compact["strategy_extra"]
+    semantics["scenario_id"] = compact["scenario_id"]
+    return semantics
+
+
+def test_compact_timeline_expands_to_the_full_one(client):
+    full = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER}).json()
+    compact = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "compact": True}).json()
+    assert compact["catalog_version"] == scenario_catalog.CATALOG_VERSION
+    catalog = compact["scenarios"]
+    assert len(full["timeline"]) == len(compact["timeline"])
+    for full_point, compact_point in zip(full["timeline"], compact["timeline"]):
+        full_result, compact_result = full_point["result"], compact_point["result"]
+        assert _expand(compact_result.pop("semantics"), catalog) == full_result.pop("semantics")
+        assert compact_result == full_result
+
+
+def test_compact_without_scenarios_is_smaller(client):
+    full = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    compact = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "compact": True})
+    bare = client.post(
+        "/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "compact": True, "include_scenarios": False}
+    )
+    assert len(bare.content) < len(compact.content) < len(full.content)
+    assert not bare.json().get("scenarios")
+
+
+def test_scenario_catalog_endpoints(client):
+    catalog = client.get("/api/scenarios")
+    assert catalog.status_code == 200
+    version = catalog.json()["version"]
+    assert set(catalog.json()["scenarios"]) == set(scenario_catalog.SCENARIO_IDS)
+    versioned = client.get(f"/api/scenarios/{version}")
+    assert versioned.status_code == 200
+    assert "immutable" in versioned.headers["cache-control"]
+    assert client.get("/api/scenarios/no-existe").status_code == 404
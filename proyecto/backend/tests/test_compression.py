@@ -0,0 +1,53 @@
+import gzip
+
+import brotli
+import pytest
+
+from app.services import response_cache
+
+from tests.conftest import SPOT_ID, USER
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+])
+def test_negotiate_encoding(header, expected):
+    assert response_cache.negotiate_encoding(header) == expected
+
+
+def test_variants_are_compressed_once_and_decode_to_the_raw_body():
+    entry = response_cache.put(("x",), b'{"a":"' + b"x" * 2000 + b'"}')
+    br = entry.encoded("br")
+    assert entry.encoded("br") is br
+    assert brotli.decompress(br) == entry.body
+    assert gzip.decompress(entry.encoded("gzip")) == entry.body
+    assert len(br) < len(entry.body)
+
+
+def test_small_bodies_are_not_compressed():
+    entry = response_cache.put(("x",), b'{"ok":true}')
+    response = response_cache.json_response(entry, accept_encoding="br, gzip")
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == entry.etag
+
+
+@pytest.mark.parametrize("encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_timeline_is_served_precompressed(client, encoding, decompress):
+    plain = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER}, headers={"Accept-Encoding": "identity"})
+    request = client.build_request(
+        "POST", "/api/timeline", json={"spot_id": SPOT_ID, "user": USER}, headers={"Accept-Encoding": encoding}
+    )
+    compressed = client.send(request, stream=True)
+    raw = b"".join(compressed.iter_raw())
+    assert compressed.headers["content-encoding"] == encoding
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + f'-{encoding}"'
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert decompress(raw) == plain.content
+    assert len(raw) < len(plain.content)
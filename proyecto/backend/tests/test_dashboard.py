@@ -0,0 +1,48 @@
+from app.services import http_client as http_module
+
+from tests.conftest import PROFILE_CODE, SPOT_ID
+
+NEAR_VARESE = {"lat": -38.02, "lon": -57.54}
+
+
+def _dashboard(client, **params):
+    return client.get("/api/dashboard", params={**NEAR_VARESE, "profile": PROFILE_CODE, **params})
+
+
+def test_dashboard_composes_the_three_calls(client):
+    body = _dashboard(client, view="compact").json()
+    assert body["nearest"] == client.get("/api/spots/nearest", params=NEAR_VARESE).json()
+    assert body["nearest"]["spot_id"] == SPOT_ID
+
+    params = {"spot_id": SPOT_ID, "profile": PROFILE_CODE, "view": "compact"}
+    identity = {"Accept-Encoding": "identity"}
+    analyze = client.get("/api/analyze", params=params, headers=identity)
+    timeline = client.get("/api/timeline", params=params, headers=identity)
+    assert body["analyze"] == analyze.json()
+    assert body["timeline"] == timeline.json()
+    assert body["etags"] == {"analyze": analyze.headers["etag"], "timeline": timeline.headers["etag"]}
+
+
+def test_dashboard_downloads_the_forecast_once(client, monkeypatch):
+    fetches = []
+    recorded_get = http_module.http_client.get
+
+    async def counting_get(url, params=None):
+        fetches.append(url)
+        return await recorded_get(url, params)
+
+    monkeypatch.setattr(http_module.http_client, "get", counting_get)
+    assert _dashboard(client).status_code == 200
+    assert fetches and len(fetches) == len(set(fetches))
+
+
+def test_dashboard_revalidates_and_rejects_far_locations(client):
+    first = _dashboard(client, view="scores")
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert _dashboard(client, view="scores").headers["etag"] == first.headers["etag"]
+    again = client.get(
+        "/api/dashboard", params={**NEAR_VARESE, "profile": PROFILE_CODE, "view": "scores"},
+        headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert again.status_code == 304
+    assert client.get("/api/dashboard", params={"lat": 40.0, "lon": 3.0, "profile": PROFILE_CODE}).status_code == 404
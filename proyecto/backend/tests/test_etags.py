@@ -0,0 +1,68 @@
+import pytest
+
+from app.services import hybrid_provider, response_cache
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID, USER
+
+ETAG = '"abc123"'
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.mark.parametrize("header", [
+    '"abc123"',
+    'W/"abc123"',
+    '"otro", "abc123"',
+    "*",
+    '"abc123-br"',
+    '"abc123-gzip"',
+    '"abc123-mp"',
+    '"abc123-mp-br"',
+])
+def test_etag_matches(header):
+    assert response_cache.etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", '"otro"', '"abc1234"', '"abc123-zstd"', '"abc123-br-mp"'])
+def test_etag_does_not_match(header):
+    assert not response_cache.etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("endpoint", ["analyze", "timeline"])
+def test_revalidation_answers_304_without_running_the_engine(client, monkeypatch, endpoint):
+    first = client.post(f"/api/{endpoint}", json={"spot_id": SPOT_ID, "user": USER}, headers=IDENTITY)
+    etag = first.headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("un 304 no debería evaluar")
+
+    response_cache.clear_cache()
+    monkeypatch.setattr(SenseiEngine, "evaluate", fail)
+    monkeypatch.setattr(SenseiEngine, "analyze_arrays", fail)
+    revalidated = client.post(
+        f"/api/{endpoint}", json={"spot_id": SPOT_ID, "user": USER},
+        headers={"If-None-Match": f'W/"viejo", {etag}', **IDENTITY}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+
+def test_etag_changes_with_the_profile(client):
+    first = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    other = client.post(
+        "/api/timeline", json={"spot_id": SPOT_ID, "user": {**USER, "experience": "advanced"}},
+        headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert other.status_code == 200
+    assert other.headers["etag"] != first.headers["etag"]
+
+
+def test_identical_refresh_keeps_the_etag(client):
+    first = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    hybrid_provider.clear_cache()
+    response_cache.clear_cache()
+    refreshed = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    assert refreshed.headers["etag"] == first.headers["etag"]
+    assert refreshed.content == first.content
@@ -0,0 +1,53 @@
+import re
+import time
+
+import pytest
+
+from app.services import response_cache
+from app.services.hourly_frame import HOUR_SECONDS
+from app.services.hybrid_provider import CACHE_TTL_MINUTES
+
+from tests.conftest import PROFILE_CODE, SPOT_ID, USER
+
+
+def test_cache_control_from_expiry():
+    assert response_cache.cache_control(1100, 60, now=1000) == "public, max-age=100, stale-while-revalidate=60"
+    assert response_cache.cache_control(900, 60, now=1000) == "public, max-age=0, stale-while-revalidate=60"
+
+
+@pytest.mark.parametrize("endpoint, extra", [("analyze", {}), ("timeline", {"view": "compact"})])
+def test_get_matches_post_and_is_cacheable(client, endpoint, extra):
+    headers = {"Accept-Encoding": "identity"}
+    posted = client.post(f"/api/{endpoint}", json={"spot_id": SPOT_ID, "user": USER, **extra}, headers=headers)
+    got = client.get(f"/api/{endpoint}", params={"spot_id": SPOT_ID, "profile": PROFILE_CODE, **extra}, headers=headers)
+    assert got.status_code == 200
+    assert got.content == posted.content
+    assert got.headers["etag"] == posted.headers["etag"]
+    assert "Accept" in got.headers["vary"]
+
+    match = re.fullmatch(r"public, max-age=(\d+), stale-while-revalidate=(\d+)", got.headers["cache-control"])
+    max_age, swr = int(match[1]), int(match[2])
+    # Fresco a lo sumo hasta el cambio de hora (o antes si vence el frame cacheado)
+    assert max_age <= HOUR_SECONDS - int(time.time()) % HOUR_SECONDS + 1
+    assert max_age <= CACHE_TTL_MINUTES * 60
+    assert swr == CACHE_TTL_MINUTES * 60
+
+
+def test_revalidated_get_keeps_cache_control(client):
+    params = {"spot_id": SPOT_ID, "profile": PROFILE_CODE}
+    first = client.get("/api/analyze", params=params, headers={"Accept-Encoding": "identity"})
+    again = client.get("/api/analyze", params=params, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["cache-control"].startswith("public, max-age=")
+
+
+def test_non_canonical_profile_redirects(client):
+    response = client.get(
+        "/api/timeline", params={"spot_id": SPOT_ID, "profile": PROFILE_CODE.upper(), "view": "scores"},
+        follow_redirects=False
+    )
+    assert response.status_code == 308
+    assert f"profile={PROFILE_CODE}" in response.headers["location"]
+    assert "view=scores" in response.headers["location"]
+    assert client.get("/api/analyze", params={"spot_id": SPOT_ID, "profile": "zzzz"}).status_code == 422
+    assert client.get("/api/analyze", params={"spot_id": "waikiki", "profile": PROFILE_CODE}).status_code == 404
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.services.hourly_frame import HOUR_SECONDS, HourlyFrame, column_from_list, current_hour_epoch, parse_epochs
+
+
+def test_parse_epochs_with_and_without_zone():
+    naive = parse_epochs(["2026-01-14T00:00", "2026-01-14T01:00"])
+    zoned = parse_epochs(["2026-01-14T00:00Z", "2026-01-14T01:00:00+00:00"])
+    assert naive.tolist() == zoned.tolist() == [1768348800, 1768348800 + HOUR_SECONDS]
+
+
+def test_column_from_list_pads_missing_hours_with_nan():
+    column = column_from_list([1.0, None, 3.0], 5, divisor=2.0)
+    assert column[[0, 2]].tolist() == [0.5, 1.5]
+    assert np.isnan(column[[1, 3, 4]]).all()
+
+
+def test_round_trip_through_weather_data(frame):
+    rebuilt = HourlyFrame.from_weather_data(frame.to_weather_list(), frame.provider)
+    assert rebuilt.epochs.tolist() == frame.epochs.tolist()
+    assert rebuilt.tide.tolist() == frame.tide.tolist()
+    for name, column in frame.columns.items():
+        np.testing.assert_allclose(rebuilt.columns[name], column, equal_nan=True)
+
+
+def test_data_version_follows_content(frame):
+    copy = HourlyFrame(frame.epochs.copy(), {k: v.copy() for k, v in frame.columns.items()}, frame.tide.copy(), frame.provider)
+    changed = HourlyFrame(frame.epochs.copy(), {k: v.copy() for k, v in frame.columns.items()}, frame.tide.copy(), frame.provider)
+    changed.columns["wind_speed_kmh"][3] += 1
+    assert copy.data_version == HourlyFrame(copy.epochs, copy.columns, copy.tide, copy.provider).data_version
+    assert copy.data_version != changed.data_version
+    assert copy[2:10].data_version == f"{copy.data_version}:2:10:1"
+    assert copy[2:10].data_version != copy[3:10].data_version
+
+
+def test_slices_are_views(frame):
+    view = frame[4:8]
+    assert len(view) == 4
+    assert np.shares_memory(view.columns["wind_speed_kmh"], frame.columns["wind_speed_kmh"])
+    with pytest.raises(TypeError):
+        frame[0]
+
+
+def test_current_index_and_timestamps(frame):
+    assert frame.epochs[frame.current_index()] >= current_hour_epoch()
+    assert frame.current_index(now_epoch=int(frame.epochs[5]) - 1) == 5
+    assert frame.current_index(now_epoch=int(frame.epochs[-1]) + 10 * HOUR_SECONDS) == len(frame) - 1
+    assert frame.timestamps() == [frame.timestamp(i) for i in range(len(frame))]
+    assert frame.covers(len(frame) - frame.current_index())
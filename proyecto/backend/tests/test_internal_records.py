@@ -0,0 +1,31 @@
+from app.models.schemas import EngineResult, WeatherData
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID
+
+
+def test_weather_record_dict_matches_the_schema(frame):
+    record = frame.record(0)
+    schema = record.to_schema()
+    assert schema.model_dump() == WeatherData.model_validate(record.to_dict()).model_dump()
+    assert schema.timestamp == frame.timestamp(0)
+
+
+def test_engine_accepts_records_and_schemas_alike(frame, user):
+    engine = SenseiEngine()
+    for i in range(0, len(frame), 6):
+        record = frame.record(i)
+        from_record = engine.evaluate(record, SPOT_ID, user, data_epoch=int(frame.epochs[i]))
+        from_schema = engine.analyze(record.to_schema(), SPOT_ID, user, data_epoch=int(frame.epochs[i]))
+        assert from_record.to_schema() == from_schema
+        assert EngineResult.model_validate(from_record.to_dict()) == from_schema
+
+
+def test_copy_for_another_hour_keeps_the_original_wind(frame):
+    record = frame.record(0)
+    original = record.wind.relative_direction
+    moved = record.at("2026-01-14T05:00Z")
+    moved.wind.relative_direction = "sentinel"
+    assert moved.timestamp == "2026-01-14T05:00Z"
+    assert record.wind.relative_direction == original
+    assert moved.waves is record.waves
@@ -0,0 +1,95 @@
+import asyncio
+
+from app.services import live_updates
+from app.services.live_updates import LiveHub, Subscriber, sse_event
+
+
+def _drain(subscriber: Subscriber) -> list:
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    return messages
+
+
+def test_sse_event_format():
+    assert sse_event("conditions", b'{"a":1}', "v1") == b'event: conditions\nid: v1\ndata: {"a":1}\n\n'
+
+
+def test_publish_fans_out_once_per_version():
+    hub = LiveHub()
+    a, b = hub.subscribe("varese", "iblc"), hub.subscribe("varese", "iblc")
+    other = hub.subscribe("varese", "aiha")
+    assert hub.publish("varese", "iblc", "v1", b"m1") == 2
+    assert hub.publish("varese", "iblc", "v1", b"m1") == 0
+    assert _drain(a) == _drain(b) == [b"m1"]
+    assert _drain(other) == []
+
+
+def test_subscriber_that_already_has_the_version_is_skipped():
+    hub = LiveHub()
+    fresh = hub.subscribe("varese", "iblc", version="v1")
+    stale = hub.subscribe("varese", "iblc")
+    assert hub.publish("varese", "iblc", "v1", b"m1") == 1
+    assert _drain(fresh) == []
+    assert _drain(stale) == [b"m1"]
+
+
+def test_full_queue_keeps_the_latest_and_closes_slow_consumers():
+    subscriber = Subscriber("varese", "iblc")
+    for i in range(live_updates.LIVE_QUEUE_SIZE):
+        subscriber.offer(b"m%d" % i)
+    subscriber.offer(b"nuevo")
+    assert not subscriber.closed
+    assert _drain(subscriber)[-1] == b"nuevo"
+
+    for i in range(live_updates.LIVE_QUEUE_SIZE + live_updates.LIVE_SLOW_CONSUMER_DROPS):
+        subscriber.offer(b"m%d" % i)
+    assert subscriber.closed
+    assert subscriber.queue.qsize() == live_updates.LIVE_QUEUE_SIZE
+
+
+def test_unsubscribe_forgets_the_published_version():
+    hub = LiveHub()
+    subscriber = hub.subscribe("varese", "iblc")
+    hub.publish("varese", "iblc", "v1", b"m1")
+    hub.unsubscribe(subscriber)
+    assert hub.subscriber_count == 0
+    again = hub.subscribe("varese", "iblc")
+    assert hub.publish("varese", "iblc", "v1", b"m1") == 1
+    assert _drain(again) == [b"m1"]
+
+
+def test_refresh_once_evaluates_each_spot_once_and_survives_errors():
+    hub = LiveHub()
+    hub.subscribe("varese", "iblc")
+    hub.subscribe("varese", "aiha")
+    hub.subscribe("roto", "iblc")
+    calls = []
+
+    async def refresh(spot_id, profiles):
+        calls.append((spot_id, sorted(profiles)))
+        if spot_id == "roto":
+            raise ValueError("upstream caído")
+        return {profile: ("v1", b"m-" + profile.encode()) for profile in profiles}
+
+    assert asyncio.run(hub.refresh_once(refresh)) == 2
+    assert sorted(calls) == [("roto", ["iblc"]), ("varese", ["aiha", "iblc"])]
+    assert asyncio.run(hub.refresh_once(refresh)) == 0
+
+
+def test_stream_yields_the_initial_state_then_events_and_unsubscribes():
+    async def scenario():
+        hub = LiveHub()
+        subscriber = hub.subscribe("varese", "iblc", version="v0")
+        hub.publish("varese", "iblc", "v1", b"m1")
+        generator = live_updates.stream(hub, subscriber, first=b"inicial")
+        received = [await generator.__anext__(), await generator.__anext__()]
+        await generator.aclose()
+        return received, hub.subscriber_count
+
+    assert asyncio.run(scenario()) == ([b"inicial", b"m1"], 0)
+
+
+def test_live_endpoint_validates_spot_and_profile(client):
+    assert client.get("/api/live/waikiki", params={"profile": "iblc"}).status_code == 404
+    assert client.get("/api/live/varese", params={"profile": "zzzz"}).status_code == 422
@@ -0,0 +1,57 @@
+import gzip
+
+import msgpack
+import pytest
+
+from app.services import msgpack_codec, response_cache
+
+from tests.conftest import PROFILE_CODE, SPOT_ID, USER
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("*/*", None),
+    ("application/json", None),
+    ("application/msgpack", "msgpack"),
+    ("application/x-msgpack, application/json;q=0.5", "msgpack"),
+    ("application/json, application/msgpack", "msgpack"),
+    ("application/json, application/msgpack;q=0.8", None),
+    ("application/msgpack;q=0", None),
+])
+def test_negotiate_format(accept, expected):
+    assert response_cache.negotiate_format(accept) == expected
+
+
+def test_encode_json_round_trip():
+    body = response_cache.render_json({"a": 1.5, "b": [1, None, "x"], "c": {"d": True}})
+    assert msgpack.unpackb(msgpack_codec.encode_json(body)) == {"a": 1.5, "b": [1, None, "x"], "c": {"d": True}}
+
+
+@pytest.mark.parametrize("endpoint", ["analyze", "timeline"])
+def test_endpoints_answer_msgpack_with_the_json_content(client, endpoint):
+    body = {"spot_id": SPOT_ID, "user": USER, "horizon_hours": 48}
+    as_json = client.post(f"/api/{endpoint}", json=body, headers={"Accept-Encoding": "identity"})
+    packed = client.post(
+        f"/api/{endpoint}", json=body, headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"}
+    )
+    assert packed.headers["content-type"] == msgpack_codec.MSGPACK_MEDIA_TYPE
+    assert packed.headers["etag"] == as_json.headers["etag"][:-1] + '-mp"'
+    assert packed.headers["vary"] == "Accept, Accept-Encoding"
+    assert msgpack.unpackb(packed.content) == as_json.json()
+    assert len(packed.content) < len(as_json.content)
+
+
+def test_msgpack_compresses_and_revalidates(client):
+    params = {"spot_id": SPOT_ID, "profile": PROFILE_CODE, "horizon_hours": 48}
+    headers = {"Accept": "application/msgpack", "Accept-Encoding": "gzip"}
+    request = client.build_request("GET", "/api/timeline", params=params, headers=headers)
+    response = client.send(request, stream=True)
+    raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-mp-gzip"')
+    plain = client.get("/api/timeline", params=params, headers={"Accept-Encoding": "identity"})
+    assert msgpack.unpackb(gzip.decompress(raw)) == plain.json()
+
+    again = client.get("/api/timeline", params=params, headers={**headers, "If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == response.headers["etag"]
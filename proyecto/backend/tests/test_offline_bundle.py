@@ -0,0 +1,70 @@
+import time
+
+import orjson
+
+from app.services import offline_bundle
+from app.services.profile_codes import all_profiles, profile_code
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import PROFILE_CODE, SPOT_ID
+
+
+def _flags(bits: int, flag_bits: dict) -> list:
+    return sorted(flag for flag, mask in flag_bits.items() if bits & mask)
+
+
+def test_every_profile_resolves_to_the_engine_result(frame):
+    engine = SenseiEngine()
+    bundle = offline_bundle.build_bundle(frame, SPOT_ID, "v", engine)
+    assert sorted(bundle["profiles"]) == sorted(profile_code(user) for user in all_profiles())
+    assert len(bundle["results"]) <= len(bundle["profiles"])
+    for user in list(all_profiles())[::7]:
+        row = bundle["results"][bundle["profiles"][profile_code(user)]]
+        for i in range(0, len(frame), 5):
+            result = engine.evaluate(frame.record(i), SPOT_ID, user)
+            assert (row["seguridad"][i], row["esfuerzo"][i], row["disfrute"][i]) == (
+                result.seguridad, result.esfuerzo, result.disfrute
+            )
+            assert _flags(row["flags"][i], bundle["flag_bits"]) == sorted(result.flags)
+            assert bundle["scenario_ids"][row["scenario"][i]] == result.semantics.scenario_id
+
+
+def test_bundle_content_does_not_depend_on_the_clock(frame, monkeypatch):
+    first = orjson.dumps(offline_bundle.build_bundle(frame, SPOT_ID, "v"))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 50 * 60)
+    assert orjson.dumps(offline_bundle.build_bundle(frame, SPOT_ID, "v")) == first
+    assert offline_bundle.build_bundle(frame, SPOT_ID, "v")["generated_at"] == frame.timestamp(0)
+
+
+def test_version_changes_with_data_and_model():
+    base = offline_bundle.bundle_version(SPOT_ID, "v1", "d1")
+    assert base == offline_bundle.bundle_version(SPOT_ID, "v1", "d1")
+    assert base != offline_bundle.bundle_version(SPOT_ID, "v2", "d1")
+    assert base != offline_bundle.bundle_version(SPOT_ID, "v1", "d2")
+
+
+def test_current_bundle_points_to_an_immutable_version(client):
+    current = client.get(f"/api/bundle/{SPOT_ID}", headers={"Accept-Encoding": "identity"})
+    assert current.status_code == 200
+    location = current.headers["content-location"]
+    version = current.json()["version"]
+    assert location == f"/api/bundle/{SPOT_ID}/{version}"
+    assert current.headers["etag"] == f'"{version}"'
+    assert current.json()["profiles"][PROFILE_CODE] is not None
+
+    pinned = client.get(location, headers={"Accept-Encoding": "identity"})
+    assert pinned.status_code == 200
+    assert pinned.content == current.content
+    assert "immutable" in pinned.headers["cache-control"]
+    assert client.get(location, headers={"If-None-Match": f'"{version}"'}).status_code == 304
+
+    offline_bundle.clear_cache()
+    assert client.get(location).status_code == 404
+    again = client.get(f"/api/bundle/{SPOT_ID}", headers={"Accept-Encoding": "identity"})
+    assert again.content == current.content
+
+
+def test_bundle_errors(client):
+    assert client.get("/api/bundle/waikiki").status_code == 404
+    assert client.get(f"/api/bundle/{SPOT_ID}/no-existe").status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+
+from app.services import hourly_frame
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _timeline(client, **body):
+    return client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, **body})
+
+
+def test_scores_view_is_the_full_timeline_minus_the_heavy_fields(client):
+    full = _timeline(client)
+    scores = _timeline(client, view="scores")
+    assert len(scores.content) < len(full.content) / 3
+    for full_point, point in zip(full.json()["timeline"], scores.json()["timeline"], strict=True):
+        assert set(point) == {"timestamp", "hour_label", "scores", "categories", "flags"}
+        assert point["timestamp"] == full_point["timestamp"]
+        assert point["scores"] == full_point["result"]["scores"]
+        assert point["categories"] == full_point["result"]["categories"]
+        assert sorted(point["flags"]) == sorted(full_point["result"]["flags"])
+
+
+def test_scores_view_skips_per_hour_evaluation(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("la vista scores no evalúa hora por hora")
+
+    monkeypatch.setattr(SenseiEngine, "evaluate", fail)
+    assert _timeline(client, view="scores").status_code == 200
+    analyze = client.post("/api/analyze", json={"spot_id": SPOT_ID, "user": USER, "view": "scores"})
+    assert analyze.status_code == 200
+    assert set(analyze.json()) == {"spot", "scoring_version", "current"}
+
+
+def test_each_projection_has_its_own_etag(client):
+    etags = {view: _timeline(client, view=view).headers["etag"] for view in ("full", "compact", "scores")}
+    assert len(set(etags.values())) == 3
+    assert _timeline(client, compact=True).headers["etag"] == etags["compact"]
+    analyze = client.post("/api/analyze", json={"spot_id": SPOT_ID, "user": USER, "view": "compact"}).json()
+    assert "scenario_id" in analyze["result"]["semantics"]
+    assert set(analyze["scenarios"]) == {analyze["result"]["semantics"]["scenario_id"]}
+
+
+@pytest.mark.parametrize("view", ["full", "scores"])
+def test_cursor_pages_cover_the_horizon_once(client, view):
+    whole = _timeline(client, view=view, horizon_hours=60, page_size=60).json()
+    assert whole["next_cursor"] is None
+    pages, cursor = [], None
+    while True:
+        page = _timeline(client, view=view, horizon_hours=60, page_size=25, cursor=cursor).json()
+        assert len(page["timeline"]) <= 25
+        pages.extend(page["timeline"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == whole["timeline"]
+
+
+def test_cursor_survives_the_hour_changing(client, monkeypatch):
+    first = _timeline(client, view="scores", horizon_hours=48, page_size=12).json()
+    cursor = first["next_cursor"]
+    current = hourly_frame.current_hour_epoch
+    monkeypatch.setattr(hourly_frame, "current_hour_epoch", lambda: current() + hourly_frame.HOUR_SECONDS)
+    second = _timeline(client, view="scores", horizon_hours=48, page_size=12, cursor=cursor).json()
+    # El cursor es un instante: la página arranca en la misma hora aunque la actual haya avanzado
+    assert str(hourly_frame.parse_epochs([second["timeline"][0]["timestamp"]])[0]) == cursor
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.rate_limit import (
+    FairQueue, QueueFull, RateLimitMiddleware, Tier, TokenBuckets, client_id, route_tier
+)
+
+
+def test_route_tiers():
+    assert route_tier("/api/health") is None
+    assert route_tier("/api/live/varese") == "stream"
+    assert route_tier("/api/analyze/batch") == "expensive"
+    assert route_tier("/api/analyze") == "cheap"
+    assert route_tier("/assets/app.js") is None
+
+
+def test_token_bucket_burst_refill_and_isolation():
+    buckets = TokenBuckets({"t": Tier(rate=2, burst=3)})
+    assert [buckets.take("a", "t", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("a", "t", now=0.0) == pytest.approx(0.5)
+    assert buckets.take("b", "t", now=0.0) == 0.0
+    assert buckets.take("a", "t", now=0.5) == 0.0
+    assert buckets.take("a", "t", now=0.5) > 0
+    assert [buckets.take("a", "t", now=100.0) for _ in range(4)][-1] > 0  # nunca más que el burst
+
+
+def test_forgotten_clients_come_back_with_a_full_bucket():
+    buckets = TokenBuckets({"t": Tier(rate=0.001, burst=1)}, max_clients=2)
+    assert buckets.take("a", "t", now=0.0) == 0.0
+    assert buckets.take("a", "t", now=0.0) > 0
+    buckets.take("b", "t", now=0.0)
+    buckets.take("c", "t", now=0.0)
+    assert buckets.take("a", "t", now=0.0) == 0.0
+
+
+def test_fair_queue_serves_clients_round_robin():
+    async def scenario():
+        queue = FairQueue(slots=1, max_queued=5, timeout=5)
+        order = []
+        await queue.acquire("holder")
+
+        async def request(client, n):
+            await queue.acquire(client)
+            order.append(f"{client}{n}")
+            await asyncio.sleep(0)
+            queue.release()
+
+        tasks = [asyncio.create_task(request("a", n)) for n in range(1, 4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("b", 1)))
+        tasks.append(asyncio.create_task(request("c", 1)))
+        await asyncio.sleep(0)
+        assert queue.queued == 5
+        queue.release()
+        await asyncio.gather(*tasks)
+        return order, queue.active, queue.queued
+
+    order, active, queued = asyncio.run(scenario())
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+    assert (active, queued) == (0, 0)
+
+
+def test_fair_queue_limits_and_timeouts():
+    async def scenario():
+        queue = FairQueue(slots=1, max_queued=1, timeout=0.05)
+        await queue.acquire("holder")
+        waiting = asyncio.create_task(queue.acquire("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await queue.acquire("a")
+        with pytest.raises(asyncio.TimeoutError):
+            await waiting
+        assert queue.queued == 0
+
+        # Cancelado mientras espera (cliente desconectado): no se queda con el cupo
+        # (el cupo se libera antes de que la cancelación llegue a procesarse)
+        cancelled = asyncio.create_task(queue.acquire("b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        queue.release()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert (queue.active, queue.queued) == (0, 0)
+
+        # Cancelado antes de que se libere el cupo: sale de la cola
+        await queue.acquire("holder")
+        cancelled = asyncio.create_task(queue.acquire("c"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert queue.queued == 0
+        queue.release()
+        return queue.active, queue.queued
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def _scope(client="10.0.0.1", headers=()):
+    return {"client": (client, 1234), "headers": [(k.encode(), v.encode()) for k, v in headers]}
+
+
+def test_client_id():
+    keys = frozenset({"escuela"})
+    assert client_id(_scope(), keys, 0) == "ip:10.0.0.1"
+    assert client_id(_scope(headers=[("x-api-key", "escuela")]), keys, 0) == "key:escuela"
+    assert client_id(_scope(headers=[("x-api-key", "inventada")]), keys, 0) == "ip:10.0.0.1"
+    forwarded = [("x-forwarded-for", "6.6.6.6, 203.0.113.9, 10.1.1.1")]
+    assert client_id(_scope(headers=forwarded), keys, 0) == "ip:10.0.0.1"  # sin proxies de confianza se ignora
+    assert client_id(_scope(headers=forwarded), keys, 1) == "ip:10.1.1.1"
+    assert client_id(_scope(headers=forwarded), keys, 2) == "ip:203.0.113.9"
+    assert client_id(_scope(headers=forwarded), keys, 9) == "ip:6.6.6.6"
+
+
+def _limited_app(**tiers) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/health")
+    async def health():
+        return {"ok": True}
+
+    @app.get("/api/analyze")
+    async def analyze():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, tiers=tiers, enabled=True)
+    return TestClient(app)
+
+
+def test_middleware_answers_429_with_retry_after():
+    client = _limited_app(cheap=Tier(rate=0.5, burst=2, max_concurrent=4))
+    assert [client.get("/api/analyze").status_code for _ in range(2)] == [200, 200]
+    rejected = client.get("/api/analyze")
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "2"
+    assert client.get("/api/health").status_code == 200
+    assert client.get("/api/analyze", headers={"X-Forwarded-For": "1.2.3.4"}).status_code == 429
+
+
+def test_middleware_is_off_unless_configured(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_ENABLED", raising=False)
+    monkeypatch.delenv("TRUSTED_PROXY_HOPS", raising=False)
+    assert not RateLimitMiddleware(None).enabled
+    monkeypatch.setenv("TRUSTED_PROXY_HOPS", "1")
+    assert RateLimitMiddleware(None).enabled
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")
+    assert not RateLimitMiddleware(None).enabled
@@ -0,0 +1,46 @@
+import numpy as np
+import orjson
+
+from app.services import response_cache
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID, USER
+
+
+def test_put_get_and_bounded_eviction(monkeypatch):
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_MAX_ENTRIES", 3)
+    keys = [response_cache.cache_key("timeline", SPOT_ID, "iblc", "v1", f"d{i}") for i in range(4)]
+    for i, key in enumerate(keys):
+        response_cache.put(key, b'{"i":%d}' % i)
+    assert response_cache.get(keys[0]) is None
+    assert [response_cache.get(key).body for key in keys[1:]] == [b'{"i":1}', b'{"i":2}', b'{"i":3}']
+
+
+def test_etag_depends_only_on_the_key():
+    key = response_cache.cache_key("timeline", SPOT_ID, "iblc", "v1", "d1")
+    other = response_cache.cache_key("timeline", SPOT_ID, "iblc", "v1", "d2")
+    assert response_cache.put(key, b"a").etag == response_cache.etag_for(key) == response_cache.put(key, b"b").etag
+    assert response_cache.etag_for(key) != response_cache.etag_for(other)
+
+
+def test_render_json_accepts_numpy_and_embeds_cached_bytes():
+    body = response_cache.render_json({"scores": np.array([1, 2, 3], dtype=np.int16), "avg": np.float64(1.5)})
+    assert orjson.loads(body) == {"scores": [1, 2, 3], "avg": 1.5}
+    entry = response_cache.put(("x",), body)
+    composed = response_cache.render_json({"items": [response_cache.embed(entry)]})
+    assert composed == b'{"items":[' + body + b"]}"
+
+
+def test_repeated_request_is_served_from_the_cache(client, monkeypatch):
+    first = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    assert first.status_code == 200
+
+    def fail(*args, **kwargs):
+        raise AssertionError("el motor no debería correr con la respuesta en caché")
+
+    monkeypatch.setattr(SenseiEngine, "evaluate", fail)
+    monkeypatch.setattr(SenseiEngine, "analyze_arrays", fail)
+    second = client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER})
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from app.models.schemas import TideData, WaveData, WeatherData, WindData
+from app.services import risk_surface
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _cell(surface, d: int, w: int, h: int) -> int:
+    _, winds, waves = surface.shape
+    return (d * winds + w) * waves + h
+
+
+def test_surface_cells_match_the_scalar_engine(user):
+    risk_surface.clear_cache()
+    surface = risk_surface.build_risk_surface(SPOT_ID, user, "rising", wind_steps=8, direction_steps=6, wave_steps=5)
+    assert surface.shape == [6, 8, 5]
+    assert len(surface.seguridad) == len(surface.scenario) == 6 * 8 * 5
+
+    engine = SenseiEngine()
+    for d, w, h in [(0, 0, 0), (2, 5, 3), (5, 7, 4), (3, 1, 2)]:
+        weather = WeatherData(
+            wind=WindData(speed_kmh=surface.wind_speed_kmh[w], direction_deg=int(surface.wind_direction_deg[d])),
+            waves=WaveData(height_m=surface.wave_height_m[h]),
+            tide=TideData(state="rising"),
+            timestamp="2026-01-14T12:00Z"
+        )
+        result = engine.evaluate(weather, SPOT_ID, user)
+        i = _cell(surface, d, w, h)
+        assert (result.seguridad, result.esfuerzo, result.disfrute) == (
+            surface.seguridad[i], surface.esfuerzo[i], surface.disfrute[i]
+        )
+
+
+def test_crossings_are_the_first_wind_below_each_category(user):
+    risk_surface.clear_cache()
+    surface = risk_surface.build_risk_surface(SPOT_ID, user, "rising", wind_steps=12, direction_steps=4, wave_steps=3)
+    engine = SenseiEngine()
+    _, winds, waves = surface.shape
+    wind_axis = np.linspace(0.0, 59.0, winds)
+    for d, row in enumerate(surface.seguridad_crossings["bajo"]):
+        for h, speed in enumerate(row):
+            column = [surface.seguridad[_cell(surface, d, w, h)] for w in range(winds)]
+            below = [w for w, score in enumerate(column) if engine.model.categorize(score) == "bajo"]
+            assert speed == (round(float(wind_axis[below[0]]), 1) if below else None)
+
+
+def test_surface_endpoint(client):
+    response = client.post("/api/surface", json={"spot_id": SPOT_ID, "user": USER, "wind_steps": 4, "direction_steps": 4, "wave_steps": 2})
+    assert response.status_code == 200
+    assert response.json()["shape"] == [4, 4, 2]
+    assert client.post("/api/surface", json={"spot_id": "waikiki", "user": USER}).status_code == 404
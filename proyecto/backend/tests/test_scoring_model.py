@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.services.hourly_frame import HourlyFrame
+from app.services.profile_codes import all_profiles
+from app.services.scoring_model import compile_all_models, get_scoring_model
+from app.services.sensei_engine import SenseiEngine
+
+from tests.conftest import SPOT_ID
+
+
+def _synthetic_frame(frame: HourlyFrame) -> HourlyFrame:
+    """Mismas horas con viento/olas/lluvia barriendo los umbrales del modelo"""
+    n = len(frame)
+    columns = {name: column.copy() for name, column in frame.columns.items()}
+    columns["wind_speed_kmh"] = np.linspace(0, 60, n)
+    columns["wind_direction_deg"] = np.linspace(0, 359, n)
+    columns["wave_height_m"] = np.linspace(0, 2.5, n)[::-1].copy()
+    columns["precipitation_mm"] = np.where(np.arange(n) % 5 == 0, 3.0, 0.0)
+    columns["wave_height_m"][::7] = np.nan  # dato faltante
+    return HourlyFrame(frame.epochs, columns, frame.tide, frame.provider)
+
+
+def test_vectorized_matches_scalar_for_every_profile(frame):
+    engine = SenseiEngine()
+    synthetic = _synthetic_frame(frame)
+    records = list(synthetic.iter_records())
+    for user in all_profiles():
+        arrays = engine.analyze_arrays(synthetic.columns, SPOT_ID, user, synthetic.tide)
+        for i, record in enumerate(records):
+            result = engine.evaluate(record, SPOT_ID, user)
+            assert (result.seguridad, result.esfuerzo, result.disfrute) == (
+                arrays["seguridad"][i], arrays["esfuerzo"][i], arrays["disfrute"][i]
+            )
+            assert sorted(result.flags) == sorted(engine.flag_names_from_bits(int(arrays["flags"][i])))
+
+
+def test_registered_models_compile():
+    versions = compile_all_models()
+    assert get_scoring_model().version in versions
+
+
+def test_unknown_model_version_is_rejected():
+    with pytest.raises(ValueError):
+        get_scoring_model("no-existe")
@@ -0,0 +1,60 @@
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services.hourly_frame import HOUR_SECONDS, TIMESTAMP_FORMAT
+from app.services.sensei_engine import SenseiEngine
+from app.services.session_windows import find_session_windows
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _epoch(timestamp: str) -> int:
+    return int(datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+
+
+def test_windows_are_safe_non_overlapping_and_best_first(frame, user):
+    engine = SenseiEngine()
+    arrays = engine.analyze_arrays(frame.columns, SPOT_ID, user, frame.tide)
+    seguridad, disfrute = arrays["seguridad"], arrays["disfrute"]
+    min_seguridad = int(np.percentile(seguridad, 30))
+
+    windows = find_session_windows(frame.epochs, frame.columns, frame.tide, SPOT_ID, user, 3, min_seguridad, 4, engine)
+    assert windows
+
+    epochs = frame.epochs.tolist()
+    starts = [epochs.index(_epoch(w.start)) for w in windows]
+    for window, start in zip(windows, starts):
+        assert _epoch(window.end) - _epoch(window.start) == 3 * HOUR_SECONDS
+        assert seguridad[start:start + 3].min() >= min_seguridad
+        assert window.seguridad_min == seguridad[start:start + 3].min()
+        assert window.disfrute_avg == round(float(disfrute[start:start + 3].sum()) / 3, 1)
+    for a in starts:
+        assert sum(1 for b in starts if abs(a - b) < 3) == 1
+
+    valid = [
+        float(disfrute[i:i + 3].mean()) for i in range(len(epochs) - 2) if seguridad[i:i + 3].min() >= min_seguridad
+    ]
+    assert windows[0].disfrute_avg == round(max(valid), 1)
+    assert [w.disfrute_avg for w in windows] == sorted((w.disfrute_avg for w in windows), reverse=True)
+
+
+def test_windows_never_span_a_gap(frame, user):
+    # Sin la hora 5: ninguna ventana puede cubrir 4 -> 6
+    keep = np.arange(len(frame)) != 5
+    epochs = frame.epochs[keep]
+    columns = {name: column[keep] for name, column in frame.columns.items()}
+    windows = find_session_windows(epochs, columns, frame.tide[keep], SPOT_ID, user, 2, 0, 48)
+    gap = int(frame.epochs[5])
+    assert windows
+    assert all(not (_epoch(w.start) <= gap < _epoch(w.end)) for w in windows)
+
+
+def test_windows_endpoint_uses_the_api_timestamp_format(client):
+    response = client.post("/api/windows", json={"spot_id": SPOT_ID, "user": USER, "min_seguridad": 0, "horizon_hours": 48})
+    assert response.status_code == 200
+    windows = response.json()["windows"]
+    assert windows
+    assert all(re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:00Z", w["start"]) for w in windows)
+    assert client.post("/api/windows", json={"spot_id": SPOT_ID, "user": USER, "horizon_hours": 200}).status_code == 422
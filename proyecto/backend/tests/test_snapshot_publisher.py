@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import os
+
+import brotli
+import orjson
+import pytest
+
+from app.routers import api
+from app.services import snapshot_publisher
+from app.services.response_cache import CachedResponse
+
+from tests.conftest import SPOT_ID
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_publisher, "SNAPSHOT_DIR", str(tmp_path))
+    snapshot_publisher.clear_cache()
+    yield tmp_path
+    snapshot_publisher.clear_cache()
+
+
+def _entry(version: str) -> CachedResponse:
+    return CachedResponse(body=orjson.dumps({"version": version, "pad": "x" * 1000}), etag=f'"{version}"', created_at=0)
+
+
+def test_publish_writes_every_variant_and_the_index(snapshot_dir):
+    entry = _entry("v1")
+    assert snapshot_publisher.publish(SPOT_ID, "v1", entry, "2026-01-14T12:00Z")
+    assert not snapshot_publisher.publish(SPOT_ID, "v1", entry)
+
+    path = snapshot_dir / SPOT_ID / "v1.json"
+    assert path.read_bytes() == entry.body
+    assert brotli.decompress((snapshot_dir / SPOT_ID / "v1.json.br").read_bytes()) == entry.body
+    assert gzip.decompress((snapshot_dir / SPOT_ID / "v1.json.gz").read_bytes()) == entry.body
+    index = orjson.loads((snapshot_dir / "index.json").read_bytes())["spots"][SPOT_ID]
+    assert index["url"] == f"/snapshots/{SPOT_ID}/v1.json"
+    assert index["valid_until"] == "2026-01-14T12:00Z"
+    assert not [name for name in os.listdir(snapshot_dir / SPOT_ID) if name.endswith(".tmp")]
+
+
+def test_old_versions_are_pruned(snapshot_dir):
+    for i in range(snapshot_publisher.SNAPSHOT_KEEP_VERSIONS + 2):
+        snapshot_publisher.publish(SPOT_ID, f"v{i}", _entry(f"v{i}"))
+        # mtimes distintos y crecientes aunque el reloj del filesystem sea grueso
+        for name in os.listdir(snapshot_dir / SPOT_ID):
+            if name.startswith(f"v{i}."):
+                os.utime(snapshot_dir / SPOT_ID / name, (1000 + i, 1000 + i))
+    kept = sorted(name for name in os.listdir(snapshot_dir / SPOT_ID) if name.endswith(".json"))
+    newest = snapshot_publisher.SNAPSHOT_KEEP_VERSIONS + 1
+    assert f"v{newest}.json" in kept
+    assert "v0.json" not in kept
+    assert len(kept) == snapshot_publisher.SNAPSHOT_KEEP_VERSIONS
+    assert not (snapshot_dir / SPOT_ID / "v0.json.br").exists()
+
+
+def test_snapshots_are_served_precompressed(client, snapshot_dir):
+    entry = _entry("v1")
+    snapshot_publisher.publish(SPOT_ID, "v1", entry)
+    request = client.build_request("GET", f"/snapshots/{SPOT_ID}/v1.json", headers={"Accept-Encoding": "br"})
+    response = client.send(request, stream=True)
+    assert response.headers["content-encoding"] == "br"
+    assert "immutable" in response.headers["cache-control"]
+    assert brotli.decompress(b"".join(response.iter_raw())) == entry.body
+
+    index = client.get("/snapshots/index.json", headers={"Accept-Encoding": "identity"})
+    assert index.headers["cache-control"] == f"public, max-age={snapshot_publisher.SNAPSHOT_INDEX_MAX_AGE}"
+    assert client.get(f"/snapshots/{SPOT_ID}/nope.json").status_code == 404
+
+
+@pytest.mark.parametrize("path", ["../secret.json", f"{SPOT_ID}/../../secret.json", "/etc/passwd", f"{SPOT_ID}/v1.json.br"])
+def test_paths_outside_the_snapshots_are_rejected(snapshot_dir, path):
+    snapshot_publisher.publish(SPOT_ID, "v1", _entry("v1"))
+    (snapshot_dir.parent / "secret.json").write_text("{}")
+    with pytest.raises(FileNotFoundError):
+        snapshot_publisher.snapshot_response(path)
+
+
+def test_refresh_publishes_each_spot_once_per_version(snapshot_dir):
+    asyncio.run(api.refresh_bundles())
+    index = orjson.loads((snapshot_dir / "index.json").read_bytes())["spots"]
+    assert list(index) == [SPOT_ID]
+    files = sorted(os.listdir(snapshot_dir / SPOT_ID))
+    asyncio.run(api.refresh_bundles())
+    assert sorted(os.listdir(snapshot_dir / SPOT_ID)) == files
+
+
+def test_default_dir_is_outside_the_spa_static_dir():
+    # Crear app/static (sin index.html) activaría el catch-all de la SPA en el próximo arranque
+    static = os.path.realpath("app/static")
+    default = os.path.realpath(snapshot_publisher.SNAPSHOT_DIR)
+    assert not (default + os.sep).startswith(static + os.sep)
@@ -0,0 +1,112 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.config import spots as spot_catalog
+from app.services import response_cache, spot_index
+from app.services.spot_index import SpotIndex, haversine_km
+
+from tests.conftest import SPOT_ID, write_catalog
+
+
+def _random_catalog(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))  # uniformes sobre la esfera
+    lons = rng.uniform(-180, 180, n)
+    regions = {"global": {"name": "Global", "lat": 0.0, "lon": 0.0, "max_distance_km": 30000}}
+    spots = {f"s{i}": {"name": f"S{i}", "lat": float(lat), "lon": float(lon), "region": "global"}
+             for i, (lat, lon) in enumerate(zip(lats, lons))}
+    # Casos borde: antimeridiano y cerca de los polos
+    spots.update({
+        "este": {"name": "Este", "lat": 10.0, "lon": 179.9, "region": "global"},
+        "oeste": {"name": "Oeste", "lat": 10.0, "lon": -179.9, "region": "global"},
+        "polo": {"name": "Polo", "lat": 89.9, "lon": 45.0, "region": "global"},
+    })
+    return spots, regions
+
+
+def _brute_force(spots: dict, lat: float, lon: float):
+    ids = list(spots)
+    distances = haversine_km(lat, lon, np.array([spots[s]["lat"] for s in ids]), np.array([spots[s]["lon"] for s in ids]))
+    return sorted(zip(distances.tolist(), ids))
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    spots, regions = _random_catalog(3000)
+    return spots, SpotIndex(spots, regions)
+
+
+@pytest.mark.parametrize("lat, lon, radius", [
+    (-38.0, -57.5, 300),      # grilla
+    (10.0, 180.0, 50),        # antimeridiano
+    (89.5, 0.0, 200),         # círculo con el polo
+    (0.0, 0.0, 2500),         # radio grande: versión vectorizada
+    (45.0, 90.0, 20000),      # todo el globo
+])
+def test_within_matches_brute_force(catalog, lat, lon, radius):
+    spots, index = catalog
+    expected = [(spot_id, d) for d, spot_id in _brute_force(spots, lat, lon) if d <= radius]
+    found = index.within(lat, lon, radius)
+    assert [spot_id for spot_id, _ in found] == [spot_id for spot_id, _ in expected]
+    np.testing.assert_allclose([d for _, d in found], [d for _, d in expected], rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("lat, lon", [(-38.0, -57.5), (10.0, -179.95), (89.0, 120.0), (12.3, 45.6)])
+def test_nearest_matches_brute_force(catalog, lat, lon):
+    spots, index = catalog
+    expected = [spot_id for _, spot_id in _brute_force(spots, lat, lon)[:5]]
+    assert [spot_id for spot_id, _ in index.nearest(lat, lon, k=5)] == expected
+    assert index.nearest(lat, lon, k=1, max_km=0.001) == []
+
+
+def test_serving_spot_respects_the_region_radius():
+    index = spot_index.get_index()
+    spot_id, distance = index.serving_spot(-38.02, -57.54)
+    assert spot_id == SPOT_ID and distance < 2
+    assert index.serving_spot(-33.0, -57.5) is None  # fuera de los 50 km de la región
+
+
+def test_load_catalog_rejects_invalid_files(tmp_path):
+    path = tmp_path / "spots.json"
+    write_catalog(path, {"malo": {"region": "no-existe"}})
+    with pytest.raises(ValueError):
+        spot_catalog.load_catalog(str(path))
+    write_catalog(path, {"lejos": {"lat": 95.0}})
+    with pytest.raises(ValueError):
+        spot_catalog.load_catalog(str(path))
+
+
+def test_hot_reload_swaps_the_catalog_and_invalidates_only_what_changed(client, spot_catalog_file):
+    revision = spot_index.revision(SPOT_ID)
+    assert not spot_index.reload_if_changed()
+    assert client.get("/api/spots/nearest", params={"lat": -37.95, "lon": -57.54}).json()["spot_id"] == SPOT_ID
+    response_cache.put(("marca",), b"{}")
+
+    write_catalog(spot_catalog_file, {"norte": {"name": "Norte", "lat": -37.95, "lon": -57.54}})
+    os.utime(spot_catalog_file, ns=(1, 1))  # mtime distinto aunque el reloj del filesystem sea grueso
+    assert spot_index.reload_if_changed()
+    assert "norte" in spot_catalog.SPOTS
+    assert spot_index.revision(SPOT_ID) == revision
+    assert response_cache.get(("marca",)) is None
+    assert client.get("/api/spots/nearest", params={"lat": -37.95, "lon": -57.54}).json()["spot_id"] == "norte"
+    assert client.get("/api/analyze", params={"spot_id": "norte", "profile": "iblc"}).status_code == 200
+
+    catalog = json.loads(spot_catalog_file.read_text())
+    catalog["spots"][SPOT_ID]["orientation_costa_deg"] = 100
+    spot_catalog_file.write_text(json.dumps(catalog))
+    os.utime(spot_catalog_file, ns=(2, 2))
+    assert spot_index.reload_if_changed()
+    assert spot_index.revision(SPOT_ID) != revision
+
+
+def test_invalid_file_keeps_the_current_catalog(spot_catalog_file):
+    index = spot_index.get_index()
+    spot_catalog_file.write_text("{ no es json")
+    os.utime(spot_catalog_file, ns=(3, 3))
+    assert not spot_index.reload_if_changed()
+    assert spot_index.get_index() is index
+    assert SPOT_ID in spot_catalog.SPOTS
+    assert not spot_index.reload_if_changed()  # no reintenta el mismo archivo
@@ -0,0 +1,77 @@
+from app.routers import api
+from app.services import spot_index
+from app.services.spot_ranking import SAFETY_RANK
+
+from tests.conftest import PROFILE_CODE, SPOT_ID, write_catalog
+
+EXTRA_SPOTS = {
+    "norte": {"name": "Norte", "lat": -37.95, "lon": -57.54, "orientation_costa_deg": 270},
+    "sur": {"name": "Sur", "lat": -38.09, "lon": -57.55, "orientation_costa_deg": 180},
+}
+
+
+def _ranking(client, **params):
+    return client.get("/api/spots/ranking", params={"profile": PROFILE_CODE, **params})
+
+
+def _with_extra_spots(path):
+    write_catalog(path, EXTRA_SPOTS)
+    spot_index.reload()
+
+
+def test_every_spot_is_ranked_safest_first(client, spot_catalog_file):
+    _with_extra_spots(spot_catalog_file)
+    response = _ranking(client)
+    assert response.status_code == 200
+    spots = response.json()["spots"]
+    assert sorted(spot["spot_id"] for spot in spots) == sorted([SPOT_ID, *EXTRA_SPOTS])
+    assert [spot["rank"] for spot in spots] == list(range(1, len(spots) + 1))
+    order = [
+        (-SAFETY_RANK[s["categories"]["seguridad"]], -s["scores"]["disfrute"], -s["scores"]["seguridad"], s["spot_id"])
+        for s in spots
+    ]
+    assert order == sorted(order)
+    assert all(spot["distance_km"] is None for spot in spots)
+
+
+def test_distance_filter(client, spot_catalog_file):
+    _with_extra_spots(spot_catalog_file)
+    varese = spot_index.get_index().within(-38.014, -57.53, 1)
+    assert [spot_id for spot_id, _ in varese] == [SPOT_ID]
+
+    near = _ranking(client, lat=-38.014, lon=-57.53, max_km=5).json()["spots"]
+    assert [spot["spot_id"] for spot in near] == [SPOT_ID]
+    assert near[0]["distance_km"] < 0.1
+    everything = _ranking(client, lat=-38.014, lon=-57.53).json()["spots"]
+    assert len(everything) == 3
+    assert all(spot["distance_km"] is not None for spot in everything)
+    assert _ranking(client, lat=10.0, lon=10.0, max_km=5).json()["spots"] == []
+
+
+def test_unavailable_spots_are_reported(client, spot_catalog_file, monkeypatch):
+    _with_extra_spots(spot_catalog_file)
+    real_service = api._build_weather_service()
+
+    class PartialService:
+        async def get_forecast_frame(self, lat, lon, hours=12):
+            if lat == EXTRA_SPOTS["sur"]["lat"]:
+                raise ValueError("sin datos")
+            return await real_service.get_forecast_frame(lat, lon, hours=hours)
+
+    monkeypatch.setattr(api, "_build_weather_service", PartialService)
+    body = _ranking(client).json()
+    assert body["unavailable"] == ["sur"]
+    assert "sur" not in [spot["spot_id"] for spot in body["spots"]]
+
+
+def test_errors(client, monkeypatch):
+    assert client.get("/api/spots/ranking", params={"profile": "zzzz"}).status_code == 422
+    assert _ranking(client, lat=-38.0).status_code == 422
+    assert _ranking(client, max_km=10).status_code == 422
+
+    class DownService:
+        async def get_forecast_frame(self, lat, lon, hours=12):
+            raise ValueError("upstream caído")
+
+    monkeypatch.setattr(api, "_build_weather_service", DownService)
+    assert _ranking(client).status_code == 503
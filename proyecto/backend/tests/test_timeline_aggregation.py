@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services import http_client as http_module
+from app.services.hourly_frame import HOUR_SECONDS
+from app.services.sensei_engine import SenseiEngine
+from app.services.timeline_aggregation import (
+    ARGENTINA_TZ, aggregate_timeline, bucket_starts, page_bounds, parse_cursor
+)
+
+from tests.conftest import SPOT_ID, USER
+
+
+def test_parse_cursor():
+    assert parse_cursor(None) is None
+    assert parse_cursor("1768348800") == 1768348800
+    for bad in ("", "-5", "abc", "1.5"):
+        with pytest.raises(ValueError):
+            parse_cursor(bad)
+
+
+def test_page_bounds_follow_the_cursor_instant():
+    starts = np.arange(10) * HOUR_SECONDS + 1000
+    assert page_bounds(starts, None, 4) == (0, 4, str(1000 + 4 * HOUR_SECONDS))
+    assert page_bounds(starts, 1000 + 4 * HOUR_SECONDS, 4) == (4, 8, str(1000 + 8 * HOUR_SECONDS))
+    # Un cursor entre dos inicios arranca en el siguiente
+    assert page_bounds(starts, 1001, 4)[0] == 1
+    assert page_bounds(starts, 1000 + 8 * HOUR_SECONDS, 4) == (8, 10, None)
+
+
+def test_daily_buckets_start_at_local_midnight(frame):
+    starts = bucket_starts(frame.epochs, "daily")
+    assert starts[0] == 0
+    for index in starts[1:].tolist():
+        assert datetime.fromtimestamp(int(frame.epochs[index]), ARGENTINA_TZ).hour == 0
+    three_hourly = bucket_starts(frame.epochs, "3h")
+    assert all(datetime.fromtimestamp(int(frame.epochs[i]), ARGENTINA_TZ).hour % 3 == 0 for i in three_hourly[1:].tolist())
+
+
+@pytest.mark.parametrize("resolution", ["3h", "daily"])
+def test_buckets_summarize_their_hours(frame, user, resolution):
+    engine = SenseiEngine()
+    arrays = engine.analyze_arrays(frame.columns, SPOT_ID, user, frame.tide)
+    buckets = aggregate_timeline(frame, SPOT_ID, user, resolution, engine)
+    starts = bucket_starts(frame.epochs, resolution).tolist()
+    assert len(buckets) == len(starts)
+    assert sum(bucket["hours"] for bucket in buckets) == len(frame)
+    for bucket, start, end in zip(buckets, starts, starts[1:] + [len(frame)]):
+        seguridad = arrays["seguridad"][start:end]
+        assert bucket["scores_min"]["seguridad"] == seguridad.min()
+        assert bucket["scores_max"]["esfuerzo"] == arrays["esfuerzo"][start:end].max()
+        assert bucket["worst_hour"] == frame.timestamp(start + int(np.argmin(seguridad)))
+        flags = set()
+        for bits in arrays["flags"][start:end].tolist():
+            flags.update(engine.flag_names_from_bits(bits))
+        assert set(bucket["flags"]) == flags
+        assert bucket["wind_speed_max_kmh"] == round(float(np.nanmax(frame.columns["wind_speed_kmh"][start:end])), 2)
+
+
+def test_paging_walks_every_bucket_once(client):
+    body = {"spot_id": SPOT_ID, "user": USER, "horizon_hours": 168, "resolution": "3h", "page_size": 10}
+    whole = client.post("/api/timeline", json={**body, "page_size": 168}).json()
+    pages, cursor = [], None
+    while True:
+        page = client.post("/api/timeline", json={**body, "cursor": cursor}).json()
+        pages.extend(page["buckets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == whole["buckets"]
+
+
+def test_aggregation_reuses_the_cached_frame(client, monkeypatch):
+    body = {"spot_id": SPOT_ID, "user": USER, "horizon_hours": 96}
+    assert client.post("/api/timeline", json=body).status_code == 200
+    calls = []
+    recorded_get = http_module.http_client.get
+
+    async def counting_get(url, params=None):
+        calls.append(url)
+        return await recorded_get(url, params)
+
+    monkeypatch.setattr(http_module.http_client, "get", counting_get)
+    for resolution in ("3h", "daily"):
+        assert client.post("/api/timeline", json={**body, "resolution": resolution}).status_code == 200
+    assert calls == []
+
+
+def test_horizon_and_cursor_validation(client):
+    assert client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "horizon_hours": 169}).status_code == 422
+    assert client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "cursor": "abc"}).status_code == 422
+    assert client.post("/api/timeline", json={"spot_id": SPOT_ID, "user": USER, "cursor": "9999999999"}).status_code == 404
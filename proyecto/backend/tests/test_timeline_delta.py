@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+from app.services import http_client as http_module
+from app.services import hourly_frame, hybrid_provider, timeline_history
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _apply(points: list, delta: dict) -> list:
+    """Aplica un delta como lo haría el cliente"""
+    by_timestamp = {point["timestamp"]: point for point in points}
+    for timestamp in delta["dropped"]:
+        by_timestamp.pop(timestamp)
+    for point in delta["changed"]:
+        by_timestamp[point["timestamp"]] = point
+    return [by_timestamp[timestamp] for timestamp in sorted(by_timestamp)]
+
+
+@pytest.mark.parametrize("value", ['"abc"', 'W/"abc"', '"abc-br"', '"abc-mp-gzip"', "abc"])
+def test_normalize_version_accepts_etags(value):
+    assert timeline_history.normalize_version(value) == "abc"
+
+
+def test_diff_and_bounded_history():
+    old = {"t1": {"timestamp": "t1", "v": 1}, "t2": {"timestamp": "t2", "v": 2}}
+    new = {"t2": {"timestamp": "t2", "v": 3}, "t3": {"timestamp": "t3", "v": 4}}
+    assert timeline_history.diff(old, new) == ([new["t2"], new["t3"]], ["t1"])
+    assert timeline_history.diff(new, new) == ([], [])
+
+    for i in range(timeline_history.TIMELINE_HISTORY_DEPTH + 1):
+        timeline_history.record(("s",), f"v{i}", [{"timestamp": "t", "i": i}])
+    assert timeline_history.get(("s",), "v0") is None
+    assert timeline_history.get(("s",), "v1") == {"t": {"timestamp": "t", "i": 1}}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_delta_carries_only_the_changed_hours(client, monkeypatch, compact):
+    body = {"spot_id": SPOT_ID, "user": USER, "compact": compact}
+    first = client.post("/api/timeline", json=body)
+
+    # Sube el viento de una hora futura en el forecast de Open-Meteo
+    target = first.json()["timeline"][3]["timestamp"][:13]
+    recorded_get = http_module.http_client.get
+
+    async def windier_get(url, params=None):
+        data = await recorded_get(url, params)
+        if "api.open-meteo.com" in url and "marine" not in url:
+            data = copy.deepcopy(data)
+            hourly = data["hourly"]
+            index = [t[:13] for t in hourly["time"]].index(target)
+            hourly["wind_speed_10m"][index] += 12
+        return data
+
+    monkeypatch.setattr(http_module.http_client, "get", windier_get)
+    hybrid_provider.clear_cache()
+    delta = client.post("/api/timeline", json={**body, "since": first.headers["etag"]}).json()
+    full = client.post("/api/timeline", json=body).json()
+
+    assert delta["delta"] is True
+    assert delta["since"] == timeline_history.normalize_version(first.headers["etag"])
+    assert [point["timestamp"][:13] for point in delta["changed"]] == [target]
+    assert delta["dropped"] == []
+    assert _apply(first.json()["timeline"], delta) == full["timeline"]
+    if compact:
+        assert set(delta["scenarios"]) == {point["result"]["semantics"]["scenario_id"] for point in delta["changed"]}
+
+
+def test_hour_rollover_drops_the_past_hour(client, monkeypatch):
+    body = {"spot_id": SPOT_ID, "user": USER, "compact": True, "include_scenarios": False}
+    first = client.post("/api/timeline", json=body)
+    current = hourly_frame.current_hour_epoch
+    monkeypatch.setattr(hourly_frame, "current_hour_epoch", lambda: current() + hourly_frame.HOUR_SECONDS)
+
+    delta = client.post("/api/timeline", json={**body, "since": first.headers["etag"]}).json()
+    full = client.post("/api/timeline", json=body).json()
+    assert delta["dropped"] == [first.json()["timeline"][0]["timestamp"]]
+    assert delta["changed"][-1] == full["timeline"][-1]
+    assert _apply(first.json()["timeline"], delta) == full["timeline"]
+
+
+def test_same_or_unknown_version(client):
+    body = {"spot_id": SPOT_ID, "user": USER}
+    first = client.post("/api/timeline", json=body)
+    same = client.post("/api/timeline", json={**body, "since": first.headers["etag"]}).json()
+    assert same["changed"] == same["dropped"] == []
+    unknown = client.post("/api/timeline", json={**body, "since": "desconocida"}).json()
+    assert "delta" not in unknown
+    assert unknown["timeline"] == first.json()["timeline"]
+
+
+def test_paged_delta_keeps_the_next_cursor(client):
+    body = {"spot_id": SPOT_ID, "user": USER, "horizon_hours": 48, "page_size": 12}
+    first = client.post("/api/timeline", json=body)
+    assert first.json()["next_cursor"]
+    delta = client.post("/api/timeline", json={**body, "since": first.headers["etag"]}).json()
+    assert delta["delta"] is True
+    assert delta["next_cursor"] == first.json()["next_cursor"]
@@ -0,0 +1,52 @@
+import orjson
+import pytest
+
+from app.services import response_cache
+
+from tests.conftest import SPOT_ID, USER
+
+
+def _lines(response) -> list:
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+@pytest.mark.parametrize("horizon", [12, 48])
+def test_stream_matches_the_timeline(client, horizon):
+    body = {"spot_id": SPOT_ID, "user": USER, "horizon_hours": horizon}
+    streamed = client.post("/api/timeline/stream", json=body)
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith(response_cache.NDJSON_MEDIA_TYPE)
+    header, *hours = _lines(streamed)
+    assert header["type"] == "header"
+    assert header["hours"] == len(hours)
+
+    timeline = client.post("/api/timeline", json={**body, "page_size": horizon}).json()["timeline"]
+    assert [line["point"] for line in hours] == timeline
+
+
+def test_compact_stream_sends_each_scenario_before_its_first_hour(client):
+    streamed = client.post("/api/timeline/stream", json={"spot_id": SPOT_ID, "user": USER, "compact": True})
+    sent = set()
+    for line in _lines(streamed)[1:]:
+        if line["type"] == "scenario":
+            assert line["id"] not in sent
+            sent.add(line["id"])
+        else:
+            assert line["point"]["result"]["semantics"]["scenario_id"] in sent
+
+
+def test_finished_stream_is_cached_and_revalidates(client):
+    body = {"spot_id": SPOT_ID, "user": USER}
+    first = client.post("/api/timeline/stream", json=body, headers={"Accept-Encoding": "identity"})
+    cached = client.post("/api/timeline/stream", json=body, headers={"Accept-Encoding": "identity"})
+    assert cached.content == first.content
+    assert cached.headers["etag"] == first.headers["etag"]
+    revalidated = client.post("/api/timeline/stream", json=body, headers={"If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_stream_rejects_unknown_spot_and_aggregated_resolution(client):
+    assert client.post("/api/timeline/stream", json={"spot_id": "waikiki", "user": USER}).status_code == 404
+    assert client.post(
+        "/api/timeline/stream", json={"spot_id": SPOT_ID, "user": USER, "resolution": "3h"}
+    ).status_code == 422